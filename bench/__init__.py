@@ -0,0 +1,12 @@
+"""Synthetic data and timing harness for the dashboard, attendance, export and upload paths.
+
+    python -m bench.datagen --rows 100000            # build the scratch database
+    python -m bench.runner run --out results.json    # time the routes against it
+    python -m bench.runner compare before.json after.json
+"""
+import os
+
+from utils import Config
+
+# Scratch database on the same server as Config.DB_NAME; never the live one
+BENCH_DB_NAME = os.environ.get('BENCH_DB_NAME', f"{Config.DB_NAME}_bench")
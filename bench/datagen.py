@@ -0,0 +1,280 @@
+"""Build a scratch database with synthetic training data for the benchmarks.
+
+Table definitions are copied from the live database (CREATE TABLE ... LIKE), so
+the scratch copy always matches production, and migrations.py is then applied.
+Rows are generated from a seed, so two runs at the same scale are identical:
+
+    python -m bench.datagen [--rows 100000] [--seed 42] [--years 3]
+
+--rows is the master_data (attendance) row count, 10k-1M; the other tables
+scale from it. Employees are spread over factories with a Zipf skew (a few
+large plants, a long tail of small ones) and attendance leans towards the
+current fiscal year, which is what the dashboards mostly filter on.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import pymysql
+import pymysql.cursors
+
+from attendance_app import get_pmo_month, get_cd_month
+from bench import BENCH_DB_NAME
+from migrations import migrate
+from utils import Config, Constants
+
+INSERT_CHUNK_SIZE = 5000
+
+# Share of attendance per fiscal year, newest first
+FISCAL_YEAR_SKEW = (0.5, 0.3, 0.2)
+
+# Small configuration tables copied with their rows rather than generated
+REFERENCE_TABLES = ('training_targets', 'user_auth')
+
+PMO_CATEGORIES = ['SHE (Safety+Health)', 'Technical', 'Behavioural', 'Quality', 'Digital']
+PL_CATEGORIES = ['PL1', 'PL2', 'PL3']
+BRSR_CATEGORIES = ['Health & Safety', 'Skill Upgradation', 'Human Rights']
+EMPLOYEE_GROUPS = ['PERMANENT'] * 8 + ['TEMPORARY', 'APPRENTICE']
+HOURS = [2, 4, 4, 6, 8, 8, 8, 16, 24]
+TRAINERS = [f"Trainer {i}" for i in range(1, 41)]
+
+
+def zipf_weights(n, s=1.1):
+    return [1 / (rank ** s) for rank in range(1, n + 1)]
+
+
+def connect(database=None):
+    return pymysql.connect(host=Config.DB_HOST, user=Config.DB_USER, password=Config.DB_PASSWORD,
+                           database=database, charset='utf8mb4',
+                           cursorclass=pymysql.cursors.DictCursor, autocommit=True)
+
+
+def copy_schema(conn, source, target):
+    """Recreate every base table of source in target (empty, same columns and indexes)"""
+    with conn.cursor() as cursor:
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{target}` CHARACTER SET utf8mb4")
+        cursor.execute(f"SHOW FULL TABLES FROM `{source}` WHERE Table_type = 'BASE TABLE'")
+        tables = [list(row.values())[0] for row in cursor.fetchall()]
+        for table in tables:
+            cursor.execute(f"DROP TABLE IF EXISTS `{target}`.`{table}`")
+            cursor.execute(f"CREATE TABLE `{target}`.`{table}` LIKE `{source}`.`{table}`")
+            if table in REFERENCE_TABLES:
+                cursor.execute(f"INSERT INTO `{target}`.`{table}` SELECT * FROM `{source}`.`{table}`")
+    return tables
+
+
+def insert_rows(conn, table, columns, rows):
+    """Chunked executemany; returns the row count"""
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    count = 0
+    with conn.cursor() as cursor:
+        for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+            chunk = rows[start:start + INSERT_CHUNK_SIZE]
+            cursor.executemany(sql, chunk)
+            count += len(chunk)
+    return count
+
+
+class Generator:
+    """Seeded synthetic data; every table is derived from the same employees and programs"""
+
+    def __init__(self, rows, seed=42, years=3, today=None):
+        self.rows = rows
+        self.random = random.Random(seed)
+        self.today = today or date.today()
+        # Fiscal years run April-March and are named by their starting year
+        current = self.today.year if self.today.month >= 4 else self.today.year - 1
+        self.fiscal_years = [current - i for i in range(years)]
+        skew = list(FISCAL_YEAR_SKEW[:years]) + [FISCAL_YEAR_SKEW[-1]] * max(0, years - len(FISCAL_YEAR_SKEW))
+        self.year_weights = skew
+        self.factory_weights = zipf_weights(len(Constants.FACTORY_LOCATIONS))
+        self.employees = []
+        self.trainings = []
+        self.programs = []
+
+    def pick_factory(self):
+        return self.random.choices(Constants.FACTORY_LOCATIONS, self.factory_weights)[0]
+
+    def pick_date(self):
+        """A date in a skewed fiscal year, never in the future"""
+        year = self.random.choices(self.fiscal_years, self.year_weights)[0]
+        start = date(year, 4, 1)
+        end = min(date(year + 1, 3, 31), self.today)
+        return start + timedelta(days=self.random.randint(0, max(0, (end - start).days)))
+
+    def eor_data(self):
+        count = max(1000, self.rows // 5)
+        for i in range(count):
+            factory = self.pick_factory()
+            self.employees.append({
+                'per_no': str(100000 + i),
+                'participants_name': f"Employee {i}",
+                'factory': factory,
+                'department': f"{factory} Dept {self.random.randint(1, 12)}",
+                'gender': 'Female' if self.random.random() < 0.12 else 'Male',
+                'employee_group': self.random.choice(EMPLOYEE_GROUPS),
+                'employee_subgroup': self.random.choice(['Officer', 'Staff', 'Operator']),
+                'bc_no': str(5000 + self.random.randint(0, 400)),
+            })
+        columns = list(self.employees[0])
+        return 'eor_data', columns, [tuple(e[c] for c in columns) for e in self.employees]
+
+    def training_names(self):
+        count = min(1000, max(50, self.rows // 1000))
+        for i in range(count):
+            self.trainings.append({
+                'training_name': f"Training {i:04d}",
+                'pmo_training_category': self.random.choice(PMO_CATEGORIES),
+                'pl_category': self.random.choice(PL_CATEGORIES),
+                'brsr_sq_123_category': self.random.choice(BRSR_CATEGORIES),
+                'tni_status': 'TNI' if self.random.random() < 0.6 else 'NON-TNI',
+                'learning_hours': self.random.choice(HOURS),
+            })
+        columns = list(self.trainings[0])
+        return 'training_names', columns, [tuple(t[c] for c in columns) for t in self.trainings]
+
+    def training_programs(self):
+        count = max(100, self.rows // 25)
+        training_weights = zipf_weights(len(self.trainings), 0.8)
+        rows = []
+        for i in range(count):
+            training = self.random.choices(self.trainings, training_weights)[0]
+            start = self.pick_date()
+            days = 1 if training['learning_hours'] <= 8 else training['learning_hours'] // 8
+            program = {
+                'id': i + 1,
+                'training_name': training['training_name'],
+                'pmo_training_category': training['pmo_training_category'],
+                'pl_category': training['pl_category'],
+                'brsr_sq_123_category': training['brsr_sq_123_category'],
+                'location_hall': self.random.choice(Constants.LOCATION_HALLS),
+                'start_date': start,
+                'end_date': start + timedelta(days=days - 1),
+                'start_time': '09:00:00',
+                'end_time': '17:00:00',
+                'learning_hours': training['learning_hours'],
+                'program_type': self.random.choice(Constants.PROGRAM_TYPES),
+                'tni_status': training['tni_status'],
+                'faculty_1': self.random.choice(TRAINERS),
+                'created_at': datetime.combine(start, datetime.min.time()),
+                'duration_days': days,
+            }
+            self.programs.append(program)
+            rows.append(program)
+        # One program running all day today, so check-ins are accepted during the benchmark
+        rows.append({**rows[0], 'id': count + 1, 'start_date': self.today, 'end_date': self.today,
+                     'start_time': '00:00:00', 'end_time': '23:59:00', 'learning_hours': 8, 'duration_days': 1})
+        self.bench_program_id = count + 1
+        columns = list(rows[0])
+        return 'training_programs', columns, [tuple(p[c] for c in columns) for p in rows]
+
+    def master_data(self):
+        """Attendance: each row is one employee on one program, unique on (program_id, per_no)"""
+        employee_weights = zipf_weights(len(self.employees), 0.5)
+        seen = set()
+        rows = []
+        while len(rows) < self.rows:
+            program = self.random.choice(self.programs)
+            employee = self.random.choices(self.employees, employee_weights)[0]
+            if (program['id'], employee['per_no']) in seen:
+                continue
+            seen.add((program['id'], employee['per_no']))
+            days = [True] + [self.random.random() < 0.9 for _ in range(program['duration_days'] - 1)]
+            days += [None] * (3 - len(days))
+            start = program['start_date']
+            rows.append((
+                program['id'], start.strftime('%B'), get_pmo_month(start), get_cd_month(start),
+                start, program['end_date'], program['start_time'], program['end_time'],
+                min(8 * sum(1 for d in days if d), program['learning_hours']),
+                program['training_name'], program['pmo_training_category'], program['pl_category'],
+                program['brsr_sq_123_category'], program['program_type'], program['tni_status'],
+                program['location_hall'], program['faculty_1'],
+                employee['per_no'], employee['participants_name'], employee['bc_no'], employee['gender'],
+                employee['employee_group'], employee['department'], employee['factory'],
+                '98' + str(self.random.randint(10000000, 99999999)), 'bench', days[0], days[1], days[2],
+            ))
+        columns = ['program_id', 'calendar_month', 'month_report_pmo_21_20', 'month_cd_key_26_25',
+                   'start_date', 'end_date', 'start_time', 'end_time', 'learning_hours',
+                   'training_name', 'pmo_training_category', 'pl_category', 'brsr_sq_123_category',
+                   'calendar_need_base_reschedule', 'tni_non_tni', 'location_hall', 'faculty_1',
+                   'per_no', 'participants_name', 'bc_no', 'gender', 'employee_group', 'department', 'factory',
+                   'mobile_no', 'cordi_name', 'day_1_attendance', 'day_2_attendance', 'day_3_attendance']
+        return 'master_data', columns, rows
+
+    def tni_data(self):
+        """Training nominations per fiscal year; about half of them are later attended"""
+        tni_trainings = [t for t in self.trainings if t['tni_status'] == 'TNI'] or self.trainings
+        rows = []
+        for _ in range(self.rows // 2):
+            employee = self.random.choice(self.employees)
+            training = self.random.choice(tni_trainings)
+            year = self.random.choices(self.fiscal_years, self.year_weights)[0]
+            rows.append((employee['per_no'], employee['participants_name'], employee['factory'], employee['bc_no'],
+                         training['training_name'], training['learning_hours'], year))
+        return 'tni_data', ['per_no', 'name', 'factory', 'bc_no', 'training_name', 'hours', 'year'], rows
+
+    def feedback_responses(self):
+        rows = []
+        for _ in range(max(100, self.rows // 10)):
+            program = self.random.choice(self.programs)
+            employee = self.random.choice(self.employees)
+            scores = [self.random.choices([1, 2, 3, 4, 5], [1, 2, 5, 10, 8])[0] for _ in range(16)]
+            rows.append((
+                program['id'], program['training_name'], program['start_date'], employee['per_no'],
+                employee['participants_name'], employee['bc_no'], employee['gender'], employee['employee_group'],
+                employee['department'], employee['factory'], *scores[:12],
+                program['pmo_training_category'], program['pl_category'], program['brsr_sq_123_category'],
+                program['tni_status'], program['learning_hours'], program['faculty_1'], *scores[12:],
+            ))
+        columns = ['program_id', 'program_title', 'program_date', 'per_no', 'participants_name', 'bc_no',
+                   'gender', 'employee_group', 'department', 'factory',
+                   'sec1_q1', 'sec1_q2', 'sec2_q1', 'sec2_q2', 'sec2_q3', 'sec3_q1',
+                   'sec5_q1', 'sec5_q2', 'sec6_q1', 'sec6_q2', 'sec7_q1', 'sec7_q2',
+                   'pmo_training_category', 'pl_category', 'brsr_sq_123_category', 'tni_status', 'learning_hours',
+                   'trainer1_name', 'trainer1_q1', 'trainer1_q2', 'trainer1_q3', 'trainer1_q4']
+        return 'feedback_responses', columns, rows
+
+    def tables(self):
+        """(table, columns, rows) in dependency order"""
+        return [self.eor_data(), self.training_names(), self.training_programs(),
+                self.master_data(), self.tni_data(), self.feedback_responses()]
+
+
+def build(rows, seed=42, years=3):
+    """Create and fill the scratch database; returns {'tables': {table: rows}, 'program_id': ...}"""
+    if not 10000 <= rows <= 1000000:
+        raise ValueError("rows must be between 10,000 and 1,000,000")
+    if BENCH_DB_NAME == Config.DB_NAME:
+        raise ValueError("The benchmark database must not be the live database")
+    conn = connect()
+    try:
+        copy_schema(conn, Config.DB_NAME, BENCH_DB_NAME)
+        conn.select_db(BENCH_DB_NAME)
+        migrate(conn)
+        generator = Generator(rows, seed, years)
+        counts = {}
+        for table, columns, data in generator.tables():
+            started = time.perf_counter()
+            counts[table] = insert_rows(conn, table, columns, data)
+            print(f"{table}: {counts[table]} rows in {time.perf_counter() - started:.1f}s")
+        with conn.cursor() as cursor:
+            for table in counts:
+                cursor.execute(f"ANALYZE TABLE {table}")
+        return {'tables': counts, 'program_id': generator.bench_program_id}
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000, help='master_data rows (10k-1M)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--years', type=int, default=3, help='fiscal years of history')
+    args = parser.parse_args()
+    try:
+        summary = build(args.rows, args.seed, args.years)
+    except ValueError as e:
+        sys.exit(str(e))
+    print(f"Built {BENCH_DB_NAME}: {summary['tables']}; check-in program id {summary['program_id']}")
@@ -0,0 +1,379 @@
+"""Time the dashboard, attendance, export and upload routes against the scratch database.
+
+Requests go through the Flask test client with an Admin session, so the full
+request path (hooks, pool, templates, Excel writers) is measured without a
+browser or network. Build the data first with bench.datagen, then:
+
+    python -m bench.runner run [--iterations 20] [--only master_data,ciro_dashboard] [--profile] [--out results.json]
+    python -m bench.runner compare before.json after.json [--threshold 10]
+
+"run" writes median/p95 and the number of queries one request issues per
+scenario as JSON; "compare" prints the change in median between two result
+files and exits 1 if any scenario slowed down by more than --threshold percent.
+The same scenarios run under pytest-benchmark in tests/test_bench_routes.py.
+"""
+import argparse
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+import query_profiler
+from bench import BENCH_DB_NAME
+from utils import Config, get_db_connection
+
+JOB_POLL_INTERVAL = 0.05  # Seconds between status polls while an upload job runs
+JOB_TIMEOUT = 600
+
+GENERATED_TABLES = ('eor_data', 'training_names', 'training_programs', 'master_data', 'tni_data',
+                    'feedback_responses')
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+def server_timing_db_ms(response):
+    """db duration from the query profiler's Server-Timing header, if profiling"""
+    for value in response.headers.getlist('Server-Timing'):
+        if value.startswith('db;dur='):
+            return float(value.split(';')[1].split('=')[1])
+    return None
+
+
+def server_timing_queries(response):
+    """Query count from the query profiler's Server-Timing header, if profiling"""
+    for value in response.headers.getlist('Server-Timing'):
+        if value.startswith('db;dur=') and 'desc="' in value:
+            return int(value.split('desc="')[1].split()[0])
+    return None
+
+
+class Context:
+    """Employees, programs and workbooks the scenarios draw from"""
+
+    def __init__(self, client):
+        self.client = client
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT * FROM eor_data ORDER BY per_no")
+                self.employees = cursor.fetchall()
+                cursor.execute("""
+                    SELECT MAX(id) AS id FROM training_programs
+                    WHERE start_date = CURDATE() AND start_time = '00:00:00'
+                """)
+                self.program_id = cursor.fetchone()['id']
+                cursor.execute("""
+                    SELECT factory, COUNT(*) AS n FROM master_data GROUP BY factory ORDER BY n DESC LIMIT 1
+                """)
+                self.top_factory = (cursor.fetchone() or {}).get('factory')
+                # The program whose training has the most nominees in one factory drives the factory-data pages
+                cursor.execute("""
+                    SELECT tp.id, n.factory
+                    FROM (
+                        SELECT training_name, factory, COUNT(*) AS n FROM tni_data
+                        GROUP BY training_name, factory ORDER BY n DESC LIMIT 1
+                    ) n
+                    JOIN training_programs tp ON tp.training_name = n.training_name
+                    ORDER BY tp.id DESC LIMIT 1
+                """)
+                tni_program = cursor.fetchone() or {}
+                self.tni_program_id = tni_program.get('id')
+                self.tni_factory = tni_program.get('factory')
+                self.row_counts = {}
+                for table in GENERATED_TABLES:
+                    cursor.execute(f"SELECT COUNT(*) AS n FROM {table}")
+                    self.row_counts[table] = cursor.fetchone()['n']
+        finally:
+            conn.close()
+        if not self.employees or not self.program_id:
+            raise RuntimeError(f"{BENCH_DB_NAME} has no synthetic data; run python -m bench.datagen first")
+        self._next_employee = 0
+        self.eor_workbook = self._workbook({
+            'PER NO': [e['per_no'] for e in self.employees],
+            'Employee Name': [e['participants_name'] for e in self.employees],
+            'FACTORY': [e['factory'] for e in self.employees],
+            'Department': [e['department'] for e in self.employees],
+            'Gender': [e['gender'] for e in self.employees],
+            'Employee Group': [e['employee_group'] for e in self.employees],
+            'Employee Subgroup': [e['employee_subgroup'] for e in self.employees],
+            'Cost ctr': [e['bc_no'] for e in self.employees],
+        })
+        sample = self.employees[:5000]
+        self.induction_workbook = self._workbook({
+            'Ticket Number': [e['per_no'] for e in sample],
+            'Name': [e['participants_name'] for e in sample],
+            'Gender': [e['gender'] for e in sample],
+            'Plant Location': [e['factory'] for e in sample],
+            'Training Name': ['Induction'] * len(sample),
+            'Learning Hours': [8] * len(sample),
+        })
+
+    @staticmethod
+    def _workbook(columns):
+        buffer = io.BytesIO()
+        pd.DataFrame(columns).to_excel(buffer, index=False)
+        return buffer.getvalue()
+
+    def next_employee(self):
+        """Employees in turn, so each check-in is a first check-in until the list wraps"""
+        employee = self.employees[self._next_employee % len(self.employees)]
+        self._next_employee += 1
+        return employee
+
+    @contextmanager
+    def factory_session(self, factory):
+        """Run requests as a factory user, then switch back to the plain Admin session"""
+        with self.client.session_transaction() as sess:
+            sess['factory_location'] = factory
+        try:
+            yield
+        finally:
+            with self.client.session_transaction() as sess:
+                sess['factory_location'] = None
+
+    def wait_for_job(self, status_url):
+        deadline = time.monotonic() + JOB_TIMEOUT
+        while time.monotonic() < deadline:
+            job = self.client.get(status_url).get_json()
+            if job['status'] in ('succeeded', 'failed', 'cancelled'):
+                if job['status'] != 'succeeded':
+                    raise RuntimeError(f"Job {job['status']}: {job['message']}")
+                return job
+            time.sleep(JOB_POLL_INTERVAL)
+        raise RuntimeError(f"Job did not finish within {JOB_TIMEOUT}s")
+
+
+def master_data(ctx):
+    return ctx.client.get('/master_data')
+
+
+def master_data_factory(ctx):
+    return ctx.client.get('/master_data', query_string={'factory': ctx.top_factory})
+
+
+def check_per_no(ctx):
+    return ctx.client.post('/attendance/check_per_no', data={'per_no': ctx.next_employee()['per_no']})
+
+
+def submit_attendance(ctx):
+    return ctx.client.post('/attendance/submit_attendance', json={
+        'per_no': ctx.next_employee()['per_no'],
+        'mobile_no': '9876543210',
+        'program_id': str(ctx.program_id),
+        'cordi_name': 'bench',
+    })
+
+
+def ciro_dashboard(ctx):
+    return ctx.client.get('/ciro/dashboard')
+
+
+def download_excel(ctx):
+    return ctx.client.get('/download_excel')
+
+
+def download_pending_eor(ctx):
+    return ctx.client.get('/download_pending_eor')
+
+
+def factory_training(ctx):
+    with ctx.factory_session(ctx.tni_factory):
+        return ctx.client.post('/factory-data/', data={'training_id': ctx.tni_program_id})
+
+
+def download_factory_data(ctx):
+    with ctx.factory_session(ctx.tni_factory):
+        return ctx.client.post('/factory-data/download', data={'training_id': ctx.tni_program_id})
+
+
+def upload_eor(ctx):
+    response = ctx.client.post('/upload_eor', data={
+        'file_type': 'eor', 'file': (io.BytesIO(ctx.eor_workbook), 'eor_data.xlsx')})
+    if response.status_code != 302 or '/jobs/' not in response.location:
+        return response
+    job_id = response.location.rstrip('/').rsplit('/', 1)[-1]
+    ctx.wait_for_job(f'/jobs/{job_id}?format=json')
+    return response
+
+
+def upload_induction(ctx):
+    response = ctx.client.post('/cd_data_store/api/upload/induction', data={
+        'file': (io.BytesIO(ctx.induction_workbook), 'induction.xlsx')})
+    if response.status_code != 202:
+        return response
+    ctx.wait_for_job(response.get_json()['status_url'])
+    return response
+
+
+# name -> (scenario, expected status, iterations override); uploads are slow, so fewer runs
+SCENARIOS = {
+    'master_data': (master_data, 200, None),
+    'master_data_factory': (master_data_factory, 200, None),
+    'check_per_no': (check_per_no, 200, None),
+    'submit_attendance': (submit_attendance, 200, None),
+    'ciro_dashboard': (ciro_dashboard, 200, None),
+    'download_excel': (download_excel, 200, 5),
+    'download_pending_eor': (download_pending_eor, 200, 5),
+    'factory_training': (factory_training, 200, None),
+    'download_factory_data': (download_factory_data, 200, 5),
+    'upload_eor': (upload_eor, 302, 3),
+    'upload_induction': (upload_induction, 202, 3),
+}
+
+
+def run_scenario(ctx, func, expected_status, iterations, warmup):
+    timings, db_timings, errors = [], [], []
+    for i in range(warmup + iterations):
+        started = time.perf_counter()
+        try:
+            response = func(ctx)
+        except Exception as e:
+            errors.append(str(e))
+            continue
+        elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code != expected_status:
+            errors.append(f"HTTP {response.status_code}")
+            continue
+        if i < warmup:
+            continue
+        timings.append(elapsed)
+        db_ms = server_timing_db_ms(response)
+        if db_ms is not None:
+            db_timings.append(db_ms)
+    result = {'iterations': len(timings), 'errors': errors[:5], 'error_count': len(errors)}
+    if timings:
+        result.update({
+            'median_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'min_ms': round(min(timings), 2),
+            'max_ms': round(max(timings), 2),
+        })
+    if db_timings:
+        result['db_median_ms'] = round(statistics.median(db_timings), 2)
+    result['queries'] = count_queries(ctx, func, expected_status)
+    return result
+
+
+def count_queries(ctx, func, expected_status):
+    """Queries issued by one more request, profiled even when the timed runs were not"""
+    was_enabled = query_profiler.is_enabled()
+    query_profiler.enable()
+    try:
+        response = func(ctx)
+    except Exception:
+        return None
+    finally:
+        if not was_enabled:
+            query_profiler.disable()
+    if response.status_code != expected_status:
+        return None
+    return server_timing_queries(response)
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(app, names, iterations, warmup, profile):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess.update({'logged_in': True, 'user_id': 0, 'username': 'bench', 'role': 'Admin',
+                     'factory_location': None})
+    if profile:
+        query_profiler.enable()
+    ctx = Context(client)
+    results = {}
+    for name in names:
+        func, expected_status, override = SCENARIOS[name]
+        results[name] = run_scenario(ctx, func, expected_status, override or iterations, warmup)
+        summary = results[name]
+        print(f"{name:24} median {summary.get('median_ms', '-'):>10} ms  p95 {summary.get('p95_ms', '-'):>10} ms"
+              f"  queries {summary.get('queries') or '-':>5}  errors {summary['error_count']}")
+    return {
+        'meta': {
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'database': BENCH_DB_NAME,
+            'rows': ctx.row_counts,
+            'iterations': iterations,
+            'warmup': warmup,
+            'profiled': profile,
+            'python': platform.python_version(),
+        },
+        'results': results,
+    }
+
+
+def compare(before, after, threshold):
+    """Print the median change per scenario; returns the names that regressed beyond threshold %"""
+    if before['meta'].get('rows') != after['meta'].get('rows'):
+        print("Warning: the runs used different data sizes")
+    regressions = []
+    print(f"{'scenario':24} {'before ms':>10} {'after ms':>10} {'change':>8} {'queries':>11}")
+    for name, result in after['results'].items():
+        old = before['results'].get(name, {}).get('median_ms')
+        new = result.get('median_ms')
+        queries = f"{before['results'].get(name, {}).get('queries') or '-'} -> {result.get('queries') or '-'}"
+        if old is None or new is None:
+            print(f"{name:24} {old or '-':>10} {new or '-':>10} {'n/a':>8} {queries:>11}")
+            continue
+        change = (new - old) / old * 100 if old else 0.0
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:24} {old:>10.1f} {new:>10.1f} {change:>+7.1f}% {queries:>11}{flag}")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    run_parser = sub.add_parser('run')
+    run_parser.add_argument('--iterations', type=int, default=20)
+    run_parser.add_argument('--warmup', type=int, default=2)
+    run_parser.add_argument('--only', help='comma-separated scenario names: ' + ', '.join(SCENARIOS))
+    run_parser.add_argument('--profile', action='store_true', help='also record db time via the query profiler')
+    run_parser.add_argument('--out', default='bench_results.json')
+    compare_parser = sub.add_parser('compare')
+    compare_parser.add_argument('before')
+    compare_parser.add_argument('after')
+    compare_parser.add_argument('--threshold', type=float, default=10.0, help='percent slowdown that fails')
+    args = parser.parse_args()
+
+    if args.command == 'compare':
+        with open(args.before, encoding='utf-8') as f:
+            before = json.load(f)
+        with open(args.after, encoding='utf-8') as f:
+            after = json.load(f)
+        sys.exit(1 if compare(before, after, args.threshold) else 0)
+
+    names = args.only.split(',') if args.only else list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        sys.exit(f"Unknown scenarios: {', '.join(unknown)}")
+
+    # Point the pool at the scratch database before the app is imported or connects
+    Config.DB_NAME = BENCH_DB_NAME
+    from admin_app import app
+    from view_master_data import view_bp
+    app.register_blueprint(view_bp)
+
+    report = run(app, names, args.iterations, args.warmup, args.profile)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.out}")
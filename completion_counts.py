@@ -0,0 +1,268 @@
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from fiscal_calendar import ytd_divisor
+from utils import get_db_connection
+
+FISCAL_MONTHS = ['april', 'may', 'june', 'july', 'august', 'september',
+                 'october', 'november', 'december', 'january', 'february', 'march']
+
+
+def normalize_training_name(name):
+    """Normalize training name for comparison by removing extra spaces and special characters"""
+    if not name:
+        return ""
+    # Convert to lowercase, remove extra spaces, and normalize special characters
+    normalized = ' '.join(name.lower().split())
+    # Replace common special characters with standard equivalents
+    normalized = normalized.replace('&', 'and')
+    normalized = normalized.replace('+', 'plus')
+    normalized = normalized.replace('-', ' ')
+    return normalized
+
+
+def get_month_index():
+    """Get the current month index where April=1, May=2, ..., January=10"""
+    return ytd_divisor()
+
+
+_tables_ready = False
+_summary_built = False
+
+
+def ensure_completion_tables(cursor):
+    """Create the materialized attendance summary and its refresh log if missing"""
+    global _tables_ready
+    if _tables_ready:
+        return
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS training_completion_summary (
+            training_name VARCHAR(255) NOT NULL DEFAULT '',
+            pmo_category VARCHAR(255) NOT NULL DEFAULT '',
+            pl_category VARCHAR(255) NOT NULL DEFAULT '',
+            calendar_month VARCHAR(20) NOT NULL DEFAULT '',
+            attendance_count INT NOT NULL DEFAULT 0,
+            UNIQUE KEY uq_completion_group (training_name(150), pmo_category(50), pl_category(50), calendar_month)
+        ) CHARACTER SET utf8mb4
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS training_completion_refresh_log (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            refreshed_at DATETIME NOT NULL,
+            duration_ms INT NOT NULL,
+            mode VARCHAR(20) NOT NULL,
+            trainings_updated INT NOT NULL DEFAULT 0
+        )
+    """)
+    _tables_ready = True
+
+
+def refresh_summary(cursor, training_names=None):
+    """Rebuild summary groups from master_data, for all trainings or only the given names"""
+    query = """
+        INSERT INTO training_completion_summary
+            (training_name, pmo_category, pl_category, calendar_month, attendance_count)
+        SELECT
+            IFNULL(training_name, ''),
+            IFNULL(pmo_training_category, ''),
+            IFNULL(pl_category, ''),
+            calendar_month,
+            COUNT(DISTINCT per_no)
+        FROM master_data
+        WHERE calendar_month IS NOT NULL
+    """
+    params = []
+    if training_names is None:
+        cursor.execute("DELETE FROM training_completion_summary")
+    else:
+        placeholders = ', '.join(['%s'] * len(training_names))
+        cursor.execute(f"DELETE FROM training_completion_summary WHERE training_name IN ({placeholders})",
+                       list(training_names))
+        query += f" AND training_name IN ({placeholders})"
+        params = list(training_names)
+    # Group on the IFNULL()ed values so NULL and '' land in the same summary row
+    query += " GROUP BY 1, 2, 3, 4"
+    cursor.execute(query, params)
+
+
+def build_training_map(target_trainings):
+    """Index training_targets rows by (name, pmo, pl) with progressively looser keys"""
+    training_map = {}
+    for training in target_trainings:
+        normalized_name = normalize_training_name(training['training_name'])
+        keys = [
+            (normalized_name, training['pmo_category'], training['pl_category']),
+            (normalized_name, training['pmo_category'], None),
+            (normalized_name, None, training['pl_category']),
+            (normalized_name, None, None)
+        ]
+        for key in keys:
+            training_map.setdefault(key, []).append(training)
+    return training_map
+
+
+def match_training(training_map, record):
+    """Return the training_targets row a summary group counts towards, or None"""
+    name = normalize_training_name(record['training_name'])
+    pmo = record['pmo_category'].strip() or None
+    pl = record['pl_category'].strip() or None
+    for key in [(name, pmo, pl), (name, pmo, None), (name, None, pl), (name, None, None)]:
+        if key in training_map:
+            return training_map[key][0]
+    return None
+
+
+def apply_summary_to_targets(cursor, target_year, training_names=None):
+    """Roll the summary up into training_targets month columns for target_year.
+
+    With training_names, only the targets those names map to are rewritten;
+    every summary group is still read so targets fed by several spellings of a
+    training name get their full count.
+    """
+    cursor.execute("""
+        SELECT id, training_name, pmo_category, pl_category, target, batch_size
+        FROM training_targets
+        WHERE target_year = %s
+    """, (target_year,))
+    target_trainings = cursor.fetchall()
+    training_map = build_training_map(target_trainings)
+
+    cursor.execute("""
+        SELECT training_name, pmo_category, pl_category, calendar_month, attendance_count
+        FROM training_completion_summary
+    """)
+    month_counts = defaultdict(lambda: defaultdict(int))
+    unmatched = set()
+    affected = set()
+    touched = {normalize_training_name(n) for n in training_names} if training_names is not None else None
+
+    for record in cursor.fetchall():
+        month = record['calendar_month'].lower().strip()
+        if not month:
+            continue
+        training = match_training(training_map, record)
+        if training is None:
+            unmatched.add(record['training_name'])
+            continue
+        month_counts[training['id']][month] += record['attendance_count']
+        if touched is not None and normalize_training_name(record['training_name']) in touched:
+            affected.add(training['id'])
+
+    if unmatched and training_names is None:
+        print(f"Warning: {len(unmatched)} training names from master_data could not be matched "
+              f"(see /target/validate_training_names)")
+
+    month_index = get_month_index()
+    updates = []
+    for training in target_trainings:
+        if touched is not None and training['id'] not in affected:
+            continue
+        counts = month_counts.get(training['id'], {})
+        ytd_actual = sum(counts.values())
+        target = training['target'] or 0
+        batch_size = training['batch_size'] or 0
+        balance = max(target - ytd_actual, 0) if target else 0
+        programs_to_run = round(balance / batch_size, 1) if batch_size > 0 else 0
+        ytd_target = (target // 10) * month_index if target else 0
+        updates.append((ytd_actual, balance, programs_to_run, ytd_target,
+                        *[counts.get(month, 0) for month in FISCAL_MONTHS], training['id']))
+
+    if updates:
+        cursor.executemany("""
+            UPDATE training_targets
+            SET
+                ytd_actual=%s, balance=%s, programs_to_run=%s, ytd_target=%s,
+                april=%s, may=%s, june=%s, july=%s, august=%s, september=%s,
+                october=%s, november=%s, december=%s, january=%s, february=%s, march=%s
+            WHERE id=%s
+        """, updates)
+    return len(updates)
+
+
+def summary_built(cursor):
+    """Whether a full refresh has ever filled training_completion_summary; only True is remembered"""
+    global _summary_built
+    if not _summary_built:
+        cursor.execute("SELECT 1 FROM training_completion_refresh_log WHERE mode = 'full' LIMIT 1")
+        _summary_built = cursor.fetchone() is not None
+    return _summary_built
+
+
+def refresh_completion_counts(training_names=None, target_year=None, conn=None):
+    """Refresh the materialized completion counts and record a timestamped log entry.
+
+    training_names=None rebuilds everything; otherwise only the listed master_data
+    training names are recounted (used after attendance inserts and uploads).
+    An incremental refresh before the first full one (migration 10) does a full
+    rebuild instead, since the other trainings would be missing from the summary.
+    Returns (trainings_updated, duration_ms).
+    """
+    if target_year is None:
+        target_year = datetime.now().year
+    if training_names is not None:
+        training_names = sorted({name for name in training_names if name})
+        if not training_names:
+            return 0, 0
+
+    started = time.perf_counter()
+    own_conn = conn is None
+    conn = conn or get_db_connection()
+    try:
+        # DDL commits implicitly, so create the tables before opening the transaction
+        with conn.cursor() as cursor:
+            ensure_completion_tables(cursor)
+            if training_names is not None and not summary_built(cursor):
+                training_names = None
+        conn.begin()
+        with conn.cursor() as cursor:
+            refresh_summary(cursor, training_names)
+            updated = apply_summary_to_targets(cursor, target_year, training_names)
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            cursor.execute("""
+                INSERT INTO training_completion_refresh_log (refreshed_at, duration_ms, mode, trainings_updated)
+                VALUES (NOW(), %s, %s, %s)
+            """, (duration_ms, 'full' if training_names is None else 'incremental', updated))
+        conn.commit()
+        return updated, duration_ms
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def completion_summary_step(conn):
+    """Migration step: create the completion tables and do the first full refresh"""
+    updated, duration_ms = refresh_completion_counts(conn=conn)
+    return f"training_completion_summary built, {updated} targets updated in {duration_ms} ms"
+
+
+def refresh_after_attendance(training_names):
+    """Incremental refresh hook for attendance writes; never fails the caller"""
+    try:
+        refresh_completion_counts(training_names)
+    except Exception as e:
+        print(f"Error refreshing training completion counts: {e}")
+
+
+def get_last_refresh():
+    """Latest full and incremental refresh entries for display on the dashboard"""
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            ensure_completion_tables(cursor)
+            cursor.execute("""
+                SELECT mode, refreshed_at, duration_ms, trainings_updated
+                FROM training_completion_refresh_log
+                WHERE id IN (
+                    SELECT MAX(id) FROM training_completion_refresh_log GROUP BY mode
+                )
+            """)
+            return {row['mode']: row for row in cursor.fetchall()}
+    except Exception as e:
+        print(f"Error reading completion refresh log: {e}")
+        return {}
+    finally:
+        conn.close()
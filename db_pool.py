@@ -0,0 +1,255 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pymysql
+import pymysql.cursors
+from flask import g
+from pymysql.constants import SERVER_STATUS
+
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection becomes available within the checkout timeout"""
+
+
+class PooledConnection:
+    """Thin proxy around a PyMySQL connection that returns it to the pool on close()"""
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._released = False
+        self._session_vars = []  # Session variables to restore before the connection is pooled again
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._raw.cursor(*args, **kwargs)
+        # The cursor keeps this proxy alive, so get_db_connection().cursor() cannot hand the
+        # connection back to the pool (through __del__) while the cursor is still in use
+        cursor._pooled_connection = self
+        # Set by query_profiler while profiling is on; otherwise a plain PyMySQL cursor
+        return _cursor_wrapper(cursor) if _cursor_wrapper else cursor
+
+    def set_session(self, variable, value_sql):
+        """SET SESSION variable = value_sql for this borrower only.
+
+        The previous value is saved in a user variable and restored when the
+        connection goes back to the pool, so the next borrower gets the defaults.
+        """
+        with self._raw.cursor() as cursor:
+            if variable in self._session_vars:
+                cursor.execute(f"SET SESSION {variable} = {value_sql}")
+            else:
+                # Assignments run left to right, so the saved value is the old one
+                cursor.execute(f"SET @pool_saved_{variable} = @@SESSION.{variable}, SESSION {variable} = {value_sql}")
+                self._session_vars.append(variable)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Return the connection to the pool instead of closing the socket"""
+        if self._released:
+            return
+        self._released = True
+        self._pool._release(self._raw, self._created_at, self._session_vars)
+
+    def __del__(self):
+        # Safety net for callers that never close; runs only once no cursor of this
+        # connection is referenced any more
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of PyMySQL connections.
+
+    Idle connections are pinged before reuse once they have been idle longer than
+    ping_interval seconds, and connections older than recycle seconds are closed
+    and replaced.
+    """
+
+    def __init__(self, connect_kwargs, max_size=10, timeout=30, recycle=3600, ping_interval=30):
+        self.connect_kwargs = connect_kwargs
+        self.max_size = max_size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_interval = ping_interval
+        self._idle = deque()
+        self._lock = threading.RLock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._stats = {
+            'checkouts': 0,
+            'created': 0,
+            'recycled': 0,
+            'failed_pings': 0,
+            'timeouts': 0,
+            'wait_time_total': 0.0,
+            'in_use': 0,
+        }
+
+    def _connect(self):
+        raw = pymysql.connect(**self.connect_kwargs)
+        with self._lock:
+            self._stats['created'] += 1
+        return raw, time.monotonic()
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _healthy(self, raw, created_at, idle_since):
+        """Check lifetime and liveness of an idle connection before handing it out"""
+        now = time.monotonic()
+        if self.recycle and now - created_at > self.recycle:
+            with self._lock:
+                self._stats['recycled'] += 1
+            return False
+        if now - idle_since > self.ping_interval:
+            try:
+                raw.ping(reconnect=False)
+            except Exception:
+                with self._lock:
+                    self._stats['failed_pings'] += 1
+                return False
+        return True
+
+    def acquire(self):
+        """Check out a connection, blocking up to the pool timeout"""
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats['timeouts'] += 1
+            raise PoolTimeout(f"No database connection available after {self.timeout}s")
+
+        try:
+            raw = None
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    candidate, created_at, idle_since = self._idle.pop()
+                if self._healthy(candidate, created_at, idle_since):
+                    raw = candidate
+                    break
+                self._discard(candidate)
+
+            if raw is None:
+                raw, created_at = self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._stats['checkouts'] += 1
+            self._stats['in_use'] += 1
+            self._stats['wait_time_total'] += time.monotonic() - started
+        return PooledConnection(self, raw, created_at)
+
+    def _release(self, raw, created_at, session_vars=()):
+        """Reset a returned connection and pool it, or discard it if it cannot be reset"""
+        try:
+            keep = raw.open
+            # A begin() without commit/rollback (failed upload, cancelled job) must not reach the next borrower
+            if keep and raw.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+                raw.rollback()
+            if keep and session_vars:
+                with raw.cursor() as cursor:
+                    cursor.execute("SET " + ", ".join(
+                        f"SESSION {variable} = @pool_saved_{variable}" for variable in session_vars))
+        except Exception:
+            keep = False
+
+        with self._lock:
+            self._stats['in_use'] -= 1
+            if keep:
+                self._idle.append((raw, created_at, time.monotonic()))
+        if not keep:
+            self._discard(raw)
+        self._slots.release()
+
+    def dispose(self):
+        """Close every idle connection (checked-out connections close on return)"""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for raw, _, _ in idle:
+            self._discard(raw)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['idle'] = len(self._idle)
+        stats['max_size'] = self.max_size
+        stats['avg_wait_ms'] = round(stats['wait_time_total'] / stats['checkouts'] * 1000, 2) if stats['checkouts'] else 0
+        return stats
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_cursor_wrapper = None
+
+
+def set_cursor_wrapper(wrapper):
+    """Wrap every cursor handed out by pooled connections (None to stop)"""
+    global _cursor_wrapper
+    _cursor_wrapper = wrapper
+
+
+def get_pool():
+    """Return the process-wide pool, creating it from utils.Config on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                from utils import Config
+                _pool = ConnectionPool(
+                    connect_kwargs={
+                        'host': Config.DB_HOST,
+                        'user': Config.DB_USER,
+                        'password': Config.DB_PASSWORD,
+                        'db': Config.DB_NAME,
+                        'charset': 'utf8mb4',
+                        'cursorclass': pymysql.cursors.DictCursor,
+                        'autocommit': True,
+                    },
+                    max_size=Config.DB_POOL_SIZE,
+                    timeout=Config.DB_POOL_TIMEOUT,
+                    recycle=Config.DB_POOL_RECYCLE,
+                    ping_interval=Config.DB_POOL_PING_INTERVAL,
+                )
+    return _pool
+
+
+def get_request_connection():
+    """Return the connection bound to the current request, checking one out on first use"""
+    if 'db_conn' not in g:
+        g.db_conn = get_pool().acquire()
+    return g.db_conn
+
+
+@contextmanager
+def request_connection():
+    """Context manager over the request-scoped connection; it is returned on teardown"""
+    yield get_request_connection()
+
+
+def release_request_connection(exc=None):
+    conn = g.pop('db_conn', None)
+    if conn is not None:
+        conn.close()
+
+
+def init_app(app):
+    """Return the request-scoped connection to the pool when the app context ends"""
+    app.teardown_appcontext(release_request_connection)
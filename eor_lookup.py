@@ -0,0 +1,175 @@
+import threading
+import time
+from collections import OrderedDict
+
+EOR_FIELDS = ('participants_name', 'bc_no', 'gender', 'employee_group', 'department', 'factory')
+
+_MISSING = object()
+
+
+def normalize_per_no(per_no):
+    return str(per_no).strip() if per_no is not None else ''
+
+
+def format_employee(row):
+    """Shape an eor_data row the way the attendance forms expect it"""
+    return {field: str(row.get(field) or '') for field in EOR_FIELDS}
+
+
+class EorLookup:
+    """Point lookups of employees in eor_data by per_no.
+
+    By default each per_no is fetched with an indexed point query and kept in an
+    LRU cache for ttl seconds (misses are cached too, so repeated bad scans do not
+    hit the database). In snapshot mode the whole table is loaded once into a dict
+    and every lookup is served from memory until the snapshot expires or the EOR
+    file is re-uploaded.
+    """
+
+    def __init__(self, max_size=5000, ttl=300, snapshot=False):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.snapshot_mode = snapshot
+        self._cache = OrderedDict()
+        self._snapshot = None
+        self._snapshot_loaded_at = 0
+        self._generation = 0  # Bumped by invalidate(); results read before a bump are not stored
+        self._lock = threading.RLock()
+        self._stats = {'hits': 0, 'misses': 0, 'queries': 0, 'snapshot_loads': 0}
+
+    def _connect(self):
+        from utils import get_db_connection
+        return get_db_connection()
+
+    def _query(self, per_no):
+        conn = self._connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT per_no, participants_name, factory, department, gender,
+                           employee_group, employee_subgroup, bc_no
+                    FROM eor_data
+                    WHERE per_no = %s
+                    LIMIT 1
+                """, (per_no,))
+                row = cursor.fetchone()
+        finally:
+            conn.close()
+        with self._lock:
+            self._stats['queries'] += 1
+        return format_employee(row) if row else None
+
+    def _read_snapshot(self):
+        conn = self._connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT per_no, participants_name, factory, department, gender,
+                           employee_group, employee_subgroup, bc_no
+                    FROM eor_data
+                """)
+                snapshot = {}
+                for row in cursor.fetchall():
+                    # Keep the first record per employee, matching the old linear scan
+                    snapshot.setdefault(normalize_per_no(row['per_no']), format_employee(row))
+        finally:
+            conn.close()
+        return snapshot
+
+    def load_snapshot(self):
+        """Load every employee into an in-memory dict keyed by per_no"""
+        while True:
+            with self._lock:
+                generation = self._generation
+            snapshot = self._read_snapshot()
+            with self._lock:
+                self._stats['snapshot_loads'] += 1
+                # Read again if an EOR reload invalidated the cache while this one ran
+                if generation == self._generation:
+                    self._snapshot = snapshot
+                    self._snapshot_loaded_at = time.monotonic()
+                    return len(snapshot)
+
+    def _snapshot_expired(self):
+        return self._snapshot is None or (self.ttl and time.monotonic() - self._snapshot_loaded_at > self.ttl)
+
+    def get(self, per_no):
+        """Return the employee details for per_no, or None if not in EOR"""
+        key = normalize_per_no(per_no)
+        if not key:
+            return None
+
+        if self.snapshot_mode:
+            if self._snapshot_expired():
+                self.load_snapshot()
+            with self._lock:
+                employee = self._snapshot.get(key)
+                self._stats['hits' if employee else 'misses'] += 1
+            return dict(employee) if employee else None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key, _MISSING)
+            if entry is not _MISSING and now - entry[1] <= self.ttl:
+                self._cache.move_to_end(key)
+                self._stats['hits'] += 1
+                return dict(entry[0]) if entry[0] else None
+            self._stats['misses'] += 1
+            generation = self._generation
+
+        employee = self._query(key)
+        with self._lock:
+            # Do not cache a row read before an EOR reload invalidated the cache
+            if generation == self._generation:
+                self._cache[key] = (employee, now)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_size:
+                    self._cache.popitem(last=False)
+        return dict(employee) if employee else None
+
+    def set_snapshot_mode(self, enabled):
+        """Switch between point-query/LRU mode and preloaded snapshot mode"""
+        with self._lock:
+            self.snapshot_mode = enabled
+            self._snapshot = None
+        if enabled:
+            self.load_snapshot()
+
+    def invalidate(self):
+        """Drop cached employees; called whenever eor_data is reloaded"""
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+            self._snapshot = None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['cached'] = len(self._cache)
+            stats['snapshot_size'] = len(self._snapshot) if self._snapshot is not None else 0
+        stats['mode'] = 'snapshot' if self.snapshot_mode else 'lru'
+        return stats
+
+
+_lookup = None
+_lookup_lock = threading.Lock()
+
+
+def get_eor_lookup():
+    """Return the process-wide EOR lookup, configured from utils.Config"""
+    global _lookup
+    if _lookup is None:
+        with _lookup_lock:
+            if _lookup is None:
+                from utils import Config
+                _lookup = EorLookup(
+                    max_size=Config.EOR_CACHE_SIZE,
+                    ttl=Config.EOR_CACHE_TTL,
+                    snapshot=Config.EOR_SNAPSHOT_MODE,
+                )
+    return _lookup
+
+
+def invalidate_eor_cache():
+    if _lookup is not None:
+        _lookup.invalidate()
@@ -0,0 +1,174 @@
+import csv
+import io
+import tempfile
+from decimal import Decimal
+
+import pymysql.cursors
+from flask import Response, request, stream_with_context
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment
+from openpyxl.utils import get_column_letter
+
+from utils import get_db_connection
+
+FETCH_CHUNK_SIZE = 2000  # Rows pulled per round trip from the server-side cursor
+WIDTH_SAMPLE_ROWS = 200  # Rows used to estimate column widths
+STREAM_CHUNK_BYTES = 64 * 1024
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+CSV_MIMETYPE = 'text/csv'
+
+
+def requested_format(default='xlsx'):
+    """Export format from ?format=csv|xlsx"""
+    fmt = (request.args.get('format') or default).lower()
+    return fmt if fmt in ('csv', 'xlsx') else default
+
+
+def stream_query(query, params=None, chunk_size=FETCH_CHUNK_SIZE):
+    """Yield rows of query one at a time from a server-side (unbuffered) cursor.
+
+    The generator owns its pooled connection and returns it once exhausted or closed.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor(pymysql.cursors.SSDictCursor)
+    try:
+        cursor.execute(query, params or ())
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def export_value(value):
+    """Cell value for export: numbers stay numeric, everything else becomes text"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (int, float)):
+        return value
+    return str(value)
+
+
+def estimate_widths(sample, keys, headers):
+    """Column widths from the header and a sample of rows instead of every cell"""
+    widths = []
+    for key, header in zip(keys, headers):
+        max_length = max([len(str(header))] + [len(str(export_value(r.get(key, '')))) for r in sample])
+        widths.append((max_length + 2) * 1.2)
+    return widths
+
+
+def _take(rows, n):
+    sample = []
+    for row in rows:
+        sample.append(row)
+        if len(sample) >= n:
+            break
+    return sample
+
+
+def write_xlsx(rows, column_headings, fileobj, title="Report", header_fill=None,
+               row_fill=None, cell_fill=None, freeze_header=False):
+    """Write rows to fileobj with a constant-memory (write-only) workbook.
+
+    row_fill(record) and cell_fill(key, value) may return a PatternFill to colour
+    a whole row or a single cell.
+    """
+    keys = list(column_headings.keys())
+    headers = list(column_headings.values())
+    rows = iter(rows)
+    sample = _take(rows, WIDTH_SAMPLE_ROWS)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title[:31])
+    for idx, width in enumerate(estimate_widths(sample, keys, headers), 1):
+        ws.column_dimensions[get_column_letter(idx)].width = width
+    if freeze_header:
+        ws.freeze_panes = 'A2'
+
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = Font(bold=True)
+        cell.alignment = Alignment(horizontal='center')
+        if header_fill:
+            cell.fill = header_fill
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    def all_rows():
+        yield from sample
+        yield from rows
+
+    styled = row_fill is not None or cell_fill is not None
+    for record in all_rows():
+        values = [export_value(record.get(key, '')) for key in keys]
+        if not styled:
+            ws.append(values)
+            continue
+        fill = row_fill(record) if row_fill else None
+        cells = []
+        for key, value in zip(keys, values):
+            cell = WriteOnlyCell(ws, value=value)
+            cell_style = cell_fill(key, value) if cell_fill else None
+            if cell_style or fill:
+                cell.fill = cell_style or fill
+            cells.append(cell)
+        ws.append(cells)
+
+    wb.save(fileobj)
+
+
+def iter_csv(rows, column_headings):
+    """Yield CSV text chunks (UTF-8 with BOM so Excel opens it correctly)"""
+    keys = list(column_headings.keys())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(column_headings.values())
+    for record in rows:
+        writer.writerow([export_value(record.get(key, '')) for key in keys])
+        if buffer.tell() >= STREAM_CHUNK_BYTES:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def iter_xlsx(rows, column_headings, **options):
+    """Build the workbook into a temporary file and yield it back in chunks"""
+    with tempfile.TemporaryFile() as tmp:
+        write_xlsx(rows, column_headings, tmp, **options)
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(STREAM_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+
+
+def export_response(rows, column_headings, filename, fmt=None, **options):
+    """Chunked download response for rows in CSV or XLSX from the same column spec.
+
+    filename is given without extension; options are passed to write_xlsx.
+    """
+    fmt = fmt or requested_format()
+    if fmt == 'csv':
+        body = iter_csv(rows, column_headings)
+        mimetype = CSV_MIMETYPE
+    else:
+        body = iter_xlsx(rows, column_headings, **options)
+        mimetype = XLSX_MIMETYPE
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    return response
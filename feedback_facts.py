@@ -0,0 +1,315 @@
+import sys
+from collections import OrderedDict
+
+import pymysql.cursors
+
+from filter_compiler import FilterCompiler, month_range
+from utils import get_db_connection
+
+# Per-response score expressions, identical to the ones the CIRO dashboard used inline
+CSI_EXPR = """(sec1_q1 + sec1_q2 + sec2_q1 + sec2_q2 + sec2_q3 + sec3_q1 +
+              sec5_q1 + sec5_q2 + sec6_q1 + sec6_q2 + sec7_q1 + sec7_q2)/12.0"""
+
+SCORE_EXPR = """(sec1_q1 + sec1_q2 + sec2_q1 + sec2_q2 + sec2_q3 + sec3_q1 +
+                COALESCE(trainer1_q1,0) + COALESCE(trainer1_q2,0) + COALESCE(trainer1_q3,0) + COALESCE(trainer1_q4,0) +
+                COALESCE(trainer2_q1,0) + COALESCE(trainer2_q2,0) + COALESCE(trainer2_q3,0) + COALESCE(trainer2_q4,0) +
+                COALESCE(trainer3_q1,0) + COALESCE(trainer3_q2,0) + COALESCE(trainer3_q3,0) + COALESCE(trainer3_q4,0) +
+                COALESCE(trainer4_q1,0) + COALESCE(trainer4_q2,0) + COALESCE(trainer4_q3,0) + COALESCE(trainer4_q4,0) +
+                sec5_q1 + sec5_q2 + sec6_q1 + sec6_q2 + sec7_q1 + sec7_q2) /
+               (12 +
+                CASE WHEN trainer1_q1 IS NOT NULL THEN 4 ELSE 0 END +
+                CASE WHEN trainer2_q1 IS NOT NULL THEN 4 ELSE 0 END +
+                CASE WHEN trainer3_q1 IS NOT NULL THEN 4 ELSE 0 END +
+                CASE WHEN trainer4_q1 IS NOT NULL THEN 4 ELSE 0 END)"""
+
+FACTS_KEY = 'uq_feedback_facts_grain'
+FACTS_MIGRATION = 8  # The migrations.py version that builds the table
+FACTS_KEY_COLUMNS = ['program_title', 'program_date', 'is_clubbed', 'trainer_slot', 'trainer_name']
+
+_facts_ready = False
+
+
+def create_feedback_facts_table(cursor):
+    """One row per program/date/clubbed flag/trainer with pre-summed score components.
+
+    trainer_slot 0 rows carry the response-level sums (CSI and overall score);
+    slots 1-4 carry the per-question sums for trainerN_name. The unique key on
+    that grain makes a racing refresh fail instead of double-counting a session.
+    """
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS feedback_facts (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            program_title VARCHAR(255) NOT NULL,
+            program_date DATE NOT NULL,
+            is_clubbed TINYINT(1) NOT NULL,
+            trainer_slot TINYINT NOT NULL,
+            trainer_name VARCHAR(255) NOT NULL DEFAULT '',
+            pmo_training_category VARCHAR(255),
+            pl_category VARCHAR(255),
+            brsr_sq_123_category VARCHAR(255),
+            response_count INT NOT NULL DEFAULT 0,
+            csi_sum DOUBLE NOT NULL DEFAULT 0,
+            csi_n INT NOT NULL DEFAULT 0,
+            score_sum DOUBLE NOT NULL DEFAULT 0,
+            score_n INT NOT NULL DEFAULT 0,
+            q1_sum DOUBLE NOT NULL DEFAULT 0, q1_n INT NOT NULL DEFAULT 0,
+            q2_sum DOUBLE NOT NULL DEFAULT 0, q2_n INT NOT NULL DEFAULT 0,
+            q3_sum DOUBLE NOT NULL DEFAULT 0, q3_n INT NOT NULL DEFAULT 0,
+            q4_sum DOUBLE NOT NULL DEFAULT 0, q4_n INT NOT NULL DEFAULT 0,
+            UNIQUE KEY {FACTS_KEY} ({', '.join(FACTS_KEY_COLUMNS)}),
+            KEY idx_feedback_facts_date (program_date),
+            KEY idx_feedback_facts_session (program_title, program_date),
+            KEY idx_feedback_facts_trainer (trainer_name)
+        ) CHARACTER SET utf8mb4
+    """)
+
+
+def _fact_rows(where):
+    """UNION of the fact rows for feedback_responses rows matching where (where is repeated per slot)"""
+    slots = [f"""
+        SELECT program_title, program_date, clubbed_session_id IS NOT NULL AS is_clubbed,
+               0 AS trainer_slot, '' AS trainer_name,
+               MAX(pmo_training_category) AS pmo_training_category, MAX(pl_category) AS pl_category,
+               MAX(brsr_sq_123_category) AS brsr_sq_123_category,
+               COUNT(DISTINCT id) AS response_count,
+               IFNULL(SUM({CSI_EXPR}), 0) AS csi_sum, COUNT({CSI_EXPR}) AS csi_n,
+               IFNULL(SUM({SCORE_EXPR}), 0) AS score_sum, COUNT({SCORE_EXPR}) AS score_n,
+               0 AS q1_sum, 0 AS q1_n, 0 AS q2_sum, 0 AS q2_n, 0 AS q3_sum, 0 AS q3_n, 0 AS q4_sum, 0 AS q4_n
+        FROM feedback_responses
+        WHERE {where}
+        GROUP BY program_title, program_date, clubbed_session_id IS NOT NULL
+    """]
+    for i in range(1, 5):
+        slots.append(f"""
+        SELECT program_title, program_date, clubbed_session_id IS NOT NULL, {i}, trainer{i}_name,
+               NULL, NULL, NULL,
+               COUNT(*), 0, 0, 0, 0,
+               IFNULL(SUM(trainer{i}_q1), 0), COUNT(trainer{i}_q1),
+               IFNULL(SUM(trainer{i}_q2), 0), COUNT(trainer{i}_q2),
+               IFNULL(SUM(trainer{i}_q3), 0), COUNT(trainer{i}_q3),
+               IFNULL(SUM(trainer{i}_q4), 0), COUNT(trainer{i}_q4)
+        FROM feedback_responses
+        WHERE {where} AND trainer{i}_name IS NOT NULL
+        GROUP BY program_title, program_date, clubbed_session_id IS NOT NULL, trainer{i}_name
+    """)
+    return " UNION ALL ".join(slots)
+
+
+def _fact_select(where):
+    """INSERT ... SELECT building the facts for feedback_responses rows matching where"""
+    return """
+        INSERT INTO feedback_facts (
+            program_title, program_date, is_clubbed, trainer_slot, trainer_name,
+            pmo_training_category, pl_category, brsr_sq_123_category,
+            response_count, csi_sum, csi_n, score_sum, score_n,
+            q1_sum, q1_n, q2_sum, q2_n, q3_sum, q3_n, q4_sum, q4_n
+        )
+    """ + _fact_rows(where)
+
+
+def refresh_session_facts(cursor, program_title, program_date):
+    """Recompute the facts of one program/date after feedback is inserted for it"""
+    cursor.execute("DELETE FROM feedback_facts WHERE program_title = %s AND program_date = %s",
+                   (program_title, program_date))
+    where = "program_title = %s AND program_date = %s"
+    cursor.execute(_fact_select(where), [program_title, program_date] * 5)
+
+
+def rebuild_feedback_facts(conn):
+    """Recompute every fact from feedback_responses in one transaction; returns the rows written"""
+    conn.begin()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM feedback_facts")
+            cursor.execute(_fact_select("1=1"))
+            written = cursor.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return written
+
+
+def feedback_facts_step(conn):
+    """Migration step: create feedback_facts and build it from feedback_responses"""
+    # DDL commits implicitly, so create the table before opening the rebuild transaction
+    with conn.cursor() as cursor:
+        create_feedback_facts_table(cursor)
+    return f"feedback_facts rebuilt, {rebuild_feedback_facts(conn)} rows"
+
+
+def facts_ready(conn):
+    """Whether migration 8 has built feedback_facts; only a built table is remembered.
+
+    Migration 4 already creates the (empty) table for its FULLTEXT index, so the
+    applied migration is checked rather than the table.
+    """
+    global _facts_ready
+    if not _facts_ready:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM schema_migrations WHERE version = %s", (FACTS_MIGRATION,))
+                _facts_ready = cursor.fetchone() is not None
+        except Exception as e:
+            print(f"Error checking feedback facts: {str(e)}")
+    return _facts_ready
+
+
+def facts_source(conn):
+    """Table to read facts from (aggregated from feedback_responses until the migration has run)"""
+    if facts_ready(conn):
+        return "feedback_facts"
+    return f"({_fact_rows('1=1')}) AS feedback_facts"
+
+
+def record_feedback(sessions):
+    """Keep feedback_facts in step after feedback_responses inserts; never fails the caller"""
+    conn = None
+    try:
+        conn = get_db_connection()
+        if not facts_ready(conn):
+            # Nothing to maintain yet; migration 8 builds the table from feedback_responses
+            return
+        conn.begin()
+        with conn.cursor() as cursor:
+            for program_title, program_date in set(sessions):
+                refresh_session_facts(cursor, program_title, program_date)
+        conn.commit()
+    except Exception as e:
+        print(f"Error updating feedback facts: {str(e)}")
+    finally:
+        if conn:
+            conn.close()
+
+
+def get_session_scores(conn, month=None, year=None, trainer=None, search=None, feedback_type=None):
+    """CIRO dashboard rows (one per program/date) from a single flat GROUP BY over feedback_facts.
+
+    Month/year filters become date ranges on program_date. Month without year
+    matches that month in any year, via the year list in the facts. Trainer
+    and search filters select the sessions they match, and feedback_type
+    selects the response-level counts. Trainer names and TFI always cover the
+    whole session, as they did before.
+    """
+    source = facts_source(conn)
+    with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+        where = ["1=1"]
+        params = []
+        if year:
+            start, end = month_range(year, month)
+            where.append("program_date >= %s AND program_date < %s")
+            params.extend([start, end])
+        elif month:
+            cursor.execute(f"SELECT DISTINCT YEAR(program_date) AS year FROM {source}")
+            ranges = [month_range(row['year'], month) for row in cursor.fetchall() if row['year']]
+            if not ranges:
+                return []
+            where.append("(" + " OR ".join(["(program_date >= %s AND program_date < %s)"] * len(ranges)) + ")")
+            for start, end in ranges:
+                params.extend([start, end])
+        if trainer:
+            trainer_filter = FilterCompiler().prefix('trainer_name', trainer)
+            where.append(f"""(program_title, program_date) IN (
+                SELECT program_title, program_date FROM {source}
+                WHERE trainer_slot > 0 AND {trainer_filter.where()})""")
+            params.extend(trainer_filter.params)
+        if search:
+            title_filter = FilterCompiler(conn=conn).search('feedback_facts', ['program_title'], search)
+            name_filter = FilterCompiler(conn=conn).search('feedback_responses', ['participants_name'], search)
+            where.append(f"""({title_filter.where()} OR (program_title, program_date) IN (
+                SELECT program_title, program_date FROM feedback_responses WHERE {name_filter.where()}))""")
+            params.extend(title_filter.params + name_filter.params)
+
+        clubbed = {'individual': 'is_clubbed = 0', 'clubbed': 'is_clubbed = 1'}.get(feedback_type, '1=1')
+        cursor.execute(f"""
+            SELECT program_title, program_date, trainer_slot,
+                   GROUP_CONCAT(DISTINCT NULLIF(trainer_name, '') ORDER BY trainer_name SEPARATOR ', ') AS trainer_names,
+                   MAX(pmo_training_category) AS pmo_training_category,
+                   MAX(pl_category) AS pl_category,
+                   MAX(brsr_sq_123_category) AS brsr_sq_123_category,
+                   SUM(CASE WHEN {clubbed} THEN response_count ELSE 0 END) AS response_count,
+                   SUM(CASE WHEN {clubbed} THEN csi_sum ELSE 0 END) AS csi_sum,
+                   SUM(CASE WHEN {clubbed} THEN csi_n ELSE 0 END) AS csi_n,
+                   SUM(CASE WHEN {clubbed} THEN score_sum ELSE 0 END) AS score_sum,
+                   SUM(CASE WHEN {clubbed} THEN score_n ELSE 0 END) AS score_n,
+                   SUM(q1_sum) AS q1_sum, SUM(q1_n) AS q1_n,
+                   SUM(q2_sum) AS q2_sum, SUM(q2_n) AS q2_n,
+                   SUM(q3_sum) AS q3_sum, SUM(q3_n) AS q3_n,
+                   SUM(q4_sum) AS q4_sum, SUM(q4_n) AS q4_n
+            FROM {source}
+            WHERE {' AND '.join(where)}
+            GROUP BY program_title, program_date, trainer_slot
+            ORDER BY program_date DESC, program_title, trainer_slot
+        """, params)
+        rows = cursor.fetchall()
+
+    sessions = OrderedDict()
+    for row in rows:
+        key = (row['program_title'], row['program_date'])
+        session = sessions.setdefault(key, {
+            'program_title': row['program_title'],
+            'program_date': row['program_date'],
+            'response_count': 0,
+            'trainer_names': None,
+            'csi': None,
+            'tfi': None,
+            'avg_score': None,
+            '_trainer_names': [],
+            '_slot_scores': [],
+        })
+        if row['trainer_slot'] == 0:
+            session['response_count'] = int(row['response_count'] or 0)
+            session['pmo_training_category'] = row['pmo_training_category']
+            session['pl_category'] = row['pl_category']
+            session['brsr_sq_123_category'] = row['brsr_sq_123_category']
+            session['csi'] = row['csi_sum'] / row['csi_n'] if row['csi_n'] else None
+            session['avg_score'] = row['score_sum'] / row['score_n'] if row['score_n'] else None
+            continue
+
+        if row['trainer_names']:
+            session['_trainer_names'].extend(row['trainer_names'].split(', '))
+        question_avgs = [row[f'q{q}_sum'] / row[f'q{q}_n'] if row[f'q{q}_n'] else None for q in range(1, 5)]
+        if None not in question_avgs:
+            session['_slot_scores'].append(sum(question_avgs) / 4)
+
+    results = []
+    for session in sessions.values():
+        if not session['response_count']:
+            continue
+        names = sorted(set(session.pop('_trainer_names')))
+        session['trainer_names'] = ', '.join(names) if names else None
+        slot_scores = session.pop('_slot_scores')
+        session['tfi'] = sum(slot_scores) / len(slot_scores) if slot_scores else None
+        results.append(session)
+    return results
+
+
+def get_filter_options(conn):
+    """Programs, trainers and years for the CIRO dashboard dropdowns"""
+    source = facts_source(conn)
+    with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+        cursor.execute(f"SELECT DISTINCT program_title FROM {source} ORDER BY program_title")
+        programs = [row['program_title'] for row in cursor.fetchall()]
+        cursor.execute(f"""
+            SELECT DISTINCT trainer_name FROM {source}
+            WHERE trainer_slot > 0 AND trainer_name != ''
+            ORDER BY trainer_name
+        """)
+        trainers = [row['trainer_name'] for row in cursor.fetchall()]
+        cursor.execute(f"SELECT DISTINCT YEAR(program_date) AS year FROM {source} ORDER BY year DESC")
+        years = [str(row['year']) for row in cursor.fetchall()]
+    return programs, trainers, years
+
+
+if __name__ == '__main__':
+    # python feedback_facts.py rebuild
+    command = sys.argv[1] if len(sys.argv) > 1 else 'rebuild'
+    if command != 'rebuild':
+        sys.exit("usage: python feedback_facts.py rebuild")
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            create_feedback_facts_table(cursor)
+        print(f"Rebuilt feedback_facts: {rebuild_feedback_facts(conn)} rows")
+    finally:
+        conn.close()
@@ -0,0 +1,214 @@
+import re
+from datetime import date, timedelta
+
+import pymysql
+
+# InnoDB ignores FULLTEXT words shorter than innodb_ft_min_token_size (default 3)
+FULLTEXT_MIN_WORD = 3
+
+# Lower-cased/trimmed copies of columns that used to be compared through UPPER()
+NORMALIZED_COLUMNS = {
+    'eor_data': ['factory'],
+    'training_names': ['tni_status'],
+}
+
+# FULLTEXT indexes backing free-text search boxes
+FULLTEXT_INDEXES = [
+    ('feedback_facts', ['program_title']),
+    ('feedback_responses', ['participants_name']),
+    ('feedback_responses', ['program_title', 'participants_name']),
+]
+
+_present = {}
+
+
+def fiscal_year_range(fiscal_year):
+    """Half-open [start, end) date range of a fiscal year (April-March).
+
+    Accepts an int/str year or the "FY 2025-26" display format.
+    """
+    if isinstance(fiscal_year, str) and fiscal_year.startswith("FY "):
+        fiscal_year = fiscal_year.split()[1].split('-')[0]
+    fiscal_year = int(fiscal_year)
+    return date(fiscal_year, 4, 1), date(fiscal_year + 1, 4, 1)
+
+
+def month_range(year=None, month=None):
+    """Half-open [start, end) date range for a month/year filter"""
+    if year and month:
+        start = date(int(year), int(month), 1)
+        end = date(int(year) + 1, 1, 1) if int(month) == 12 else date(int(year), int(month) + 1, 1)
+        return start, end
+    if year:
+        return date(int(year), 1, 1), date(int(year) + 1, 1, 1)
+    return None, None
+
+
+def day_range(day):
+    """Half-open [start, end) range covering one calendar day"""
+    return day, day + timedelta(days=1)
+
+
+def escape_like(text):
+    return re.sub(r'([\\%_])', r'\\\1', text)
+
+
+def normalize_case(value):
+    return str(value).strip().lower()
+
+
+def normalized_column(column):
+    return f"{column}_norm"
+
+
+def fulltext_index_name(table, columns):
+    return f"ft_{table}_{'_'.join(columns)}"
+
+
+def add_normalized_column(cursor, table, column):
+    """Migration step helper: add a STORED LOWER(TRIM(column)) copy with an index, so
+    case-insensitive equality can seek instead of applying UPPER() to every row.
+    Returns False when the column already exists."""
+    norm = normalized_column(column)
+    cursor.execute(f"SHOW COLUMNS FROM {table} LIKE %s", (norm,))
+    if cursor.fetchone():
+        return False
+    cursor.execute(f"""
+        ALTER TABLE {table}
+        ADD COLUMN {norm} VARCHAR(255) AS (LOWER(TRIM({column}))) STORED,
+        ADD INDEX idx_{table}_{norm} ({norm})
+    """)
+    return True
+
+
+def add_fulltext_index(cursor, table, columns):
+    """Migration step helper: add the FULLTEXT index FilterCompiler.search looks for.
+    Returns False when the index already exists."""
+    name = fulltext_index_name(table, columns)
+    cursor.execute(f"SHOW INDEX FROM {table} WHERE Key_name = %s", (name,))
+    if cursor.fetchone():
+        return False
+    cursor.execute(f"ALTER TABLE {table} ADD FULLTEXT INDEX {name} ({', '.join(columns)})")
+    return True
+
+
+def _detect(conn, key, sql, params):
+    """Whether migration 4 has added key; only a found column or index is remembered"""
+    if not _present.get(key):
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(sql, params)
+                _present[key] = cursor.fetchone() is not None
+        except pymysql.MySQLError as e:
+            print(f"Error checking {key[0]} {key[1]}: {str(e)}")
+    return _present.get(key, False)
+
+
+def has_normalized_column(conn, table, column):
+    norm = normalized_column(column)
+    return _detect(conn, (table, norm), f"SHOW COLUMNS FROM {table} LIKE %s", (norm,))
+
+
+def has_fulltext_index(conn, table, columns):
+    name = fulltext_index_name(table, columns)
+    return _detect(conn, (table, name), f"SHOW INDEX FROM {table} WHERE Key_name = %s", (name,))
+
+
+def fulltext_terms(text):
+    """Boolean-mode query requiring every word as a prefix, or None if a word is too short to be indexed"""
+    words = re.findall(r'\w+', text)
+    if not words or any(len(word) < FULLTEXT_MIN_WORD for word in words):
+        return None
+    return ' '.join(f"+{word}*" for word in words)
+
+
+class FilterCompiler:
+    """Collect index-friendly WHERE predicates and their parameters.
+
+    Every predicate leaves the column bare so MySQL can seek on an index:
+    dates become half-open ranges instead of YEAR()/MONTH()/DATE(),
+    case-insensitive matches use a stored normalized column instead of UPPER(),
+    and text search is a prefix LIKE or a FULLTEXT match instead of '%text%'.
+    """
+
+    def __init__(self, alias=None, conn=None):
+        self._alias = f"{alias}." if alias else ''
+        self.conn = conn
+        self.clauses = []
+        self.params = []
+
+    def col(self, column):
+        return f"{self._alias}{column}"
+
+    def add(self, clause, *params):
+        self.clauses.append(clause)
+        self.params.extend(params)
+        return self
+
+    def equals(self, column, value):
+        return self.add(f"{self.col(column)} = %s", value)
+
+    def in_list(self, column, values):
+        values = list(values)
+        if not values:
+            return self.add("1=0")
+        return self.add(f"{self.col(column)} IN ({', '.join(['%s'] * len(values))})", *values)
+
+    def date_range(self, column, start=None, end=None):
+        """start <= column < end; either bound may be omitted"""
+        if start is not None:
+            self.add(f"{self.col(column)} >= %s", start)
+        if end is not None:
+            self.add(f"{self.col(column)} < %s", end)
+        return self
+
+    def fiscal_year(self, column, fiscal_year):
+        return self.date_range(column, *fiscal_year_range(fiscal_year))
+
+    def month(self, column, year=None, month=None):
+        return self.date_range(column, *month_range(year, month))
+
+    def month_in_years(self, column, month, years):
+        """The given month of any of years, as an OR of half-open ranges"""
+        ranges = [month_range(year, month) for year in years]
+        if not ranges:
+            return self.add("1=0")
+        clause = ' OR '.join([f"({self.col(column)} >= %s AND {self.col(column)} < %s)"] * len(ranges))
+        return self.add(f"({clause})", *[bound for bounds in ranges for bound in bounds])
+
+    def on_day(self, column, day):
+        return self.date_range(column, *day_range(day))
+
+    def normalized_equals(self, table, column, value):
+        """Case/space-insensitive equality through the stored normalized column"""
+        if self.conn is not None and has_normalized_column(self.conn, table, column):
+            return self.add(f"{self.col(normalized_column(column))} = %s", normalize_case(value))
+        # The default _ci collations already compare case-insensitively
+        return self.add(f"{self.col(column)} = %s", str(value).strip())
+
+    def prefix(self, columns, text):
+        """Any of columns starts with text"""
+        if isinstance(columns, str):
+            columns = [columns]
+        pattern = f"{escape_like(text.strip())}%"
+        clause = ' OR '.join(f"{self.col(column)} LIKE %s" for column in columns)
+        return self.add(f"({clause})" if len(columns) > 1 else clause, *[pattern] * len(columns))
+
+    def search(self, table, columns, text):
+        """Word-prefix FULLTEXT match when the index exists and the words are long enough, else prefix LIKE"""
+        terms = fulltext_terms(text)
+        if terms and self.conn is not None and has_fulltext_index(self.conn, table, columns):
+            cols = ', '.join(self.col(column) for column in columns)
+            return self.add(f"MATCH({cols}) AGAINST (%s IN BOOLEAN MODE)", terms)
+        return self.prefix(columns, text)
+
+    def where(self):
+        """Clauses joined for a WHERE (1=1 when there are none)"""
+        return ' AND '.join(self.clauses) if self.clauses else '1=1'
+
+    def apply(self, query, params):
+        """Append the clauses to a query that already ends in a WHERE condition"""
+        for clause in self.clauses:
+            query += f" AND {clause}"
+        params.extend(self.params)
+        return query, params
@@ -0,0 +1,182 @@
+"""Distinct values for the filter dropdowns, cached until the table is uploaded again.
+
+Each table's option sets are read in one statement (a UNION ALL of per-column
+GROUP BYs) and kept in memory together with the table's version stamp from the
+data_versions table. Upload paths call bump_version(table); every server
+process notices the new stamp within Config.FILTER_OPTIONS_VERSION_CHECK seconds
+and reloads. Config.FILTER_OPTIONS_TTL bounds staleness for values that arrive
+without an upload (e.g. a new month through attendance check-ins).
+"""
+import hashlib
+import json
+import threading
+import time
+from decimal import Decimal, InvalidOperation
+
+from flask import jsonify, request
+
+from fiscal_calendar import ensure_calendar, join_clause
+
+# table -> [(option key, SQL expression, 'text' or 'number'[, JOIN clause])]; the
+# cd_data_store listing tables are added by table_query through register_option_columns()
+OPTION_COLUMNS = {
+    'master_data': [
+        ('calendar_month', 'calendar_month', 'text'),
+        ('month_report_pmo_21_20', 'month_report_pmo_21_20', 'text'),
+        ('month_cd_key_26_25', 'month_cd_key_26_25', 'text'),
+        ('learning_hours', 'learning_hours', 'number'),
+        ('fiscal_years', 'fc.fiscal_year', 'number', join_clause('master_data.start_date')),
+    ],
+    'training_names': [
+        ('training_names', 'training_name', 'text'),
+    ],
+}
+
+_cache = {}  # table -> (version, loaded_at, options, etag)
+_cache_lock = threading.Lock()
+_versions = {}
+_versions_checked_at = 0.0
+_versions_lock = threading.Lock()
+_table_ready = False
+
+
+def register_option_columns(table, columns):
+    OPTION_COLUMNS[table] = columns
+
+
+def _connect():
+    from utils import get_db_connection
+    return get_db_connection()
+
+
+def _config():
+    from utils import Config
+    return Config
+
+
+def ensure_versions_table(cursor):
+    global _table_ready
+    if _table_ready:
+        return
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS data_versions (
+            table_name VARCHAR(64) PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+    """)
+    _table_ready = True
+
+
+def bump_version(table):
+    """Mark a table's data as changed; call after an upload commits"""
+    global _versions_checked_at
+    conn = _connect()
+    try:
+        with conn.cursor() as cursor:
+            ensure_versions_table(cursor)
+            cursor.execute("""
+                INSERT INTO data_versions (table_name, version) VALUES (%s, 1)
+                ON DUPLICATE KEY UPDATE version = version + 1
+            """, (table,))
+    except Exception as e:
+        print(f"Error bumping data version for {table}: {str(e)}")
+    finally:
+        conn.close()
+    # This process reloads right away; others see the new stamp on their next check
+    with _cache_lock:
+        _cache.pop(table, None)
+    with _versions_lock:
+        _versions_checked_at = 0.0
+
+
+def current_version(table):
+    """Version stamp of a table, re-read from data_versions at most every few seconds"""
+    global _versions, _versions_checked_at
+    now = time.monotonic()
+    with _versions_lock:
+        if now - _versions_checked_at < _config().FILTER_OPTIONS_VERSION_CHECK:
+            return _versions.get(table, 0)
+    conn = _connect()
+    try:
+        with conn.cursor() as cursor:
+            ensure_versions_table(cursor)
+            cursor.execute("SELECT table_name, version FROM data_versions")
+            versions = {row['table_name']: row['version'] for row in cursor.fetchall()}
+    except Exception as e:
+        print(f"Error reading data versions: {str(e)}")
+        versions = _versions
+    finally:
+        conn.close()
+    with _versions_lock:
+        _versions = versions
+        _versions_checked_at = now
+    return versions.get(table, 0)
+
+
+def _number_key(value):
+    try:
+        return (0, Decimal(value), '')
+    except (InvalidOperation, TypeError):
+        return (1, Decimal(0), value)
+
+
+def load_options(table):
+    """{option key: sorted distinct values (as strings)} for a table, in one statement"""
+    columns = OPTION_COLUMNS[table]
+    branches = []
+    for key, expression, _, *join in columns:
+        source = f"{table} {join[0]}" if join else table
+        branches.append(f"SELECT '{key}' AS option_key, CAST({expression} AS CHAR) AS value FROM {source} "
+                        f"WHERE {expression} IS NOT NULL GROUP BY {expression}")
+    conn = _connect()
+    try:
+        with conn.cursor() as cursor:
+            if any(len(column) > 3 for column in columns):
+                # Joined options read the fiscal_calendar dimension
+                ensure_calendar(cursor)
+            cursor.execute(" UNION ALL ".join(branches))
+            rows = cursor.fetchall()
+    finally:
+        conn.close()
+    options = {column[0]: [] for column in columns}
+    for row in rows:
+        options[row['option_key']].append(row['value'])
+    for key, _, kind, *_ in columns:
+        # Sort like the ORDER BY each query used to have: numerically, or case-insensitively
+        options[key].sort(key=_number_key if kind == 'number' else str.casefold)
+    return options
+
+
+def get_options(table):
+    """(options, etag) for a table, from memory while its version stamp and the TTL hold"""
+    version = current_version(table)
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(table)
+    if entry and entry[0] == version and now - entry[1] < _config().FILTER_OPTIONS_TTL:
+        return entry[2], entry[3]
+    options = load_options(table)
+    digest = hashlib.sha256(json.dumps(options, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    etag = f"{table}-{digest}"
+    with _cache_lock:
+        _cache[table] = (version, now, options, etag)
+    return options, etag
+
+
+def invalidate_options(table=None):
+    """Drop cached options in this process only (bump_version reaches every process)"""
+    with _cache_lock:
+        if table is None:
+            _cache.clear()
+        else:
+            _cache.pop(table, None)
+
+
+def options_response(payload, etag):
+    """JSON response that browsers revalidate with If-None-Match; 304 while the options are unchanged"""
+    response = jsonify(payload)
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
@@ -0,0 +1,132 @@
+"""Fiscal calendar (April-March) buckets, in Python and as the fiscal_calendar dimension table.
+
+One row per date holds the fiscal year, the fiscal month index (April=1 ...
+March=12), the PMO month (20th-day cutoff), the CD month (26th-day cutoff) and
+the YTD divisor (the month index capped at 10, since annual targets are spread
+over ten months). Queries join it on the fact date instead of rebuilding the
+buckets with MONTH()/YEAR() expressions; the Python functions below are the
+single definition both sides are generated from.
+"""
+from datetime import date, datetime, timedelta
+
+FISCAL_MONTHS = ['April', 'May', 'June', 'July', 'August', 'September',
+                 'October', 'November', 'December', 'January', 'February', 'March']
+
+PMO_CUTOFF_DAY = 20  # Dates after the 20th count towards the next PMO month
+CD_CUTOFF_DAY = 26   # Dates after the 26th count towards the next CD month
+YTD_MONTHS = 10      # Annual targets are spread over April-January
+
+FIRST_FISCAL_YEAR = 2000
+YEARS_AHEAD = 5      # The table always covers this many fiscal years past the current one
+INSERT_CHUNK = 1000
+
+_covered_through = None  # Last fiscal year this process has seen in the table
+
+
+def _as_date(value):
+    if isinstance(value, str):
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def fiscal_year(day=None):
+    """2025 for any date from 1 April 2025 to 31 March 2026"""
+    day = _as_date(day) if day is not None else date.today()
+    return day.year if day.month >= 4 else day.year - 1
+
+
+def fiscal_year_label(year):
+    """2025 -> "FY 2025-26" """
+    return f"FY {year}-{str(year + 1)[-2:]}"
+
+
+def fiscal_month_index(day=None):
+    """April=1, May=2, ..., March=12"""
+    day = _as_date(day) if day is not None else date.today()
+    return (day.month - 4) % 12 + 1
+
+
+def _month_after_cutoff(day, cutoff):
+    if day.day > cutoff:
+        return (day.replace(day=1) + timedelta(days=32)).strftime('%B')
+    return day.strftime('%B')
+
+
+def pmo_month(day):
+    """Reporting month with the PMO 21st-20th cycle"""
+    return _month_after_cutoff(_as_date(day), PMO_CUTOFF_DAY)
+
+
+def cd_month(day):
+    """Reporting month with the CD/KEY 26th-25th cycle"""
+    return _month_after_cutoff(_as_date(day), CD_CUTOFF_DAY)
+
+
+def ytd_divisor(value=None):
+    """Months of the annual target due by a date or fiscal month name (capped at 10).
+
+    An unknown month name falls back to today, like an unfiltered dashboard.
+    """
+    if isinstance(value, str) and value in FISCAL_MONTHS:
+        return min(FISCAL_MONTHS.index(value) + 1, YTD_MONTHS)
+    if isinstance(value, str):
+        value = None
+    return min(fiscal_month_index(value), YTD_MONTHS)
+
+
+def calendar_row(day):
+    """fiscal_calendar row for one date"""
+    return (day, fiscal_year(day), fiscal_month_index(day), day.strftime('%B'),
+            pmo_month(day), cd_month(day), ytd_divisor(day))
+
+
+def join_clause(date_column, alias='fc'):
+    """JOIN of the dimension on a fact date column, e.g. master_data.start_date"""
+    return f"JOIN fiscal_calendar {alias} ON {alias}.cal_date = {date_column}"
+
+
+def ensure_calendar(cursor):
+    """Create fiscal_calendar and extend it through the current fiscal year + YEARS_AHEAD.
+
+    Cheap after the first call in a process; rows that already exist are left alone.
+    """
+    global _covered_through
+    last_year = fiscal_year() + YEARS_AHEAD
+    if _covered_through is not None and _covered_through >= last_year:
+        return
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS fiscal_calendar (
+            cal_date DATE PRIMARY KEY,
+            fiscal_year SMALLINT NOT NULL,
+            fiscal_month_index TINYINT NOT NULL,
+            month_name VARCHAR(16) NOT NULL,
+            pmo_month VARCHAR(16) NOT NULL,
+            cd_month VARCHAR(16) NOT NULL,
+            ytd_divisor TINYINT NOT NULL,
+            INDEX idx_fiscal_calendar_month (fiscal_year, fiscal_month_index)
+        )
+    """)
+    cursor.execute("SELECT MIN(cal_date) AS first_day, MAX(cal_date) AS last_day FROM fiscal_calendar")
+    bounds = cursor.fetchone() or {}
+    first_day = date(FIRST_FISCAL_YEAR, 4, 1)
+    end_day = date(last_year + 1, 4, 1)
+    # Resume after the last stored day unless the table is empty or was cut short at the start
+    if bounds.get('first_day') and bounds['first_day'] <= first_day and bounds.get('last_day'):
+        first_day = bounds['last_day'] + timedelta(days=1)
+    rows = [calendar_row(first_day + timedelta(days=n)) for n in range((end_day - first_day).days)]
+    for start in range(0, len(rows), INSERT_CHUNK):
+        cursor.executemany("""
+            INSERT IGNORE INTO fiscal_calendar
+                (cal_date, fiscal_year, fiscal_month_index, month_name, pmo_month, cd_month, ytd_divisor)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, rows[start:start + INSERT_CHUNK])
+    _covered_through = last_year
+
+
+def fiscal_calendar_step(conn):
+    """Migration step: generate the fiscal_calendar dimension"""
+    with conn.cursor() as cursor:
+        ensure_calendar(cursor)
+    return f"fiscal_calendar FY {FIRST_FISCAL_YEAR} to FY {_covered_through}"
@@ -0,0 +1,223 @@
+"""Per-employee SHE/PMO learning hours per fiscal year, kept in employee_hours_ledger.
+
+Each permanent employee gets one row per fiscal year for all factories
+(factory_scope '*') and one per factory they trained in. A row holds the SHE,
+PMO and total hours, the threshold flags and the identity columns of the
+employee's latest master_data record in that scope. The dashboard's 16-hour
+cards and downloads read a (fiscal_year, factory_scope) range of it instead of
+aggregating master_data; filters the ledger cannot answer (training, month,
+category, ...) still aggregate master_data with the same thresholds.
+
+Migration 9 creates and builds the ledger. After that, attendance check-ins and
+master_data uploads refresh the rows of the employees they touched;
+python hours_ledger.py rebuild recomputes everything.
+"""
+import sys
+
+from fiscal_calendar import ensure_calendar, join_clause
+from learning_hours import learning_hours_column
+
+SHE_CATEGORY = 'SHE (Safety+Health)'
+ALL_FACTORIES = '*'
+
+SHE_MIN_HOURS = 6
+PMO_MIN_HOURS = 10
+COMPLETED_PMO_MIN_HOURS = 1  # The "completed 16" card only asks for some PMO hours on top of 6 SHE
+CUMULATIVE_MIN_HOURS = 16
+
+# Threshold flags as conditions on an employee's hour totals
+FLAGS = {
+    'she_6plus': f"she_hours >= {SHE_MIN_HOURS}",
+    'pmo_10plus': f"pmo_hours >= {PMO_MIN_HOURS}",
+    'completed_16': f"she_hours >= {SHE_MIN_HOURS} AND pmo_hours >= {COMPLETED_PMO_MIN_HOURS}",
+    'cumulative_16plus': f"total_hours >= {CUMULATIVE_MIN_HOURS}",
+}
+
+IDENTITY_COLUMNS = ['participants_name', 'bc_no', 'gender', 'employee_group', 'department', 'factory']
+PER_NO_CHUNK = 500
+FULL_REBUILD_ABOVE = 20000  # Uploads touching more employees than this rebuild everything
+LEDGER_MIGRATION = 9  # The migrations.py version that builds the ledger
+
+_ledger_ready = False
+_table_ready = False
+
+
+def ensure_ledger_table(cursor):
+    global _table_ready
+    if _table_ready:
+        return
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS employee_hours_ledger (
+            fiscal_year SMALLINT NOT NULL,
+            factory_scope VARCHAR(100) NOT NULL,
+            per_no VARCHAR(50) NOT NULL,
+            participants_name VARCHAR(255),
+            bc_no VARCHAR(50),
+            gender VARCHAR(20),
+            employee_group VARCHAR(50),
+            department VARCHAR(255),
+            factory VARCHAR(100),
+            she_hours INT NOT NULL DEFAULT 0,
+            pmo_hours INT NOT NULL DEFAULT 0,
+            total_hours INT NOT NULL DEFAULT 0,
+            she_6plus TINYINT NOT NULL DEFAULT 0,
+            pmo_10plus TINYINT NOT NULL DEFAULT 0,
+            completed_16 TINYINT NOT NULL DEFAULT 0,
+            cumulative_16plus TINYINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (fiscal_year, factory_scope, per_no),
+            INDEX idx_hours_ledger_per_no (per_no)
+        ) CHARACTER SET utf8mb4
+    """)
+    _table_ready = True
+
+
+def _insert_rows(cursor, hours, per_factory, per_nos=None):
+    """Aggregate master_data into ledger rows for one scope (all factories or per factory)"""
+    she = f"SUM(CASE WHEN m.pmo_training_category = %s THEN {hours} ELSE 0 END)"
+    pmo = f"SUM(CASE WHEN m.pmo_training_category = %s THEN 0 ELSE {hours} END)"
+    params = [SHE_CATEGORY, SHE_CATEGORY]
+    per_no_filter = ''
+    if per_nos is not None:
+        per_no_filter = f"AND m.per_no IN ({', '.join(['%s'] * len(per_nos))})"
+        params.extend(per_nos)
+    flags = ', '.join(f"({condition})" for condition in FLAGS.values())
+    scope_sql = "IFNULL(m.factory, '')" if per_factory else f"'{ALL_FACTORIES}'"
+    group_by = "fc.fiscal_year, m.factory, m.per_no" if per_factory else "fc.fiscal_year, m.per_no"
+    cursor.execute(f"""
+        INSERT INTO employee_hours_ledger (
+            fiscal_year, factory_scope, per_no, {', '.join(IDENTITY_COLUMNS)},
+            she_hours, pmo_hours, total_hours, {', '.join(FLAGS)}
+        )
+        SELECT t.fiscal_year, t.factory_scope, t.per_no, {', '.join(f'l.{c}' for c in IDENTITY_COLUMNS)},
+               t.she_hours, t.pmo_hours, t.total_hours, {flags}
+        FROM (
+            SELECT fc.fiscal_year, {scope_sql} AS factory_scope, m.per_no, MAX(m.id) AS last_id,
+                   {she} AS she_hours, {pmo} AS pmo_hours, SUM({hours}) AS total_hours
+            FROM master_data m
+            {join_clause('m.start_date')}
+            WHERE m.employee_group = 'PERMANENT' AND m.per_no IS NOT NULL AND m.per_no != ''
+            {per_no_filter}
+            GROUP BY {group_by}
+        ) t
+        JOIN master_data l ON l.id = t.last_id
+    """, params)
+    return cursor.rowcount
+
+
+def _refresh(cursor, hours, per_nos=None):
+    if per_nos is None:
+        cursor.execute("DELETE FROM employee_hours_ledger")
+    else:
+        cursor.execute(f"DELETE FROM employee_hours_ledger WHERE per_no IN ({', '.join(['%s'] * len(per_nos))})",
+                       per_nos)
+    rows = _insert_rows(cursor, hours, False, per_nos)
+    rows += _insert_rows(cursor, hours, True, per_nos)
+    return rows
+
+
+def refresh_hours_ledger(per_nos=None, conn=None):
+    """Recompute the ledger rows of the given employees, or of everyone when per_nos is None.
+
+    Each chunk of employees is replaced in one transaction, so readers never see
+    an employee half-written. Returns the number of ledger rows written.
+    """
+    from utils import get_db_connection
+
+    if per_nos is not None:
+        per_nos = sorted({str(p).strip() for p in per_nos if p and str(p).strip()})
+        if not per_nos:
+            return 0
+    own_conn = conn is None
+    conn = conn or get_db_connection()
+    try:
+        hours = learning_hours_column(conn, 'm.')
+        # DDL commits implicitly, so create the tables before opening the transaction
+        with conn.cursor() as cursor:
+            ensure_calendar(cursor)
+            ensure_ledger_table(cursor)
+        chunks = [None] if per_nos is None else [per_nos[i:i + PER_NO_CHUNK]
+                                                 for i in range(0, len(per_nos), PER_NO_CHUNK)]
+        written = 0
+        for chunk in chunks:
+            conn.begin()
+            try:
+                with conn.cursor() as cursor:
+                    written += _refresh(cursor, hours, chunk)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return written
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def hours_ledger_step(conn):
+    """Migration step: create employee_hours_ledger and build it from master_data"""
+    return f"employee_hours_ledger built, {refresh_hours_ledger(conn=conn)} rows"
+
+
+def ledger_ready(conn):
+    """Whether migration 9 has built the ledger; only a built ledger is remembered"""
+    global _ledger_ready
+    if not _ledger_ready:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM schema_migrations WHERE version = %s", (LEDGER_MIGRATION,))
+                _ledger_ready = cursor.fetchone() is not None
+        except Exception as e:
+            print(f"Error checking employee hours ledger: {str(e)}")
+    return _ledger_ready
+
+
+def refresh_after_write(per_nos):
+    """Incremental refresh hook for master_data writes; never fails the caller"""
+    from utils import get_db_connection
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        # Until migration 9 has built the ledger there is nothing to keep current
+        if not ledger_ready(conn):
+            return
+        per_nos = {p for p in per_nos if p}
+        refresh_hours_ledger(None if len(per_nos) > FULL_REBUILD_ABOVE else per_nos, conn=conn)
+    except Exception as e:
+        print(f"Error refreshing employee hours ledger: {e}")
+    finally:
+        if conn:
+            conn.close()
+
+
+def ledger_source(fiscal_year, factory=None):
+    """(SQL, params) selecting the employees of one fiscal year and factory scope"""
+    return f"""
+        SELECT per_no, {', '.join(IDENTITY_COLUMNS)}, she_hours, pmo_hours, total_hours, {', '.join(FLAGS)}
+        FROM employee_hours_ledger
+        WHERE fiscal_year = %s AND factory_scope = %s
+    """, [int(fiscal_year), factory or ALL_FACTORIES]
+
+
+def threshold_counts(cursor, source_sql, params, precomputed=False):
+    """Employee count and threshold counts over a per-employee hours source.
+
+    precomputed sources (the ledger) carry the flag columns; others are tested
+    against FLAGS directly.
+    """
+    sums = ', '.join(
+        f"COALESCE(SUM({name}), 0) AS {name}" if precomputed
+        else f"COALESCE(SUM(CASE WHEN {condition} THEN 1 ELSE 0 END), 0) AS {name}"
+        for name, condition in FLAGS.items()
+    )
+    cursor.execute(f"SELECT COUNT(*) AS employees, {sums} FROM ({source_sql}) e", params)
+    row = cursor.fetchone() or {}
+    return {key: int(value or 0) for key, value in row.items()}
+
+
+if __name__ == '__main__':
+    # python hours_ledger.py rebuild [per_no ...]
+    command = sys.argv[1] if len(sys.argv) > 1 else 'rebuild'
+    if command != 'rebuild':
+        sys.exit("usage: python hours_ledger.py rebuild [per_no ...]")
+    print(f"Wrote {refresh_hours_ledger(sys.argv[2:] or None)} ledger rows")
@@ -0,0 +1,219 @@
+"""Replay a captured query log through EXPLAIN and report full scans and filesorts.
+
+The log is JSON lines with "sql" and either "params" or "param_types" keys (one
+executed statement per line; the query profiler's slow log only records the
+parameter types, which are replayed with stand-in values); a plain .sql file
+with one statement per line also works. Plans come from
+a MySQL database, or from a SQLite stand-in built from a schema snapshot plus the
+indexes declared in migrations.py when no MySQL server is at hand:
+
+    python index_advisor.py snapshot schema.json
+    python index_advisor.py mysql queries.jsonl [database]
+    python index_advisor.py sqlite queries.jsonl schema.json
+"""
+import json
+import re
+import sqlite3
+import sys
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pymysql
+import pymysql.cursors
+
+from migrations import declared_indexes
+
+
+# Values bound in place of the parameters of a log that only kept their types
+STAND_IN_VALUES = {
+    'int': 1,
+    'float': 1.0,
+    'Decimal': Decimal(1),
+    'bool': True,
+    'date': date(2024, 4, 1),
+    'datetime': datetime(2024, 4, 1),
+    'timedelta': timedelta(0),
+    'NoneType': None,
+}
+
+
+def stand_in_params(types):
+    """Parameters of the logged types (strings for anything not in STAND_IN_VALUES)"""
+    if isinstance(types, dict):
+        return {name: STAND_IN_VALUES.get(kind, 'x') for name, kind in types.items()}
+    return [STAND_IN_VALUES.get(kind, 'x') for kind in types or []]
+
+
+def load_query_log(path):
+    """[(sql, params)] from a JSON-lines or plain SQL log"""
+    entries = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('{'):
+                record = json.loads(line)
+                params = record['params'] if 'params' in record else stand_in_params(record.get('param_types'))
+                entries.append((record.get('sql') or record.get('query', ''), params or []))
+            else:
+                entries.append((line.rstrip(';'), []))
+    return entries
+
+
+def fingerprint(sql):
+    """Collapse literals and whitespace so repeated statements group together"""
+    sql = re.sub(r"'(?:[^'\\]|\\.)*'", '?', sql)
+    sql = re.sub(r'\b\d+\b', '?', sql)
+    sql = re.sub(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)', '(?+)', sql)
+    return re.sub(r'\s+', ' ', sql).strip()
+
+
+def group_queries(entries):
+    """OrderedDict fingerprint -> {'sql', 'params', 'count'} for explainable statements"""
+    groups = OrderedDict()
+    for sql, params in entries:
+        if not re.match(r'\s*(SELECT|UPDATE|DELETE)\b', sql, re.IGNORECASE):
+            continue
+        key = fingerprint(sql)
+        if key not in groups:
+            groups[key] = {'sql': sql, 'params': params, 'count': 0}
+        groups[key]['count'] += 1
+    return groups
+
+
+def explain_mysql(conn, sql, params):
+    """Issues ('full scan'/'filesort'/'temporary') found in a MySQL EXPLAIN"""
+    issues = []
+    with conn.cursor() as cursor:
+        cursor.execute("EXPLAIN " + sql, params or None)
+        for row in cursor.fetchall():
+            extra = row.get('Extra') or ''
+            table = row.get('table')
+            if row.get('type') == 'ALL':
+                issues.append(f"full scan of {table} (~{row.get('rows')} rows)")
+            elif row.get('type') == 'index' and 'LIMIT' not in sql.upper():
+                issues.append(f"full index scan of {table} using {row.get('key')}")
+            if 'Using filesort' in extra:
+                issues.append(f"filesort on {table}")
+            if 'Using temporary' in extra:
+                issues.append(f"temporary table for {table}")
+    return issues
+
+
+def snapshot_schema(conn):
+    """{table: [columns]} for the current database, for the SQLite stand-in"""
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE()
+            ORDER BY TABLE_NAME, ORDINAL_POSITION
+        """)
+        schema = OrderedDict()
+        for row in cursor.fetchall():
+            schema.setdefault(row['TABLE_NAME'], []).append(row['COLUMN_NAME'])
+    return schema
+
+
+def sqlite_standin(schema):
+    """In-memory SQLite database with the snapshot's tables and the migration indexes"""
+    db = sqlite3.connect(':memory:')
+    for table, columns in schema.items():
+        db.execute(f"CREATE TABLE {table} ({', '.join(columns)})")
+    for index in declared_indexes():
+        if index.table in schema and all(c in schema[index.table] for c in index.column_names):
+            db.execute(f"CREATE INDEX {index.name} ON {index.table} ({', '.join(index.column_names)})")
+    # Stand-ins for MySQL functions so more statements can be planned
+    db.create_function('DATE_FORMAT', 2, lambda value, fmt: value)
+    db.create_function('TIME_FORMAT', 2, lambda value, fmt: value)
+    db.create_function('IF', 3, lambda cond, a, b: a if cond else b)
+    db.create_function('CURDATE', 0, lambda: date.today().isoformat())
+    db.execute("ANALYZE")
+    return db
+
+
+def _sqlite_param(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def explain_sqlite(db, sql, params):
+    """Issues found in SQLite's EXPLAIN QUERY PLAN for a MySQL-dialect statement"""
+    sql = sql.replace('%%', '%').replace('%s', '?')
+    rows = db.execute("EXPLAIN QUERY PLAN " + sql, [_sqlite_param(p) for p in params or []]).fetchall()
+    issues = []
+    for row in rows:
+        detail = row[-1]
+        if detail.startswith('SCAN'):
+            issues.append(f"full {'index ' if 'INDEX' in detail else ''}scan: {detail}")
+        if 'TEMP B-TREE FOR ORDER BY' in detail:
+            issues.append("filesort (temp b-tree for ORDER BY)")
+        if 'TEMP B-TREE FOR GROUP BY' in detail or 'TEMP B-TREE FOR DISTINCT' in detail:
+            issues.append("temporary b-tree for GROUP BY/DISTINCT")
+    return issues
+
+
+def advise(groups, explain):
+    """Run explain(sql, params) for each query group; returns report rows sorted by frequency"""
+    report = []
+    for key, group in groups.items():
+        try:
+            issues = explain(group['sql'], group['params'])
+        except Exception as e:
+            report.append({'count': group['count'], 'sql': key, 'issues': [], 'error': str(e)})
+            continue
+        report.append({'count': group['count'], 'sql': key, 'issues': issues, 'error': None})
+    report.sort(key=lambda r: (not r['issues'], -r['count']))
+    return report
+
+
+def print_report(report):
+    flagged = 0
+    for row in report:
+        if row['error']:
+            print(f"[skipped x{row['count']}] {row['sql'][:160]}\n    {row['error']}")
+        elif row['issues']:
+            flagged += 1
+            print(f"[x{row['count']}] {row['sql'][:160]}")
+            for issue in row['issues']:
+                print(f"    - {issue}")
+    print(f"{flagged} of {len(report)} distinct statements have full scans or filesorts")
+    return flagged
+
+
+if __name__ == '__main__':
+    from utils import Config, get_db_connection
+
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(2)
+    mode = sys.argv[1]
+    if mode == 'snapshot':
+        conn = get_db_connection()
+        try:
+            with open(sys.argv[2], 'w', encoding='utf-8') as f:
+                json.dump(snapshot_schema(conn), f, indent=2)
+        finally:
+            conn.close()
+        sys.exit(0)
+
+    groups = group_queries(load_query_log(sys.argv[2]))
+    if mode == 'sqlite':
+        with open(sys.argv[3], encoding='utf-8') as f:
+            db = sqlite_standin(json.load(f))
+        flagged = print_report(advise(groups, lambda sql, params: explain_sqlite(db, sql, params)))
+    else:
+        conn = pymysql.connect(host=Config.DB_HOST, user=Config.DB_USER, password=Config.DB_PASSWORD,
+                               database=sys.argv[3] if len(sys.argv) > 3 else Config.DB_NAME,
+                               cursorclass=pymysql.cursors.DictCursor, autocommit=True)
+        try:
+            flagged = print_report(advise(groups, lambda sql, params: explain_mysql(conn, sql, params)))
+        finally:
+            conn.close()
+    sys.exit(1 if flagged else 0)
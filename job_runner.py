@@ -0,0 +1,410 @@
+import json
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session, abort
+
+from utils import Config, get_db_connection
+
+jobs_bp = Blueprint('jobs', __name__, url_prefix='/jobs')
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = 'queued', 'running', 'succeeded', 'failed', 'cancelled'
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+PROGRESS_WRITE_INTERVAL = 1.0  # Seconds between progress writes to the jobs table
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+class JobCancelled(BaseException):
+    """Raised inside a job when it is cancelled.
+
+    Derives from BaseException so the broad "except Exception" handlers in the
+    upload code do not swallow it and report the cancellation as a data error.
+    """
+
+
+class Job:
+    """A unit of background work plus the state the status endpoint reports"""
+
+    def __init__(self, kind, label, func, args, kwargs, owner=None, redirect_url=None, on_finish=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.label = label
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.owner = owner
+        self.redirect_url = redirect_url
+        self.on_finish = on_finish
+        self.status = QUEUED
+        self.progress_pct = 0
+        self.message = 'Waiting for a worker'
+        self.result = None
+        self.error = None
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+        self._last_write = 0.0
+        self._runner = None
+
+    def progress(self, pct, message=None):
+        """Report progress (0-100); also the point where a cancelled job stops"""
+        self.check_cancelled()
+        self.progress_pct = max(0, min(100, int(pct)))
+        if message:
+            self.message = message
+        if self._runner and time.monotonic() - self._last_write >= PROGRESS_WRITE_INTERVAL:
+            self._last_write = time.monotonic()
+            self._runner.persist(self)
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    @property
+    def finished(self):
+        return self.status in FINISHED
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'label': self.label,
+            'status': self.status,
+            'progress': self.progress_pct,
+            'message': self.message,
+            'result': self.result,
+            'error': self.error,
+            'owner': self.owner,
+            'redirect_url': self.redirect_url,
+            'cancel_requested': self.cancel_requested,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class JobRunner:
+    """In-process job queue served by a fixed pool of worker threads.
+
+    Job functions are called as func(job, *args, **kwargs) and should call
+    job.progress() between units of work. With persist=True every state change
+    is also written to the background_jobs table, so status survives a restart
+    and can be read by other server processes.
+    """
+
+    def __init__(self, workers=2, history=200, persist=False):
+        self.history = history
+        self.persist_enabled = persist
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        if persist:
+            self._ensure_table()
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, kind, label, func, *args, owner=None, redirect_url=None, on_finish=None, **kwargs):
+        """Queue func and return the Job; the caller redirects to its status page.
+
+        on_finish(job) is called once the job has finished, however it ended
+        (including a cancel before it started).
+        """
+        job = Job(kind, label, func, args, kwargs, owner, redirect_url, on_finish)
+        job._runner = self
+        with self._lock:
+            self._jobs[job.id] = job
+            # Forget the oldest finished jobs beyond the history limit
+            finished = [j.id for j in self._jobs.values() if j.finished]
+            for job_id in finished[:max(0, len(self._jobs) - self.history)]:
+                del self._jobs[job_id]
+        self.persist(job)
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id):
+        """Job from memory, or its last persisted state as a dict, or None"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job:
+            return job.to_dict()
+        return self._load(job_id) if self.persist_enabled else None
+
+    def cancel(self, job_id):
+        """Request cancellation; queued jobs never start, running ones stop at their next progress()"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if not job or job.finished:
+            return False
+        job._cancel.set()
+        if job.status == QUEUED:
+            self._finish(job, CANCELLED, 'Cancelled before it started')
+        else:
+            job.message = 'Cancelling...'
+            self.persist(job)
+        return True
+
+    def list(self, owner=None):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [j.to_dict() for j in reversed(jobs) if owner is None or j.owner == owner]
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job.finished:
+                    continue
+                job.status = RUNNING
+                job.started_at = datetime.now()
+                job.message = 'Running'
+                self.persist(job)
+                try:
+                    job.result = job.func(job, *job.args, **job.kwargs)
+                except JobCancelled:
+                    self._finish(job, CANCELLED, 'Cancelled')
+                except Exception as e:
+                    print(f"Error in background job {job.kind} {job.id}: {str(e)}")
+                    job.error = str(e)
+                    self._finish(job, FAILED, f"Failed: {str(e)}")
+                else:
+                    # Jobs wrapping the existing (success, message) helpers report failure in the result
+                    result = job.result if isinstance(job.result, dict) else {}
+                    if result.get('success') is False:
+                        job.error = result.get('message')
+                        self._finish(job, FAILED, result.get('message') or 'Failed')
+                    else:
+                        job.progress_pct = 100
+                        self._finish(job, SUCCEEDED, result.get('message') or 'Done')
+            finally:
+                # Drop references to uploaded data once the job is over
+                job.args = job.kwargs = None
+                self._queue.task_done()
+
+    def _finish(self, job, status, message):
+        job.status = status
+        job.message = message
+        job.finished_at = datetime.now()
+        self.persist(job)
+        if job.on_finish:
+            try:
+                job.on_finish(job)
+            except Exception as e:
+                print(f"Error in finish callback of job {job.kind} {job.id}: {str(e)}")
+
+    def _ensure_table(self):
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS background_jobs (
+                        id CHAR(32) PRIMARY KEY,
+                        kind VARCHAR(50) NOT NULL,
+                        label VARCHAR(255),
+                        status VARCHAR(20) NOT NULL,
+                        progress TINYINT NOT NULL DEFAULT 0,
+                        message VARCHAR(500),
+                        result TEXT,
+                        error TEXT,
+                        owner VARCHAR(100),
+                        redirect_url VARCHAR(500),
+                        created_at DATETIME NOT NULL,
+                        started_at DATETIME NULL,
+                        finished_at DATETIME NULL,
+                        INDEX idx_background_jobs_status (status)
+                    )
+                """)
+                # Work from a previous process is gone; say so instead of showing it as running
+                cursor.execute("""
+                    UPDATE background_jobs
+                    SET status = %s, message = 'Interrupted by a server restart', finished_at = NOW()
+                    WHERE status IN (%s, %s)
+                """, (FAILED, QUEUED, RUNNING))
+        finally:
+            conn.close()
+
+    def persist(self, job):
+        if not self.persist_enabled:
+            return
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO background_jobs
+                        (id, kind, label, status, progress, message, result, error, owner,
+                         redirect_url, created_at, started_at, finished_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        status = VALUES(status), progress = VALUES(progress), message = VALUES(message),
+                        result = VALUES(result), error = VALUES(error),
+                        started_at = VALUES(started_at), finished_at = VALUES(finished_at)
+                """, (job.id, job.kind, job.label, job.status, job.progress_pct, (job.message or '')[:500],
+                      json.dumps(job.result, default=str) if job.result is not None else None,
+                      job.error, job.owner, job.redirect_url, job.created_at, job.started_at, job.finished_at))
+        except Exception as e:
+            # The in-memory state is authoritative; a failed write must not kill the job
+            print(f"Error persisting job {job.id}: {str(e)}")
+        finally:
+            conn.close()
+
+    def _load(self, job_id):
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT * FROM background_jobs WHERE id = %s", (job_id,))
+                row = cursor.fetchone()
+        except Exception as e:
+            print(f"Error loading job {job_id}: {str(e)}")
+            return None
+        finally:
+            conn.close()
+        if not row:
+            return None
+        for key in ('created_at', 'started_at', 'finished_at'):
+            row[key] = row[key].isoformat() if row[key] else None
+        row['result'] = json.loads(row['result']) if row['result'] else None
+        row['cancel_requested'] = False
+        return row
+
+
+def get_job_runner():
+    """Process-wide runner, started on first use from utils.Config"""
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                _runner = JobRunner(workers=Config.JOB_WORKERS, history=Config.JOB_HISTORY,
+                                    persist=Config.JOB_PERSIST)
+    return _runner
+
+
+class BatchedRefresh:
+    """Collects keys from many requests and refreshes them together in one background job.
+
+    add() only records the keys; the first add() after a run schedules a job
+    Config.JOB_BATCH_DELAY seconds later that calls func(keys) with everything
+    collected by then. A burst of QR check-ins therefore costs one refresh, run
+    on a worker thread, instead of one per scan inside the request.
+    """
+
+    def __init__(self, kind, label, func):
+        self.kind = kind
+        self.label = label
+        self.func = func
+        self._pending = set()
+        self._scheduled = False
+        self._lock = threading.Lock()
+
+    def add(self, keys):
+        with self._lock:
+            self._pending.update(key for key in keys if key)
+            if self._scheduled or not self._pending:
+                return
+            self._scheduled = True
+        self._schedule()
+
+    def _schedule(self):
+        timer = threading.Timer(Config.JOB_BATCH_DELAY, self._submit)
+        timer.daemon = True
+        timer.start()
+
+    def _submit(self):
+        try:
+            get_job_runner().submit(self.kind, self.label, self._run, on_finish=self._finished)
+        except Exception as e:
+            print(f"Error queueing {self.label}: {str(e)}")
+            with self._lock:
+                self._scheduled = False
+
+    def _run(self, job):
+        job.progress(0, "Refreshing")
+        with self._lock:
+            keys, self._pending = self._pending, set()
+        try:
+            self.func(keys)
+        except BaseException:
+            # Failed or cancelled mid-run: the keys go into the next batch
+            with self._lock:
+                self._pending.update(keys)
+            raise
+        return {'success': True, 'message': f"Refreshed {len(keys)} keys"}
+
+    def _finished(self, job):
+        # Runs however the job ended, so a cancelled or failed batch never blocks the next one;
+        # keys that arrived meanwhile (or were put back) schedule it straight away
+        with self._lock:
+            self._scheduled = bool(self._pending)
+            reschedule = self._scheduled
+        if reschedule:
+            self._schedule()
+
+
+def submit_job(kind, label, func, *args, redirect_url=None, **kwargs):
+    """Queue a job for the logged-in user from inside a request"""
+    return get_job_runner().submit(kind, label, func, *args, owner=session.get('username'),
+                                   redirect_url=redirect_url, **kwargs)
+
+
+def _visible_job(job_id):
+    job = get_job_runner().get(job_id)
+    if job is None:
+        abort(404)
+    if session.get('role') != 'Admin' and job['owner'] != session.get('username'):
+        abort(403)
+    return job
+
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """JSON status for polling; HTML progress page for browsers"""
+    job = _visible_job(job_id)
+    if request.args.get('format') == 'json' or request.accept_mimetypes.best == 'application/json':
+        return jsonify(job)
+    return render_template('admin/job_status.html', job=job)
+
+
+@jobs_bp.route('/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    _visible_job(job_id)
+    cancelled = get_job_runner().cancel(job_id)
+    if request.accept_mimetypes.best == 'application/json' or request.is_json:
+        return jsonify({'success': cancelled, 'job': get_job_runner().get(job_id)})
+    if not cancelled:
+        flash('Job has already finished', 'warning')
+    return redirect(url_for('jobs.job_status', job_id=job_id))
+
+
+@jobs_bp.route('/<job_id>/done', methods=['GET'])
+def job_done(job_id):
+    """Flash the outcome of a finished job and continue to the page it came from"""
+    job = _visible_job(job_id)
+    if job['status'] not in FINISHED:
+        return redirect(url_for('jobs.job_status', job_id=job_id))
+    result = job['result'] if isinstance(job['result'], dict) else {}
+    if job['status'] == SUCCEEDED:
+        flash(job['message'], result.get('category', 'success'))
+    elif job['status'] == CANCELLED:
+        flash(f"{job['label']} was cancelled", 'warning')
+    else:
+        flash(job['message'], result.get('category', 'error'))
+    return redirect(job['redirect_url'] or url_for('home'))
+
+
+@jobs_bp.route('/', methods=['GET'])
+def list_jobs():
+    owner = None if session.get('role') == 'Admin' else session.get('username')
+    return jsonify({'success': True, 'jobs': get_job_runner().list(owner)})
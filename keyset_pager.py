@@ -0,0 +1,197 @@
+import base64
+import json
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+OFFSET_PAGE_LINKS = 5  # Pages reachable by number (cheap OFFSET); deeper pages use cursors
+COUNT_CACHE_TTL = 60  # Seconds a cached total count stays valid
+
+_count_cache = {}
+_count_lock = threading.Lock()
+
+
+class SortKey:
+    """One column of a keyset ordering.
+
+    expression is what the SQL orders and seeks on (a bare, indexed column, so
+    the seek can use the index) and row_key is the name the column has in the
+    fetched rows. Set nullable for columns that may hold NULL; the seek then
+    spells out where NULLs sort (lowest, as MySQL orders them).
+    """
+
+    def __init__(self, expression, row_key, nullable=False):
+        self.expression = expression
+        self.row_key = row_key
+        self.nullable = nullable
+
+    def value(self, row):
+        value = row.get(self.row_key)
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        if isinstance(value, timedelta):
+            # PyMySQL returns TIME columns as timedelta
+            seconds = int(value.total_seconds())
+            return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+        return value
+
+
+def encode_cursor(values, page):
+    """Opaque, URL-safe token for a position in a keyset ordering"""
+    payload = json.dumps({'k': values, 'p': page}, separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, key_count):
+    """Return (values, page) from a token, or None if it is malformed"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        values, page = payload['k'], int(payload['p'])
+        if not isinstance(values, list) or len(values) != key_count or page < 1:
+            return None
+        return values, page
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class PageRequest:
+    """The page a client asked for: a numbered (offset) page or a cursor position.
+
+    ?page=n is honoured for the first OFFSET_PAGE_LINKS pages; ?after=<token> and
+    ?before=<token> seek from the last/first row of the page the token came from.
+    """
+
+    def __init__(self, page=1, cursor=None, direction='next'):
+        self.page = max(page, 1)
+        self.cursor = cursor
+        self.direction = direction
+
+    @classmethod
+    def from_args(cls, args, sort_keys):
+        for direction, param in (('next', 'after'), ('prev', 'before')):
+            token = args.get(param)
+            if token:
+                decoded = decode_cursor(token, len(sort_keys))
+                if decoded:
+                    values, page = decoded
+                    return cls(page, values, direction)
+        page = args.get('page', 1, type=int) or 1
+        # Deep offsets are what keyset paging avoids; clamp stray links to the last numbered page
+        return cls(min(page, OFFSET_PAGE_LINKS))
+
+
+def _seek_condition(sort_keys, values, operator):
+    """(condition, params) for rows strictly past values in operator's direction.
+
+    Expands the row comparison into "a past x OR (a = x AND (b past y OR ...))"
+    so NULLs can be placed explicitly: NULL sorts below every value.
+    """
+    key, value, rest = sort_keys[0], values[0], sort_keys[1:]
+    past, params = [], []
+    if value is None:
+        if operator == '>':
+            past.append(f"{key.expression} IS NOT NULL")
+        same = f"{key.expression} IS NULL"
+    else:
+        past.append(f"{key.expression} {operator} %s")
+        params.append(value)
+        if key.nullable and operator == '<':
+            past.append(f"{key.expression} IS NULL")
+        same = f"{key.expression} = %s"
+    if rest:
+        inner, inner_params = _seek_condition(rest, values[1:], operator)
+        past.append(f"({same} AND {inner})")
+        params.extend([] if value is None else [value])
+        params.extend(inner_params)
+    return '(' + ' OR '.join(past or ['1=0']) + ')', params
+
+
+def paginate_query(query, params, sort_keys, page_request, per_page):
+    """Append the seek condition, ORDER BY and LIMIT for page_request to a filtered query.
+
+    query must end in a WHERE clause (e.g. "WHERE 1=1 AND ..."). One extra row is
+    fetched so build_page can tell whether another page follows.
+    """
+    params = list(params)
+    columns = ', '.join(key.expression for key in sort_keys)
+    descending = page_request.direction == 'next'
+    if page_request.cursor is not None:
+        placeholders = ', '.join(['%s'] * len(sort_keys))
+        operator = '<' if descending else '>'
+        if any(key.nullable for key in sort_keys):
+            condition, seek_params = _seek_condition(sort_keys, page_request.cursor, operator)
+            query += f" AND {condition}"
+            params.extend(seek_params)
+        elif len(sort_keys) == 1:
+            query += f" AND {columns} {operator} %s"
+            params.extend(page_request.cursor)
+        else:
+            query += f" AND ({columns}) {operator} ({placeholders})"
+            params.extend(page_request.cursor)
+    order = 'DESC' if descending else 'ASC'
+    query += " ORDER BY " + ', '.join(f"{key.expression} {order}" for key in sort_keys)
+    query += " LIMIT %s"
+    params.append(per_page + 1)
+    if page_request.cursor is None and page_request.page > 1:
+        query += " OFFSET %s"
+        params.append((page_request.page - 1) * per_page)
+    return query, params
+
+
+def build_page(rows, sort_keys, page_request, per_page, total=None):
+    """Trim the look-ahead row and return (rows, pagination) for the templates"""
+    rows = list(rows)
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    page = page_request.page
+    if page_request.direction == 'prev':
+        rows.reverse()
+        has_prev = has_more
+        has_next = True
+    else:
+        has_prev = page > 1
+        has_next = has_more
+
+    next_cursor = prev_cursor = None
+    if rows and has_next:
+        next_cursor = encode_cursor([key.value(rows[-1]) for key in sort_keys], page + 1)
+    if rows and has_prev and page - 1 > OFFSET_PAGE_LINKS:
+        prev_cursor = encode_cursor([key.value(rows[0]) for key in sort_keys], page - 1)
+
+    pages = (total + per_page - 1) // per_page if total is not None else None
+    return rows, {
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'pages': pages,
+        'has_prev': has_prev,
+        'has_next': has_next,
+        'prev_num': page - 1,
+        'next_num': page + 1,
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor,
+        # Numbered links only for the cheap leading pages
+        'page_links': list(range(1, min(OFFSET_PAGE_LINKS, pages if pages is not None else OFFSET_PAGE_LINKS) + 1)),
+    }
+
+
+def cached_count(scope, key, compute, ttl=COUNT_CACHE_TTL):
+    """Total row count for (scope, key), recomputed at most once every ttl seconds"""
+    cache_key = (scope, key)
+    now = time.monotonic()
+    with _count_lock:
+        entry = _count_cache.get(cache_key)
+        if entry and now - entry[1] <= ttl:
+            return entry[0]
+    total = compute()
+    with _count_lock:
+        _count_cache[cache_key] = (total, now)
+    return total
+
+
+def invalidate_counts(scope):
+    """Drop cached totals for a scope after its table is written to"""
+    with _count_lock:
+        for cache_key in [k for k in _count_cache if k[0] == scope]:
+            del _count_cache[cache_key]
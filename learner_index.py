@@ -0,0 +1,455 @@
+"""Exact unique-learner counts from compressed bitmaps of permanent employees.
+
+Every permanent employee's per_no gets a dense integer id. For each
+(fiscal year, factory, training, calendar month, PMO category, PL category,
+gender) cell of master_data the index keeps the set of learner ids as a
+roaring-style Bitmap, so the unique learners of any combination of those
+filters is the size of the union of the matching cells, computed in memory
+instead of a COUNT(DISTINCT per_no) per slice. Filters the index does not
+cover (BC no, PMO/CD months, TNI status, date ranges, per_no) return None and
+the caller falls back to SQL.
+
+New master_data rows are added incrementally after attendance check-ins. Each
+sync re-reads the last SYNC_OVERLAP ids already indexed (adding a learner to a
+cell twice is a no-op), so a row whose transaction committed after a higher id
+was indexed is still picked up. An upload (a new master_data version stamp)
+rebuilds the index, and so does an index older than Config.LEARNER_INDEX_TTL,
+which bounds how long anything the incremental syncs missed can skew counts.
+The index is saved to Config.LEARNER_INDEX_PATH after every change and loaded
+from there on restart.
+"""
+import os
+import pickle
+import struct
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+import numpy as np
+
+from filter_compiler import fiscal_year_range
+from fiscal_calendar import fiscal_year as fiscal_year_of
+from metrics_engine import SHE_CATEGORY, months_in_range, normalize_key
+
+ARRAY_MAX = 4096            # Containers with more values than this are stored as bitsets
+CONTAINER_SIZE = 1 << 16    # Values per container (the low 16 bits of an id)
+LOAD_BATCH = 50000          # master_data rows fetched per keyset batch
+SYNC_OVERLAP = 1000         # Indexed ids re-read by every sync, for rows that committed late
+FORMAT_VERSION = 1          # Bump when the saved layout changes; older files are rebuilt
+
+# Bits set in each byte value, for bitset cardinality
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+# Filters the index cannot answer; any of them set means "use SQL"
+UNSUPPORTED_FILTERS = ('per_no', 'bc_no', 'month_report_pmo_21_20', 'month_cd_key_26_25', 'tni_status')
+
+# Cell key layout
+CELL_FIELDS = ('fiscal_year', 'factory', 'training_name', 'calendar_month',
+               'pmo_training_category', 'pl_category', 'gender')
+
+
+def _is_bitset(container):
+    return container.dtype == np.uint8
+
+
+def _to_bitset(values):
+    flags = np.zeros(CONTAINER_SIZE, dtype=bool)
+    flags[values] = True
+    return np.packbits(flags, bitorder='little')
+
+
+def _to_values(bitset):
+    return np.flatnonzero(np.unpackbits(bitset, bitorder='little')).astype(np.uint16)
+
+
+def _container_size(container):
+    if _is_bitset(container):
+        return int(_POPCOUNT[container].sum())
+    return len(container)
+
+
+def _container(values):
+    """Container for sorted unique uint16 values: kept as an array up to ARRAY_MAX, else a bitset"""
+    return values if len(values) <= ARRAY_MAX else _to_bitset(values)
+
+
+def _shrink(bitset):
+    """A bitset container, or a sorted uint16 array when it has few enough values"""
+    if _container_size(bitset) <= ARRAY_MAX:
+        return _to_values(bitset)
+    return bitset
+
+
+class Bitmap:
+    """Roaring-style set of ids below 2**32.
+
+    Ids are split into 16-bit containers keyed by their high bits. A container
+    is a sorted uint16 array while it holds at most ARRAY_MAX values and a
+    65536-bit bitset (8 KB of uint8) beyond that.
+    """
+    __slots__ = ('containers',)
+
+    def __init__(self, containers=None):
+        self.containers = containers or {}
+
+    @classmethod
+    def from_ids(cls, ids):
+        ids = sorted(set(ids))
+        if not ids:
+            return cls()
+        if ids[-1] < CONTAINER_SIZE:
+            # The common case (fewer than 65536 learners): a single container
+            return cls({0: _container(np.array(ids, dtype=np.uint16))})
+        ids = np.array(ids, dtype=np.uint32)
+        bounds = np.flatnonzero(np.diff(ids >> 16)) + 1
+        return cls({int(chunk[0] >> 16): _container((chunk & 0xFFFF).astype(np.uint16))
+                    for chunk in np.split(ids, bounds)})
+
+    @classmethod
+    def union_all(cls, bitmaps):
+        """Union of many bitmaps in one pass per container"""
+        grouped = defaultdict(list)
+        for bitmap in bitmaps:
+            for high, container in bitmap.containers.items():
+                grouped[high].append(container)
+        containers = {}
+        for high, parts in grouped.items():
+            if len(parts) == 1:
+                containers[high] = parts[0]
+                continue
+            flags = np.zeros(CONTAINER_SIZE, dtype=bool)
+            arrays = []
+            for part in parts:
+                if part.dtype == np.uint8:
+                    flags |= np.unpackbits(part, bitorder='little').view(bool)
+                else:
+                    arrays.append(part)
+            if arrays:
+                flags[np.concatenate(arrays)] = True
+            containers[high] = _container(np.flatnonzero(flags).astype(np.uint16))
+        return cls(containers)
+
+    def __or__(self, other):
+        return Bitmap.union_all([self, other])
+
+    def __and__(self, other):
+        containers = {}
+        for high in self.containers.keys() & other.containers.keys():
+            a, b = self.containers[high], other.containers[high]
+            if _is_bitset(a) and _is_bitset(b):
+                result = _shrink(a & b)
+            elif _is_bitset(a) or _is_bitset(b):
+                values, bitset = (b, a) if _is_bitset(a) else (a, b)
+                bits = np.unpackbits(bitset, bitorder='little')
+                result = values[bits[values].astype(bool)]
+            else:
+                result = np.intersect1d(a, b, assume_unique=True).astype(np.uint16)
+            if _container_size(result):
+                containers[high] = result
+        return Bitmap(containers)
+
+    def __len__(self):
+        return sum(_container_size(container) for container in self.containers.values())
+
+    def to_bytes(self):
+        """Compact serialization: per container its high key, kind, length and raw values"""
+        out = [struct.pack('<I', len(self.containers))]
+        for high, container in sorted(self.containers.items()):
+            out.append(struct.pack('<HBI', high, _is_bitset(container), len(container)))
+            out.append(container.tobytes())
+        return b''.join(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        (count,), offset = struct.unpack_from('<I', data), 4
+        containers = {}
+        for _ in range(count):
+            high, bitset, length = struct.unpack_from('<HBI', data, offset)
+            offset += struct.calcsize('<HBI')
+            dtype = np.uint8 if bitset else np.uint16
+            size = length * np.dtype(dtype).itemsize
+            containers[high] = np.frombuffer(data, dtype=dtype, count=length, offset=offset).copy()
+            offset += size
+        return cls(containers)
+
+
+def _matcher(filters):
+    """Predicate over cell keys mirroring apply_standard_filters, or None if unsupported"""
+    if any(filters.get(key) for key in UNSUPPORTED_FILTERS):
+        return None
+    if filters.get('start_date') and filters.get('end_date'):
+        return None
+
+    equals = {}
+    for key in ('factory', 'training_name', 'calendar_month'):
+        if filters.get(key):
+            equals[key] = normalize_key(filters[key])
+    for key in ('gender', 'pl_category'):
+        if filters.get(key) and filters[key] != 'All':
+            equals[key] = normalize_key(filters[key])
+    pmo = filters.get('pmo_training_category')
+    if pmo and pmo != 'All' and pmo != 'PMO':
+        equals['pmo_training_category'] = normalize_key(pmo)
+    exclude_she = pmo == 'PMO'
+    she = normalize_key(SHE_CATEGORY)
+
+    months = None
+    if filters.get('month_range_start') and filters.get('month_range_end'):
+        in_range = months_in_range(filters['month_range_start'], filters['month_range_end'])
+        if in_range is not None:
+            months = {normalize_key(month) for month in in_range}
+    # Every indexed learner is permanent, so any other group matches nobody
+    group = filters.get('employee_group')
+    nobody = bool(group) and normalize_key(group) != 'permanent'
+
+    positions = [(CELL_FIELDS.index(key), value) for key, value in equals.items()]
+    month_position = CELL_FIELDS.index('calendar_month')
+    pmo_position = CELL_FIELDS.index('pmo_training_category')
+
+    def matches(cell):
+        if nobody:
+            return False
+        for position, value in positions:
+            if cell[position] != value:
+                return False
+        if months is not None and cell[month_position] not in months:
+            return False
+        if exclude_she and (cell[pmo_position] is None or cell[pmo_position] == she):
+            return False
+        return True
+
+    return matches
+
+
+class LearnerIndex:
+    """per_no dictionary plus one Bitmap per master_data cell, bucketed by (fiscal year, factory)"""
+
+    def __init__(self):
+        self.ids = {}         # normalized per_no -> dense id
+        self.per_nos = []     # dense id -> per_no
+        self.cells = {}       # (fiscal year, factory) -> {cell key: Bitmap}
+        self.last_id = 0      # Highest master_data id indexed
+        self.version = None   # master_data version stamp the index was built from
+        self.built_at = time.time()  # When the full build started (rebuilt after Config.LEARNER_INDEX_TTL)
+
+    def learner_id(self, per_no):
+        key = normalize_key(per_no)
+        learner_id = self.ids.get(key)
+        if learner_id is None:
+            learner_id = self.ids[key] = len(self.per_nos)
+            self.per_nos.append(str(per_no).strip())
+        return learner_id
+
+    def expired(self, ttl):
+        return bool(ttl) and time.time() - self.built_at > ttl
+
+    def add_rows(self, rows):
+        """Add master_data rows (permanent, with per_no) to their cells; returns the
+        number of (cell, learner) pairs that were new"""
+        pending = defaultdict(list)
+        normalized = {}  # Dimension values repeat a lot; normalize each once
+        for row in rows:
+            year = fiscal_year_of(row['start_date']) if row['start_date'] else None
+            values = tuple(row[field] for field in CELL_FIELDS[1:])
+            cell = normalized.get(values)
+            if cell is None:
+                cell = normalized[values] = tuple(normalize_key(value) for value in values)
+            pending[(year,) + cell].append(self.learner_id(row['per_no']))
+            self.last_id = max(self.last_id, row['id'])
+        new = 0
+        for cell, ids in pending.items():
+            bucket = self.cells.setdefault(cell[:2], {})
+            added = Bitmap.from_ids(ids)
+            before = len(bucket[cell]) if cell in bucket else 0
+            bucket[cell] = bucket[cell] | added if cell in bucket else added
+            new += len(bucket[cell]) - before
+        return new
+
+    def _matching(self, filters):
+        matches = _matcher(filters)
+        if matches is None:
+            return None
+        year = factory = None
+        if filters.get('fiscal_year'):
+            try:
+                year = fiscal_year_range(filters['fiscal_year'])[0].year
+            except (ValueError, IndexError):
+                return None
+        if filters.get('factory'):
+            factory = normalize_key(filters['factory'])
+        buckets = [bucket for (bucket_year, bucket_factory), bucket in self.cells.items()
+                   if (year is None or bucket_year == year) and (factory is None or bucket_factory == factory)]
+        return [(cell, bitmap) for bucket in buckets for cell, bitmap in bucket.items() if matches(cell)]
+
+    def learners(self, filters):
+        """Bitmap of the permanent learners matching the filters, or None if unsupported"""
+        matching = self._matching(filters)
+        if matching is None:
+            return None
+        return Bitmap.union_all(bitmap for _, bitmap in matching)
+
+    def count(self, filters):
+        """Unique permanent learners matching the filters, or None if unsupported"""
+        learners = self.learners(filters)
+        return None if learners is None else len(learners)
+
+    def count_by(self, filters, field):
+        """{normalized field value: unique learners} like a GROUP BY field, or None if unsupported"""
+        matching = self._matching(filters)
+        if matching is None:
+            return None
+        position = CELL_FIELDS.index(field)
+        groups = defaultdict(list)
+        for cell, bitmap in matching:
+            groups[cell[position]].append(bitmap)
+        return {value: len(Bitmap.union_all(bitmaps)) for value, bitmaps in groups.items()}
+
+    def bitmap_of(self, per_nos):
+        """Bitmap of known employees among per_nos (others have no training records)"""
+        ids = [self.ids[key] for key in (normalize_key(p) for p in per_nos if p) if key in self.ids]
+        return Bitmap.from_ids(ids)
+
+    def state(self):
+        return {
+            'format': FORMAT_VERSION,
+            'per_nos': self.per_nos,
+            'cells': {cell: bitmap.to_bytes() for bucket in self.cells.values()
+                      for cell, bitmap in bucket.items()},
+            'last_id': self.last_id,
+            'version': self.version,
+            'built_at': self.built_at,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        index = cls()
+        for per_no in state['per_nos']:
+            index.learner_id(per_no)
+        for cell, data in state['cells'].items():
+            index.cells.setdefault(cell[:2], {})[cell] = Bitmap.from_bytes(data)
+        index.last_id = state['last_id']
+        index.version = state['version']
+        index.built_at = state.get('built_at', 0)
+        return index
+
+
+def load_rows(conn, after_id=0):
+    """Permanent master_data rows with a per_no and id above after_id, in keyset batches"""
+    with conn.cursor() as cursor:
+        while True:
+            cursor.execute(f"""
+                SELECT id, per_no, start_date, {', '.join(CELL_FIELDS[1:])}
+                FROM master_data
+                WHERE employee_group = 'PERMANENT' AND per_no IS NOT NULL AND per_no != ''
+                AND id > %s
+                ORDER BY id
+                LIMIT %s
+            """, (after_id, LOAD_BATCH))
+            rows = cursor.fetchall()
+            if not rows:
+                return
+            yield rows
+            after_id = rows[-1]['id']
+
+
+def save_index(index, path):
+    """Write the index atomically, so a crash never leaves a half-written file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Unique per writer: processes sharing the file may save at the same time
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(index.state(), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_index(path):
+    """The saved index, or None if it is missing, unreadable or an older format"""
+    try:
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        if state.get('format') != FORMAT_VERSION:
+            return None
+        return LearnerIndex.from_state(state)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Error reading learner index {path}: {str(e)}")
+        return None
+
+
+_index = None
+_synced_stamps = None   # (master_data, attendance) version stamps the index reflects
+_lock = threading.Lock()
+
+
+def _sync(conn, index):
+    """Add the rows past index.last_id - SYNC_OVERLAP; returns how many cell memberships were new"""
+    added = 0
+    for rows in load_rows(conn, max(0, index.last_id - SYNC_OVERLAP)):
+        added += index.add_rows(rows)
+    return added
+
+
+def get_learner_index():
+    """The process's index, brought up to date with master_data; None while another
+    request is rebuilding it or if it cannot be built (callers then use SQL)"""
+    global _index, _synced_stamps
+    from filter_options import current_version
+    from utils import Config, get_db_connection
+
+    stamps = (current_version('master_data'), current_version('attendance'))
+    if _index is not None and stamps == _synced_stamps and not _index.expired(Config.LEARNER_INDEX_TTL):
+        return _index
+    if not _lock.acquire(blocking=False):
+        return None
+    try:
+        index = _index or read_index(Config.LEARNER_INDEX_PATH)
+        # Uploads may replace or delete rows, which a bitmap cannot take back: start over
+        rebuild = index is None or index.version != stamps[0] or index.expired(Config.LEARNER_INDEX_TTL)
+        if rebuild:
+            index = LearnerIndex()
+        conn = get_db_connection()
+        try:
+            added = _sync(conn, index)
+        finally:
+            conn.close()
+        index.version = stamps[0]
+        _index, _synced_stamps = index, stamps
+        if rebuild or added:
+            save_index(index, Config.LEARNER_INDEX_PATH)
+        return index
+    except Exception as e:
+        print(f"Error updating learner index: {str(e)}")
+        return None
+    finally:
+        _lock.release()
+
+
+if __name__ == '__main__':
+    # python learner_index.py rebuild   (rebuild and save the index from master_data)
+    import sys
+    from filter_options import current_version
+    from utils import Config, get_db_connection
+
+    if (sys.argv[1] if len(sys.argv) > 1 else 'rebuild') != 'rebuild':
+        sys.exit("usage: python learner_index.py rebuild")
+    started = time.perf_counter()
+    index = LearnerIndex()
+    index.version = current_version('master_data')
+    conn = get_db_connection()
+    try:
+        _sync(conn, index)
+    finally:
+        conn.close()
+    save_index(index, Config.LEARNER_INDEX_PATH)
+    cells = sum(len(bucket) for bucket in index.cells.values())
+    print(f"Indexed {len(index.per_nos)} learners in {cells} cells in {time.perf_counter() - started:.1f}s"
+          f" -> {Config.LEARNER_INDEX_PATH}")
@@ -0,0 +1,158 @@
+import sys
+
+import pymysql
+
+LEARNING_HOURS_COLUMN = 'computed_learning_hours'
+BACKFILL_CHUNK_SIZE = 5000
+
+_column_present = False
+
+
+def calculate_learning_hours(record):
+    """Calculate learning hours - use manual value if exists, otherwise calculate based on attendance"""
+    manual_hours = record.get('learning_hours')
+    if manual_hours is not None and manual_hours != '' and manual_hours != 0:
+        return int(manual_hours)
+
+    program_hours = int(record.get('program_hours') or 0)
+    day1 = bool(record.get('day_1_attendance'))
+    day2 = bool(record.get('day_2_attendance'))
+    day3 = bool(record.get('day_3_attendance'))
+
+    if program_hours <= 8:
+        return program_hours if day1 else 0
+    else:
+        attended_days = sum([1 for day in [day1, day2, day3] if day])
+        return min(attended_days * 8, program_hours)
+
+
+def learning_hours_sql(manual, program, day1, day2, day3):
+    """SQL expression applying calculate_learning_hours to the given columns"""
+    attended = f"(IFNULL({day1}, 0) <> 0) + (IFNULL({day2}, 0) <> 0) + (IFNULL({day3}, 0) <> 0)"
+    program_hours = f"TRUNCATE(IFNULL({program}, 0), 0)"
+    return (
+        f"CASE"
+        f" WHEN IFNULL({manual}, 0) <> 0 THEN TRUNCATE({manual}, 0)"
+        f" WHEN {program_hours} <= 8 THEN IF(IFNULL({day1}, 0) <> 0, {program_hours}, 0)"
+        f" ELSE LEAST(8 * ({attended}), {program_hours})"
+        f" END"
+    )
+
+
+def master_data_expression(prefix=''):
+    # master_data keeps a single hours column: it is both the manual value and the program hours
+    hours = f"{prefix}learning_hours"
+    return learning_hours_sql(hours, hours, f"{prefix}day_1_attendance",
+                              f"{prefix}day_2_attendance", f"{prefix}day_3_attendance")
+
+
+def _column_exists(cursor):
+    cursor.execute("SHOW COLUMNS FROM master_data LIKE %s", (LEARNING_HOURS_COLUMN,))
+    return cursor.fetchone() is not None
+
+
+def _add_trigger_column(cursor):
+    """Fallback for servers without generated columns: plain column kept current by triggers"""
+    cursor.execute(f"ALTER TABLE master_data ADD COLUMN {LEARNING_HOURS_COLUMN} INT NOT NULL DEFAULT 0")
+    for event in ('INSERT', 'UPDATE'):
+        cursor.execute(f"DROP TRIGGER IF EXISTS master_data_learning_hours_{event.lower()}")
+        cursor.execute(f"""
+            CREATE TRIGGER master_data_learning_hours_{event.lower()}
+            BEFORE {event} ON master_data FOR EACH ROW
+            SET NEW.{LEARNING_HOURS_COLUMN} = {master_data_expression('NEW.')}
+        """)
+
+
+def learning_hours_column_step(conn):
+    """Migration step: add master_data.computed_learning_hours.
+
+    A STORED generated column is preferred (MySQL fills it while rebuilding the
+    table); if the server rejects it, a trigger-maintained column is added and
+    backfilled instead.
+    """
+    with conn.cursor() as cursor:
+        if _column_exists(cursor):
+            return f"{LEARNING_HOURS_COLUMN} exists"
+        try:
+            cursor.execute(f"""
+                ALTER TABLE master_data ADD COLUMN {LEARNING_HOURS_COLUMN} INT
+                AS ({master_data_expression()}) STORED
+            """)
+            return f"{LEARNING_HOURS_COLUMN} generated"
+        except pymysql.MySQLError as e:
+            print(f"Generated learning hours column not supported ({e}); using triggers")
+            _add_trigger_column(cursor)
+    return f"{LEARNING_HOURS_COLUMN} added with triggers, {backfill_learning_hours(conn)} rows backfilled"
+
+
+def has_learning_hours_column(conn):
+    """Whether migration 7 has added the column; only a found column is remembered"""
+    global _column_present
+    if not _column_present:
+        try:
+            with conn.cursor() as cursor:
+                _column_present = _column_exists(cursor)
+        except Exception as e:
+            print(f"Error checking learning hours column: {str(e)}")
+    return _column_present
+
+
+def learning_hours_column(conn, prefix=''):
+    """Column to SUM for master_data learning hours (inline expression until the migration has run)"""
+    if has_learning_hours_column(conn):
+        return f"{prefix}{LEARNING_HOURS_COLUMN}"
+    return master_data_expression(prefix)
+
+
+def _is_generated(cursor):
+    cursor.execute("""
+        SELECT EXTRA FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'master_data' AND COLUMN_NAME = %s
+    """, (LEARNING_HOURS_COLUMN,))
+    row = cursor.fetchone()
+    return bool(row and 'GENERATED' in (row['EXTRA'] or '').upper())
+
+
+def backfill_learning_hours(conn, chunk_size=BACKFILL_CHUNK_SIZE):
+    """Recompute the column for every existing row in id-range chunks.
+
+    Generated columns are recomputed with one MODIFY (a table rebuild); the
+    trigger-maintained column is updated chunk by chunk so no single statement
+    locks the whole table. Returns the number of rows touched.
+    """
+    with conn.cursor() as cursor:
+        if _is_generated(cursor):
+            cursor.execute(f"""
+                ALTER TABLE master_data MODIFY COLUMN {LEARNING_HOURS_COLUMN} INT
+                AS ({master_data_expression()}) STORED
+            """)
+            cursor.execute("SELECT COUNT(*) AS total FROM master_data")
+            return cursor.fetchone()['total']
+
+        cursor.execute("SELECT MIN(id) AS low, MAX(id) AS high FROM master_data")
+        bounds = cursor.fetchone()
+        if not bounds or bounds['low'] is None:
+            return 0
+        updated = 0
+        for start in range(bounds['low'], bounds['high'] + 1, chunk_size):
+            cursor.execute(f"""
+                UPDATE master_data SET {LEARNING_HOURS_COLUMN} = {master_data_expression()}
+                WHERE id BETWEEN %s AND %s
+            """, (start, start + chunk_size - 1))
+            updated += cursor.rowcount
+        return updated
+
+
+if __name__ == '__main__':
+    # python learning_hours.py backfill -- recompute the column after editing rows with triggers disabled
+    from utils import get_db_connection
+
+    if sys.argv[1:] != ['backfill']:
+        sys.exit("usage: python learning_hours.py backfill")
+    conn = get_db_connection()
+    try:
+        if not has_learning_hours_column(conn):
+            sys.exit(f"master_data has no {LEARNING_HOURS_COLUMN}; run python migrations.py migrate")
+        print(f"Backfilled {backfill_learning_hours(conn)} master_data rows")
+    finally:
+        conn.close()
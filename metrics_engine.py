@@ -0,0 +1,140 @@
+from collections import defaultdict
+
+from fiscal_calendar import FISCAL_MONTHS
+
+# Filter keys that the cube keeps as dimensions instead of pushing into SQL
+CUBE_DIMENSION_KEYS = (
+    'training_name', 'pl_category', 'pmo_training_category',
+    'calendar_month', 'month_range_start', 'month_range_end'
+)
+
+SHE_CATEGORY = 'SHE (Safety+Health)'
+
+MONTH_ORDER = ['January', 'February', 'March', 'April', 'May', 'June',
+               'July', 'August', 'September', 'October', 'November', 'December']
+
+FISCAL_MONTH_ORDER = FISCAL_MONTHS
+
+
+def normalize_key(value):
+    """Normalize a dimension value the way MySQL's default _ci/PAD SPACE collation compares it"""
+    if value is None:
+        return None
+    return str(value).rstrip().lower()
+
+
+def base_filters(filters):
+    """Copy of filters with the cube dimensions removed (these are sliced in memory)"""
+    return {k: v for k, v in filters.items() if k not in CUBE_DIMENSION_KEYS}
+
+
+def cube_key(filters):
+    """Hashable key identifying which cube a filter set can be answered from"""
+    return tuple(sorted((k, str(v)) for k, v in base_filters(filters).items() if v not in (None, '')))
+
+
+def months_in_range(month_range_start, month_range_end):
+    """Calendar months covered by a month range filter (wrapping across December)"""
+    try:
+        start_idx = MONTH_ORDER.index(month_range_start)
+        end_idx = MONTH_ORDER.index(month_range_end)
+    except ValueError:
+        return None
+    if start_idx > end_idx:
+        return MONTH_ORDER[start_idx:] + MONTH_ORDER[:end_idx + 1]
+    return MONTH_ORDER[start_idx:end_idx + 1]
+
+
+class MetricsCube:
+    """In-memory aggregate of master_data and TNI targets for one base filter set.
+
+    actual_rows are grouped by (training_name, pl_category, pmo_training_category,
+    calendar_month) with participant counts and learning hours; target_rows are
+    grouped by (training_name, pl_category, pmo_category) with target counts. Any
+    combination of the dimension filters is answered by summing matching cells.
+    """
+
+    def __init__(self, actual_rows, target_rows):
+        self.actual_rows = [
+            (normalize_key(r['training_name']), normalize_key(r['pl_category']),
+             normalize_key(r['pmo_training_category']), r['calendar_month'],
+             int(r['participant_count'] or 0), int(r['learning_hours'] or 0))
+            for r in actual_rows
+        ]
+        self.target_rows = [
+            (normalize_key(r['training_name']), normalize_key(r['pl_category']),
+             normalize_key(r['pmo_category']), int(r['target_count'] or 0),
+             float(r['target_hours'] or 0))
+            for r in target_rows
+        ]
+
+    @staticmethod
+    def _dimension_matcher(filters):
+        """Build a predicate over (training, pl, pmo) mirroring the SQL filter builders"""
+        training = normalize_key(filters.get('training_name')) if filters.get('training_name') else None
+        pl = filters.get('pl_category')
+        pl = normalize_key(pl) if pl and pl != 'All' else None
+        pmo = filters.get('pmo_training_category')
+        she = normalize_key(SHE_CATEGORY)
+
+        def matches(row_training, row_pl, row_pmo):
+            if training is not None and row_training != training:
+                return False
+            if pl is not None and row_pl != pl:
+                return False
+            if pmo and pmo != 'All':
+                if pmo == 'PMO':
+                    # SQL "!=" never matches NULL
+                    if row_pmo is None or row_pmo == she:
+                        return False
+                elif row_pmo != normalize_key(pmo):
+                    return False
+            return True
+
+        return matches
+
+    @staticmethod
+    def _month_set(filters):
+        months = None
+        if filters.get('calendar_month'):
+            months = {filters['calendar_month']}
+        if filters.get('month_range_start') and filters.get('month_range_end'):
+            in_range = months_in_range(filters['month_range_start'], filters['month_range_end'])
+            if in_range is not None:
+                months = set(in_range) if months is None else months & set(in_range)
+        return months
+
+    def _actual_cells(self, filters, ignore_months=False):
+        matches = self._dimension_matcher(filters)
+        months = None if ignore_months else self._month_set(filters)
+        for training, pl, pmo, month, count, hours in self.actual_rows:
+            if months is not None and month not in months:
+                continue
+            if matches(training, pl, pmo):
+                yield month, count, hours
+
+    def count(self, filters):
+        """Number of master_data rows matching the dimension filters"""
+        return sum(count for _, count, _ in self._actual_cells(filters))
+
+    def learning_hours(self, filters):
+        """Sum of learning hours for master_data rows matching the dimension filters"""
+        return sum(hours for _, _, hours in self._actual_cells(filters))
+
+    def monthly_counts(self, filters):
+        """Participant counts per calendar month, ignoring month filters"""
+        counts = defaultdict(int)
+        for month, count, _ in self._actual_cells(filters, ignore_months=True):
+            counts[month] += count
+        return counts
+
+    def target(self, filters):
+        """Target (final TNI row count) and target hours matching the dimension filters"""
+        matches = self._dimension_matcher(filters)
+        target = 0
+        hours = 0
+        for training, pl, pmo, count, target_hours in self.target_rows:
+            if matches(training, pl, pmo):
+                target += count
+                hours += target_hours
+        return target, hours
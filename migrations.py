@@ -0,0 +1,261 @@
+import sys
+from datetime import datetime
+
+import pymysql
+
+from completion_counts import completion_summary_step
+from feedback_facts import (FACTS_KEY, FACTS_KEY_COLUMNS, FACTS_MIGRATION, create_feedback_facts_table,
+                            feedback_facts_step)
+from filter_compiler import NORMALIZED_COLUMNS, FULLTEXT_INDEXES, add_normalized_column, add_fulltext_index
+from fiscal_calendar import fiscal_calendar_step
+from hours_ledger import LEDGER_MIGRATION, hours_ledger_step
+from learning_hours import learning_hours_column_step
+
+
+class Index:
+    """A (possibly composite) index declaration.
+
+    columns is a list of (column, prefix_length) pairs; the prefix length is
+    only used when MySQL refuses the full column (TEXT/BLOB or key too long).
+    """
+
+    def __init__(self, table, name, columns, unique=False):
+        self.table = table
+        self.name = name
+        self.columns = [(c, None) if isinstance(c, str) else tuple(c) for c in columns]
+        self.unique = unique
+
+    @property
+    def column_names(self):
+        return [column for column, _ in self.columns]
+
+    def ddl(self, with_prefix=False):
+        parts = []
+        for column, prefix in self.columns:
+            parts.append(f"{column}({prefix})" if with_prefix and prefix else column)
+        kind = 'UNIQUE INDEX' if self.unique else 'INDEX'
+        return f"CREATE {kind} {self.name} ON {self.table} ({', '.join(parts)})"
+
+    def __call__(self, conn):
+        with conn.cursor() as cursor:
+            existing = existing_indexes(cursor, self.table)
+            if self.name in existing:
+                return f"{self.name} exists"
+            # A non-unique index never covers a unique one
+            for name, columns in ([] if self.unique else existing.items()):
+                if columns[:len(self.columns)] == self.column_names:
+                    return f"{self.name} covered by {name}"
+            try:
+                cursor.execute(self.ddl())
+            except pymysql.MySQLError as e:
+                # 1170: BLOB/TEXT column needs a key length; 1071: key too long
+                if e.args[0] not in (1170, 1071) or not any(p for _, p in self.columns):
+                    raise
+                cursor.execute(self.ddl(with_prefix=True))
+        return f"{self.name} created"
+
+
+def normalized_columns_step(conn):
+    """Stored *_norm columns used by FilterCompiler.normalized_equals"""
+    done = []
+    with conn.cursor() as cursor:
+        for table, columns in NORMALIZED_COLUMNS.items():
+            for column in columns:
+                if add_normalized_column(cursor, table, column):
+                    done.append(f"{table}.{column}_norm")
+    return ', '.join(done)
+
+
+def fulltext_step(conn):
+    """FULLTEXT indexes used by FilterCompiler.search.
+
+    feedback_facts is created here (empty; migration 8 builds it) so its index
+    is not skipped on a fresh database. Any other failure stops the migration
+    before it is recorded as applied.
+    """
+    done = []
+    with conn.cursor() as cursor:
+        create_feedback_facts_table(cursor)
+        for table, columns in FULLTEXT_INDEXES:
+            if add_fulltext_index(cursor, table, columns):
+                done.append(f"{table}({', '.join(columns)})")
+    return ', '.join(done)
+
+
+def merge_duplicate_attendance(conn):
+    """Fold duplicate (program_id, per_no) master_data rows into the oldest one.
+
+    Needed before the unique key can be added: racing check-ins could insert the
+    same attendee twice. Day flags are OR-ed and the hours recomputed from them
+    the way the check-in upsert does, from the program's hours (the highest
+    stored hours stand in when the program no longer exists).
+    """
+    duplicates = """
+        SELECT d.*,
+               IF(d.program_hours <= 8, IF(d.day1 <> 0, d.program_hours, 0),
+                  LEAST(8 * ((d.day1 <> 0) + (d.day2 <> 0) + (d.day3 <> 0)), d.program_hours)) AS hours
+        FROM (
+            SELECT m.program_id, m.per_no, MIN(m.id) AS keep_id,
+                   MAX(IFNULL(m.day_1_attendance, 0)) AS day1, MAX(IFNULL(m.day_2_attendance, 0)) AS day2,
+                   MAX(IFNULL(m.day_3_attendance, 0)) AS day3,
+                   IFNULL(MAX(tp.learning_hours), MAX(m.learning_hours)) AS program_hours
+            FROM master_data m
+            LEFT JOIN training_programs tp ON tp.id = m.program_id
+            WHERE m.program_id IS NOT NULL AND m.per_no IS NOT NULL
+            GROUP BY m.program_id, m.per_no
+            HAVING COUNT(*) > 1
+        ) d
+    """
+    conn.begin()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(duplicates)
+            groups = cursor.fetchall()
+            if groups:
+                cursor.executemany("""
+                    UPDATE master_data
+                    SET day_1_attendance = %s, day_2_attendance = %s, day_3_attendance = %s, learning_hours = %s
+                    WHERE id = %s
+                """, [(g['day1'], g['day2'], g['day3'], g['hours'], g['keep_id']) for g in groups])
+                cursor.executemany("""
+                    DELETE FROM master_data WHERE program_id = %s AND per_no = %s AND id <> %s
+                """, [(g['program_id'], g['per_no'], g['keep_id']) for g in groups])
+                removed = cursor.rowcount
+            else:
+                removed = 0
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return f"merged {removed} duplicate attendance rows"
+
+
+# The check-in upsert in attendance_app depends on this key
+ATTENDANCE_KEY = Index('master_data', 'uq_master_data_program_per_no', ['program_id', ('per_no', 32)], unique=True)
+
+
+# Tables built lazily before migration 8 lack the key; the rebuild has removed any duplicates by then
+FEEDBACK_FACTS_KEY = Index('feedback_facts', FACTS_KEY, FACTS_KEY_COLUMNS, unique=True)
+
+
+# Versioned, append-only list: never edit an applied migration, add a new one
+MIGRATIONS = [
+    (1, 'master_data access paths', [
+        Index('master_data', 'idx_master_data_per_no', [('per_no', 32)]),
+        Index('master_data', 'idx_master_data_factory_start', [('factory', 64), 'start_date']),
+        Index('master_data', 'idx_master_data_training_start', [('training_name', 150), 'start_date']),
+        Index('master_data', 'idx_master_data_start_date', ['start_date']),
+        Index('master_data', 'idx_master_data_program_per_no', ['program_id', ('per_no', 32)]),
+        Index('master_data', 'idx_master_data_calendar_month', [('calendar_month', 16), ('factory', 64)]),
+    ]),
+    (2, 'employee and TNI lookups', [
+        Index('eor_data', 'idx_eor_per_no', [('per_no', 32)]),
+        Index('eor_data', 'idx_eor_factory', [('factory', 64)]),
+        Index('tni_data', 'idx_tni_year_factory_training', ['year', ('factory', 64), ('training_name', 150)]),
+        Index('tni_data', 'idx_tni_per_no_training', [('per_no', 32), ('training_name', 150)]),
+        Index('final_tni_data', 'idx_final_tni_year_training', ['year', ('training_name', 150)]),
+        Index('final_tni_data', 'idx_final_tni_year_factory', ['year', ('factory', 64)]),
+    ]),
+    (3, 'programs, feedback and users', [
+        Index('training_programs', 'idx_programs_start', ['start_date', 'start_time']),
+        Index('training_programs', 'idx_programs_location', [('location_hall', 64), 'end_date']),
+        Index('feedback_responses', 'idx_feedback_program', [('program_title', 150), 'program_date']),
+        Index('feedback_responses', 'idx_feedback_date', ['program_date']),
+        Index('feedback_responses', 'idx_feedback_clubbed', ['clubbed_session_id']),
+        Index('user_auth', 'idx_user_auth_username', [('username', 64)]),
+    ]),
+    (4, 'normalized and FULLTEXT search columns', [
+        normalized_columns_step,
+        fulltext_step,
+    ]),
+    (5, 'one attendance row per program and employee', [
+        merge_duplicate_attendance,
+        ATTENDANCE_KEY,
+    ]),
+    (6, 'fiscal calendar dimension', [
+        fiscal_calendar_step,
+    ]),
+    (7, 'computed learning hours column', [
+        learning_hours_column_step,
+    ]),
+    (FACTS_MIGRATION, 'CIRO feedback fact table', [
+        feedback_facts_step,
+        FEEDBACK_FACTS_KEY,
+    ]),
+    (LEDGER_MIGRATION, 'employee hours ledger', [
+        hours_ledger_step,
+    ]),
+    (10, 'training completion summary', [
+        completion_summary_step,
+    ]),
+]
+
+
+def existing_indexes(cursor, table):
+    """{index name: [columns in order]} for a table"""
+    cursor.execute(f"SHOW INDEX FROM {table}")
+    indexes = {}
+    for row in sorted(cursor.fetchall(), key=lambda r: (r['Key_name'], r['Seq_in_index'])):
+        indexes.setdefault(row['Key_name'], []).append(row['Column_name'])
+    return indexes
+
+
+def ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at DATETIME NOT NULL
+        )
+    """)
+
+
+def applied_versions(conn):
+    with conn.cursor() as cursor:
+        ensure_migrations_table(cursor)
+        cursor.execute("SELECT version FROM schema_migrations")
+        return {row['version'] for row in cursor.fetchall()}
+
+
+def migrate(conn, target=None):
+    """Apply pending migrations in version order; returns [(version, description, step results)].
+
+    Each step is idempotent, so a migration interrupted halfway can simply be rerun.
+    """
+    applied = applied_versions(conn)
+    results = []
+    for version, description, steps in MIGRATIONS:
+        if version in applied or (target is not None and version > target):
+            continue
+        outcome = [step(conn) for step in steps]
+        with conn.cursor() as cursor:
+            cursor.execute("INSERT INTO schema_migrations (version, description, applied_at) VALUES (%s, %s, %s)",
+                           (version, description, datetime.now()))
+        results.append((version, description, outcome))
+    return results
+
+
+def declared_indexes():
+    """Every Index declared by the migrations (used by the advisor's SQLite stand-in)"""
+    return [step for _, _, steps in MIGRATIONS for step in steps if isinstance(step, Index)]
+
+
+if __name__ == '__main__':
+    # python migrations.py [status|migrate [version]]
+    from utils import get_db_connection
+
+    command = sys.argv[1] if len(sys.argv) > 1 else 'status'
+    conn = get_db_connection()
+    try:
+        if command == 'migrate':
+            target = int(sys.argv[2]) if len(sys.argv) > 2 else None
+            for version, description, outcome in migrate(conn, target):
+                print(f"Applied {version}: {description}")
+                for line in outcome:
+                    print(f"    {line}")
+        else:
+            applied = applied_versions(conn)
+            for version, description, _ in MIGRATIONS:
+                print(f"{version:>3} {'applied' if version in applied else 'pending':8} {description}")
+    finally:
+        conn.close()
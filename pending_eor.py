@@ -0,0 +1,65 @@
+"""Pending EOR: employees on the rolls (eor_data) with no permanent training record in master_data.
+
+Both the dashboard count and the download are a NOT EXISTS anti-join from
+eor_data to master_data on per_no, so MySQL probes the per_no index once per
+employee instead of the app loading both lists and diffing them. The same
+filters (factory, gender, employee group, BC no) narrow both sides, and an
+optional fiscal year limits which training records count.
+"""
+from filter_compiler import FilterCompiler
+
+ROW_COLUMNS = ['per_no', 'participants_name', 'bc_no', 'gender', 'employee_group', 'department', 'factory']
+
+
+def _scope(compiler, filters):
+    """Apply the dashboard filters that exist on both eor_data and master_data"""
+    factory = filters.get('factory')
+    if factory and factory != 'All':
+        compiler.equals('factory', factory)
+    gender = filters.get('gender')
+    if gender and gender != 'All':
+        compiler.equals('gender', gender)
+    if filters.get('employee_group'):
+        compiler.equals('employee_group', filters['employee_group'])
+    if filters.get('bc_no'):
+        compiler.equals('bc_no', filters['bc_no'])
+    return compiler
+
+
+def _anti_join(filters, fiscal_year=None):
+    """(NOT EXISTS clause, params) true for eor_data rows e without a matching training record"""
+    trained = _scope(FilterCompiler('m'), filters)
+    if fiscal_year:
+        trained.fiscal_year('start_date', fiscal_year)
+    query, params = trained.apply("""
+        NOT EXISTS (
+            SELECT 1 FROM master_data m
+            WHERE m.per_no = e.per_no AND m.employee_group = 'PERMANENT'
+    """, [])
+    return query + ")", params
+
+
+def pending_eor_counts(cursor, filters, fiscal_year=None):
+    """(EOR employees, pending EOR employees) matching the filters, in one statement"""
+    pending, pending_params = _anti_join(filters, fiscal_year)
+    query, params = _scope(FilterCompiler('e'), filters).apply(f"""
+        SELECT
+            COUNT(DISTINCT e.per_no) AS eor_count,
+            COUNT(DISTINCT CASE WHEN {pending} THEN e.per_no END) AS pending_count
+        FROM eor_data e
+        WHERE e.per_no IS NOT NULL AND e.per_no != ''
+    """, list(pending_params))
+    cursor.execute(query, params)
+    row = cursor.fetchone() or {}
+    return int(row.get('eor_count') or 0), int(row.get('pending_count') or 0)
+
+
+def pending_eor_query(filters, fiscal_year=None):
+    """(SQL, params) selecting the pending eor_data rows, for streaming or fetching"""
+    query, params = _scope(FilterCompiler('e'), filters).apply(f"""
+        SELECT {', '.join(f'e.{column}' for column in ROW_COLUMNS)}
+        FROM eor_data e
+        WHERE 1=1
+    """, [])
+    pending, pending_params = _anti_join(filters, fiscal_year)
+    return f"{query} AND {pending}", params + pending_params
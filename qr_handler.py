@@ -1,250 +1,335 @@
-import os
-import re
-import qrcode
-from datetime import datetime, timedelta
-from flask import request, current_app
-
-class QRHandler:
-    def __init__(self, app):
-        self.app = app
-        self.qr_folder = app.config.get('QR_FOLDER', 'static/qrcodes')
-        os.makedirs(self.qr_folder, exist_ok=True)
-
-    def sanitize_filename(self, name):
-        """Convert hall name to safe filename"""
-        name = re.sub(r'[^\w\s-]', '', name).strip().lower()
-        return re.sub(r'[-\s]+', '_', name)
-
-    def generate_attendance_qr_code(self, program_id, training_name, location_hall, start_datetime, end_datetime, duration_days):
-        """Generate attendance QR code for a program"""
-        try:
-            # Generate attendance QR
-            attendance_filename = self._generate_single_qr(
-                program_id=program_id,
-                url_path=f"/attendance/{program_id}",
-                fill_color="#160272",  # Dark blue
-                back_color="#f0f0f0"
-            )
-
-            current_app.logger.info(f"Generated attendance QR code for program {program_id}")
-            return attendance_filename
-
-        except Exception as e:
-            current_app.logger.error(f"Error generating attendance QR code: {e}")
-            raise
-
-    def _generate_single_qr(self, program_id, url_path, fill_color, back_color):
-        """Helper to generate a single QR code"""
-        qr_url = request.host_url.rstrip('/') + url_path
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_H,
-            box_size=8,
-            border=2,
-        )
-        qr.add_data(qr_url)
-        qr.make(fit=True)
-
-        img = qr.make_image(
-            fill_color=fill_color,
-            back_color=back_color
-        )
-
-        filename = f"attendance_program_{program_id}.png"
-        filepath = os.path.join(self.qr_folder, filename)
-        img.save(filepath, quality=90)
-
-        return filename
-
-    def get_qr_path(self, program_id):
-        """Get path to attendance QR code file for a program"""
-        filename = f"attendance_program_{program_id}.png"
-        filepath = os.path.join(self.qr_folder, filename)
-
-        if not os.path.exists(filepath):
-            current_app.logger.warning(f"Attendance QR code not found for program {program_id}")
-            return None
-
-        return filepath
-
-    def generate_hall_qr_code(self, hall_name):
-        """Generate a generic QR code for a hall with enhanced security"""
-        try:
-            sanitized_hall = self.sanitize_filename(hall_name)
-            hall_url = request.host_url.rstrip('/') + f"/attendance/hall/{sanitized_hall}"
-
-            data = {
-                'version': 2,
-                'hall': sanitized_hall,
-                'timestamp': datetime.now().isoformat(),
-                'url': hall_url,
-                'checksum': self._generate_checksum(hall_name)
-            }
-
-            qr = qrcode.QRCode(
-                version=2,
-                error_correction=qrcode.constants.ERROR_CORRECT_Q,
-                box_size=6,
-                border=4,
-            )
-            qr.add_data(data['url'])
-            qr.make(fit=True)
-
-            img = qr.make_image(fill_color="#006400", back_color="#ffffff")
-
-            filename = f"hall_{sanitized_hall}.png"
-            filepath = os.path.join(self.qr_folder, filename)
-            img.save(filepath)
-
-            return filename
-
-        except Exception as e:
-            current_app.logger.error(f"Error generating hall QR code: {e}")
-            raise
-
-    def get_hall_qr_filename(self, hall_name):
-        """Return existing QR filename if exists, else generate new"""
-        filename = f"hall_{self.sanitize_filename(hall_name)}.png"
-        filepath = os.path.join(self.qr_folder, filename)
-
-        if not os.path.exists(filepath):
-            try:
-                return self.generate_hall_qr_code(hall_name)
-            except Exception as e:
-                current_app.logger.error(f"Failed to generate hall QR: {e}")
-                return None
-
-        return filename
-
-    def _generate_checksum(self, text):
-        """Simple checksum for data validation"""
-        return sum(ord(char) for char in text) % 10000
-
-    def validate_qr_data(self, data):
-        """Validate QR code data structure and time validity"""
-        try:
-            required_fields = [
-                'program_id', 'training_name', 'location',
-                'start_date', 'duration_days',
-                'daily_start_time', 'daily_end_time',
-                'qr_valid_from', 'qr_valid_to'
-            ]
-
-            if not all(field in data for field in required_fields):
-                return False, "Invalid QR data structure"
-
-            now = datetime.now()
-            valid_from = datetime.fromisoformat(data['qr_valid_from'])
-            valid_to = datetime.fromisoformat(data['qr_valid_to'])
-
-            if now < valid_from:
-                return False, f"QR not valid until {valid_from.strftime('%d/%m/%Y %H:%M')}"
-
-            if now > valid_to:
-                return False, f"QR expired on {valid_to.strftime('%d/%m/%Y %H:%M')}"
-
-            start_date = datetime.fromisoformat(data['start_date']).date()
-            current_day = (datetime.now().date() - start_date).days + 1
-
-            if current_day < 1 or current_day > int(data['duration_days']):
-                return False, "No active training session today"
-
-            start_time = datetime.strptime(data['daily_start_time'], "%H:%M").time()
-            end_time = datetime.strptime(data['daily_end_time'], "%H:%M").time()
-            now_time = datetime.now().time()
-
-            adjusted_start = (datetime.combine(datetime.today(), start_time) -
-                              timedelta(minutes=15)).time()
-
-            if not (adjusted_start <= now_time <= end_time):
-                return False, (f"Attendance only valid between {adjusted_start.strftime('%H:%M')} "
-                               f"and {end_time.strftime('%H:%M')}")
-
-            return True, "Valid QR code"
-
-        except Exception as e:
-            current_app.logger.error(f"QR validation error: {e}")
-            return False, "Invalid QR code data"
-
-    def generate_feedback_qr_code(self, program_id):
-        """Generate feedback QR code for a single program using clubbed form URL"""
-        try:
-            # Use clubbed form URL even for single programs
-            feedback_url = request.host_url.rstrip('/') + f"/feedback/clubbed_form?programs={program_id}"
-            
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_H,
-                box_size=8,
-                border=2,
-            )
-            qr.add_data(feedback_url)
-            qr.make(fit=True)
-
-            img = qr.make_image(fill_color="#002501", back_color="#ffffff")  # Green for feedback
-
-            filename = f"feedback_program_{program_id}.png"
-            filepath = os.path.join(self.qr_folder, filename)
-            img.save(filepath, quality=90)
-
-            current_app.logger.info(f"Generated feedback QR code for program {program_id}")
-            return filename
-
-        except Exception as e:
-            current_app.logger.error(f"Error generating feedback QR code: {e}")
-            raise
-
-    def generate_clubbed_feedback_qr_code(self, program_ids):
-        """Generate clubbed feedback QR code for multiple programs"""
-        try:
-            # Create a URL that includes all program IDs, e.g., /feedback/clubbed_form?programs=1,2,3
-            program_ids_str = ','.join(str(pid) for pid in program_ids)
-            feedback_url = request.host_url.rstrip('/') + f"/feedback/clubbed_form?programs={program_ids_str}"
-            
-            qr = qrcode.QRCode(
-                version=2,
-                error_correction=qrcode.constants.ERROR_CORRECT_H,
-                box_size=8,
-                border=2,
-            )
-            qr.add_data(feedback_url)
-            qr.make(fit=True)
-
-            img = qr.make_image(fill_color="#4E3003", back_color="#ffffff")  # Orange for clubbed
-
-            # Create a unique filename for the clubbed QR
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-            filename = f"clubbed_feedback_{timestamp}.png"
-            filepath = os.path.join(self.qr_folder, filename)
-            img.save(filepath, quality=90)
-
-            current_app.logger.info(f"Generated clubbed feedback QR code for programs {program_ids_str}")
-            return filename
-
-        except Exception as e:
-            current_app.logger.error(f"Error generating clubbed feedback QR code: {e}")
-            raise
-
-    def get_clubbed_feedback_qr_path(self, program_ids):
-        """Get path to clubbed feedback QR code file for multiple programs"""
-        # Convert program IDs to a consistent string for filename lookup
-        program_ids_str = '_'.join(sorted(str(pid) for pid in program_ids))
-        filename = f"clubbed_feedback_{program_ids_str}.png"
-        filepath = os.path.join(self.qr_folder, filename)
-
-        if not os.path.exists(filepath):
-            current_app.logger.warning(f"Clubbed feedback QR code not found for programs {program_ids_str}")
-            return None
-
-        return filepath
-
-    def get_feedback_qr_path(self, program_id):
-        """Get path to feedback QR code file for a program"""
-        filename = f"feedback_program_{program_id}.png"
-        filepath = os.path.join(self.qr_folder, filename)
-
-        if not os.path.exists(filepath):
-            current_app.logger.warning(f"Feedback QR code not found for program {program_id}")
-            return None
-
-        return filepath
\ No newline at end of file
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import uuid
+import qrcode
+import qrcode.image.svg
+from datetime import datetime, timedelta
+from flask import request, current_app, send_file
+
+# Render parameters per QR kind; they are part of the cache key, so changing a
+# colour or size here produces new files instead of serving stale ones
+QR_STYLES = {
+    'attendance': {'version': 1, 'error_correction': 'H', 'box_size': 8, 'border': 2,
+                   'fill_color': '#160272', 'back_color': '#f0f0f0'},  # Dark blue
+    'hall': {'version': 2, 'error_correction': 'Q', 'box_size': 6, 'border': 4,
+             'fill_color': '#006400', 'back_color': '#ffffff'},
+    'feedback': {'version': 1, 'error_correction': 'H', 'box_size': 8, 'border': 2,
+                 'fill_color': '#002501', 'back_color': '#ffffff'},  # Green for feedback
+    'clubbed': {'version': 2, 'error_correction': 'H', 'box_size': 8, 'border': 2,
+                'fill_color': '#4E3003', 'back_color': '#ffffff'},  # Orange for clubbed
+}
+
+ERROR_CORRECTION = {
+    'L': qrcode.constants.ERROR_CORRECT_L,
+    'M': qrcode.constants.ERROR_CORRECT_M,
+    'Q': qrcode.constants.ERROR_CORRECT_Q,
+    'H': qrcode.constants.ERROR_CORRECT_H,
+}
+
+QR_MIMETYPES = {'png': 'image/png', 'svg': 'image/svg+xml'}
+QR_CACHE_MAX_AGE = 365 * 24 * 3600  # Content-addressed URLs never change
+QR_GC_MIN_AGE = 24 * 3600  # Unreferenced QR files younger than this are kept
+
+# qr_<key>.json holds the payload, qr_<key>.png/.svg are rendered from it on demand
+CACHE_FILE_RE = re.compile(r'^qr_([0-9a-f]{32})\.(png|svg|json)$')
+LEGACY_FILE_RE = re.compile(r'^(attendance_program_|feedback_program_|clubbed_feedback_|hall_).*\.png$')
+
+
+def _write_atomic(path, write):
+    """Write via a temp file and rename, so concurrent renders never serve a partial file"""
+    # Unique per writer: threads of one process render the same key concurrently too
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp, 'wb') as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class QRHandler:
+    def __init__(self, app):
+        self.app = app
+        self.qr_folder = app.config.get('QR_FOLDER', 'static/qrcodes')
+        os.makedirs(self.qr_folder, exist_ok=True)
+
+    def sanitize_filename(self, name):
+        """Convert hall name to safe filename"""
+        name = re.sub(r'[^\w\s-]', '', name).strip().lower()
+        return re.sub(r'[-\s]+', '_', name)
+
+    # --- content-addressed cache -------------------------------------------------
+
+    def qr_key(self, url, style):
+        """Hash of the payload URL plus render parameters"""
+        payload = json.dumps({'url': url, 'style': QR_STYLES[style]}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+    def cache_path(self, key, fmt):
+        return os.path.join(self.qr_folder, f"qr_{key}.{fmt}")
+
+    def cache_filename(self, key, fmt='png'):
+        return f"qr_{key}.{fmt}"
+
+    def key_from_filename(self, filename):
+        """Cache key for a qr_<key>.<fmt> filename, or None for anything else"""
+        match = CACHE_FILE_RE.match(filename or '')
+        return match.group(1) if match else None
+
+    def register(self, url, style):
+        """Record a QR payload without rendering it; returns the cache key.
+
+        Registering an unchanged URL is just a hash and an existence check, so
+        editing a program no longer re-renders its QR code.
+        """
+        key = self.qr_key(url, style)
+        manifest = self.cache_path(key, 'json')
+        if not os.path.exists(manifest):
+            data = json.dumps({'url': url, 'style': style, 'created': datetime.now().isoformat()})
+            _write_atomic(manifest, lambda f: f.write(data.encode('utf-8')))
+        return key
+
+    def render(self, key, fmt='png'):
+        """Path of the rendered image, rendering it on first use; None if the key is unknown"""
+        path = self.cache_path(key, fmt)
+        if os.path.exists(path):
+            return path
+        try:
+            with open(self.cache_path(key, 'json'), encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        params = QR_STYLES[manifest['style']]
+        qr = qrcode.QRCode(
+            version=params['version'],
+            error_correction=ERROR_CORRECTION[params['error_correction']],
+            box_size=params['box_size'],
+            border=params['border'],
+        )
+        qr.add_data(manifest['url'])
+        qr.make(fit=True)
+
+        if fmt == 'svg':
+            # Vector output: one <path>, far cheaper to produce than a PNG
+            factory = type('StyledSvgImage', (qrcode.image.svg.SvgPathImage,), {
+                'QR_PATH_STYLE': dict(qrcode.image.svg.SvgPathImage.QR_PATH_STYLE, fill=params['fill_color']),
+                'background': params['back_color'],
+            })
+            img = qr.make_image(image_factory=factory)
+            _write_atomic(path, img.save)
+        else:
+            img = qr.make_image(fill_color=params['fill_color'], back_color=params['back_color'])
+            _write_atomic(path, lambda f: img.save(f, format='PNG'))
+        return path
+
+    def send(self, key, fmt='png', immutable=False, download_name=None):
+        """Response for a cached QR (ETag = key), or None if the key is unknown.
+
+        immutable=True is for URLs that contain the key; URLs that can point at a
+        different QR later (e.g. /qrcode/<program_id>) revalidate with the ETag.
+        """
+        path = self.render(key, fmt)
+        if not path:
+            return None
+        response = send_file(path, mimetype=QR_MIMETYPES[fmt], etag=f"{key}.{fmt}", conditional=True,
+                             download_name=f"{download_name}.{fmt}" if download_name else None,
+                             max_age=QR_CACHE_MAX_AGE if immutable else 0)
+        # Admin-only images: browsers may cache them, shared proxies may not
+        response.cache_control.public = False
+        response.cache_control.private = True
+        if immutable:
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+        return response
+
+    def discard(self, filename):
+        """Delete a QR file and, for cache entries, every rendering of it"""
+        key = self.key_from_filename(filename)
+        paths = ([self.cache_path(key, ext) for ext in ('png', 'svg', 'json')] if key
+                 else [os.path.join(self.qr_folder, os.path.basename(filename))])
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # Never rendered or already collected
+
+    def collect_garbage(self, referenced, min_age=QR_GC_MIN_AGE):
+        """Remove QR files not in referenced (filenames or keys) and older than min_age seconds.
+
+        Recently written files are kept so QRs handed out by the generator pages
+        (feedback and clubbed feedback are not stored in the database) stay
+        available for a while. Returns the number of files removed.
+        """
+        keep_keys = {self.key_from_filename(name) or name for name in referenced if name}
+        cutoff = time.time() - min_age
+        removed = 0
+        for name in os.listdir(self.qr_folder):
+            match = CACHE_FILE_RE.match(name)
+            if match:
+                if match.group(1) in keep_keys:
+                    continue
+            elif not LEGACY_FILE_RE.match(name) or name in keep_keys:
+                continue
+            path = os.path.join(self.qr_folder, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+    # --- QR kinds ------------------------------------------------------------------
+
+    def attendance_url(self, program_id):
+        return request.host_url.rstrip('/') + f"/attendance/{program_id}"
+
+    def generate_attendance_qr_code(self, program_id, training_name, location_hall, start_datetime, end_datetime, duration_days):
+        """Register the attendance QR code for a program; it is rendered on first request"""
+        try:
+            key = self.register(self.attendance_url(program_id), 'attendance')
+            current_app.logger.info(f"Registered attendance QR code for program {program_id}")
+            return self.cache_filename(key)
+
+        except Exception as e:
+            current_app.logger.error(f"Error generating attendance QR code: {e}")
+            raise
+
+    def generate_hall_qr_code(self, hall_name):
+        """Generate a generic QR code for a hall with enhanced security"""
+        try:
+            sanitized_hall = self.sanitize_filename(hall_name)
+            hall_url = request.host_url.rstrip('/') + f"/attendance/hall/{sanitized_hall}"
+
+            # Hall QRs are handed out as static files, so render them straight away
+            key = self.register(hall_url, 'hall')
+            self.render(key)
+            return self.cache_filename(key)
+
+        except Exception as e:
+            current_app.logger.error(f"Error generating hall QR code: {e}")
+            raise
+
+    def get_hall_qr_filename(self, hall_name):
+        """Return the hall's QR filename, generating it if needed"""
+        try:
+            return self.generate_hall_qr_code(hall_name)
+        except Exception as e:
+            current_app.logger.error(f"Failed to generate hall QR: {e}")
+            return None
+
+    def _generate_checksum(self, text):
+        """Simple checksum for data validation"""
+        return sum(ord(char) for char in text) % 10000
+
+    def validate_qr_data(self, data):
+        """Validate QR code data structure and time validity"""
+        try:
+            required_fields = [
+                'program_id', 'training_name', 'location',
+                'start_date', 'duration_days',
+                'daily_start_time', 'daily_end_time',
+                'qr_valid_from', 'qr_valid_to'
+            ]
+
+            if not all(field in data for field in required_fields):
+                return False, "Invalid QR data structure"
+
+            now = datetime.now()
+            valid_from = datetime.fromisoformat(data['qr_valid_from'])
+            valid_to = datetime.fromisoformat(data['qr_valid_to'])
+
+            if now < valid_from:
+                return False, f"QR not valid until {valid_from.strftime('%d/%m/%Y %H:%M')}"
+
+            if now > valid_to:
+                return False, f"QR expired on {valid_to.strftime('%d/%m/%Y %H:%M')}"
+
+            start_date = datetime.fromisoformat(data['start_date']).date()
+            current_day = (datetime.now().date() - start_date).days + 1
+
+            if current_day < 1 or current_day > int(data['duration_days']):
+                return False, "No active training session today"
+
+            start_time = datetime.strptime(data['daily_start_time'], "%H:%M").time()
+            end_time = datetime.strptime(data['daily_end_time'], "%H:%M").time()
+            now_time = datetime.now().time()
+
+            adjusted_start = (datetime.combine(datetime.today(), start_time) -
+                              timedelta(minutes=15)).time()
+
+            if not (adjusted_start <= now_time <= end_time):
+                return False, (f"Attendance only valid between {adjusted_start.strftime('%H:%M')} "
+                               f"and {end_time.strftime('%H:%M')}")
+
+            return True, "Valid QR code"
+
+        except Exception as e:
+            current_app.logger.error(f"QR validation error: {e}")
+            return False, "Invalid QR code data"
+
+
+    def feedback_url(self, program_ids):
+        # Use clubbed form URL even for single programs
+        return request.host_url.rstrip('/') + f"/feedback/clubbed_form?programs={','.join(str(pid) for pid in program_ids)}"
+
+    def generate_feedback_qr_code(self, program_id):
+        """Register the feedback QR code for a single program using clubbed form URL"""
+        try:
+            key = self.register(self.feedback_url([program_id]), 'feedback')
+            current_app.logger.info(f"Registered feedback QR code for program {program_id}")
+            return self.cache_filename(key)
+
+        except Exception as e:
+            current_app.logger.error(f"Error generating feedback QR code: {e}")
+            raise
+
+    def generate_clubbed_feedback_qr_code(self, program_ids):
+        """Register the clubbed feedback QR code for multiple programs.
+
+        The same set of programs always maps to the same file, instead of a new
+        timestamped PNG per click.
+        """
+        try:
+            # e.g. /feedback/clubbed_form?programs=1,2,3
+            key = self.register(self.feedback_url(program_ids), 'clubbed')
+            current_app.logger.info(f"Registered clubbed feedback QR code for programs {program_ids}")
+            return self.cache_filename(key)
+
+        except Exception as e:
+            current_app.logger.error(f"Error generating clubbed feedback QR code: {e}")
+            raise
+
+    def get_feedback_qr_key(self, program_id):
+        """Cache key of a program's feedback QR (registered again if it was collected)"""
+        return self.register(self.feedback_url([program_id]), 'feedback')
+
+
+if __name__ == '__main__':
+    # python qr_handler.py gc [min_age_seconds]: remove QR files no program references
+    from flask import Flask
+    from utils import Config, get_db_connection
+
+    if len(sys.argv) < 2 or sys.argv[1] != 'gc':
+        print("usage: python qr_handler.py gc [min_age_seconds]")
+        sys.exit(2)
+    app = Flask(__name__)
+    app.config['QR_FOLDER'] = Config.QR_FOLDER
+    handler = QRHandler(app)
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT qr_code_path FROM training_programs WHERE qr_code_path IS NOT NULL")
+            referenced = {row['qr_code_path'] for row in cursor.fetchall()}
+    finally:
+        conn.close()
+    min_age = int(sys.argv[2]) if len(sys.argv) > 2 else QR_GC_MIN_AGE
+    print(f"Removed {handler.collect_garbage(referenced, min_age)} QR files")
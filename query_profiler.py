@@ -0,0 +1,212 @@
+import json
+import logging
+import logging.handlers
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from flask import Blueprint, g, has_request_context, render_template, request, redirect, url_for, jsonify, session, abort
+
+import db_pool
+from utils import Config
+
+profiler_bp = Blueprint('profiler', __name__, url_prefix='/debug')
+
+_enabled = False
+_recent = deque(maxlen=Config.QUERY_PROFILE_HISTORY)
+_recent_lock = threading.Lock()
+_slow_log = None
+
+# Frames from these files are skipped when finding the code that issued a query
+_SKIP_FILES = (os.path.abspath(__file__), os.path.abspath(db_pool.__file__))
+
+
+def _caller():
+    """file:line (function) of the first frame outside the profiler, the pool and PyMySQL"""
+    frame = sys._getframe(2)
+    while frame:
+        filename = frame.f_code.co_filename
+        if not filename.startswith(_SKIP_FILES) and 'pymysql' not in filename:
+            return f"{os.path.basename(filename)}:{frame.f_lineno} ({frame.f_code.co_name})"
+        frame = frame.f_back
+    return None
+
+
+class ProfiledCursor:
+    """Cursor proxy that times execute()/executemany() and records each statement"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._cursor.close()
+
+    def _timed(self, method, sql, params):
+        started = time.perf_counter()
+        try:
+            return method(sql, params)
+        finally:
+            record(sql, params, self._cursor.rowcount, time.perf_counter() - started, method.__name__ == 'executemany')
+
+    def execute(self, query, args=None):
+        return self._timed(self._cursor.execute, query, args)
+
+    def executemany(self, query, args):
+        return self._timed(self._cursor.executemany, query, args)
+
+
+def param_types(params):
+    """Type names of bound parameters; the values (passwords, personal data) are never kept"""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {name: type(value).__name__ for name, value in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [type(value).__name__ for value in params]
+    return [type(params).__name__]
+
+
+def record(sql, params, rows, elapsed, many=False):
+    """Add a statement to the current request's profile and the slow-query log"""
+    elapsed_ms = elapsed * 1000
+    types = None if many else param_types(params)
+    if has_request_context():
+        queries = g.get('profiled_queries')
+        if queries is not None:
+            queries.append({
+                'sql': sql,
+                # executemany batches can be large; the count is what matters on the panel
+                'params': f"{len(params)} rows" if many and params is not None else types,
+                'rows': rows,
+                'ms': round(elapsed_ms, 2),
+                'caller': _caller(),
+            })
+    if _slow_log and elapsed_ms >= Config.SLOW_QUERY_MS:
+        # JSON lines with "sql" and "param_types" so index_advisor.py can replay the log
+        _slow_log.info(json.dumps({
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'ms': round(elapsed_ms, 2),
+            'rows': rows,
+            'path': request.path if has_request_context() else None,
+            'sql': sql,
+            'param_types': types,
+        }))
+
+
+def _open_slow_log():
+    folder = os.path.dirname(Config.SLOW_QUERY_LOG)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    logger = logging.getLogger('slow_queries')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    if not logger.handlers:
+        handler = logging.handlers.RotatingFileHandler(
+            Config.SLOW_QUERY_LOG, maxBytes=Config.SLOW_QUERY_LOG_BYTES,
+            backupCount=Config.SLOW_QUERY_LOG_BACKUPS, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+    return logger
+
+
+def enable():
+    """Start wrapping pooled cursors; the slow-query log opens on first enable"""
+    global _enabled, _slow_log
+    if _slow_log is None:
+        _slow_log = _open_slow_log()
+    db_pool.set_cursor_wrapper(ProfiledCursor)
+    _enabled = True
+
+
+def disable():
+    """Stop profiling; pooled connections hand out plain PyMySQL cursors again"""
+    global _enabled
+    db_pool.set_cursor_wrapper(None)
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def _start_request():
+    if _enabled:
+        g.profiled_queries = []
+        g.profile_started = time.perf_counter()
+
+
+def _finish_request(response):
+    queries = g.pop('profiled_queries', None)
+    if queries is None:
+        return response
+    total_ms = (time.perf_counter() - g.pop('profile_started')) * 1000
+    db_ms = sum(q['ms'] for q in queries)
+    response.headers.add('Server-Timing', f'db;dur={db_ms:.1f};desc="{len(queries)} queries"')
+    response.headers.add('Server-Timing', f'app;dur={total_ms:.1f}')
+    if request.blueprint != 'profiler':
+        with _recent_lock:
+            _recent.append({
+                'time': datetime.now().strftime('%H:%M:%S'),
+                'method': request.method,
+                'path': request.full_path.rstrip('?'),
+                'status': response.status_code,
+                'total_ms': round(total_ms, 1),
+                'db_ms': round(db_ms, 1),
+                'count': len(queries),
+                'queries': queries,
+            })
+    return response
+
+
+def init_app(app):
+    """Register the request hooks and panel; profiling itself starts only if Config.QUERY_PROFILING"""
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.register_blueprint(profiler_bp)
+    if Config.QUERY_PROFILING:
+        enable()
+
+
+@profiler_bp.route('/queries', methods=['GET'])
+def debug_queries():
+    """Admin-only list of recent requests and the statements each one issued"""
+    if session.get('role') != 'Admin':
+        abort(403)
+    with _recent_lock:
+        recent = list(reversed(_recent))
+    if request.args.get('format') == 'json':
+        return jsonify({'enabled': _enabled, 'requests': recent})
+    return render_template('admin/debug_queries.html', enabled=_enabled, requests=recent,
+                           slow_query_ms=Config.SLOW_QUERY_MS, slow_query_log=Config.SLOW_QUERY_LOG)
+
+
+@profiler_bp.route('/queries/toggle', methods=['POST'])
+def toggle_profiling():
+    if session.get('role') != 'Admin':
+        abort(403)
+    if _enabled:
+        disable()
+    else:
+        enable()
+    return redirect(url_for('profiler.debug_queries'))
+
+
+@profiler_bp.route('/queries/clear', methods=['POST'])
+def clear_profiles():
+    if session.get('role') != 'Admin':
+        abort(403)
+    with _recent_lock:
+        _recent.clear()
+    return redirect(url_for('profiler.debug_queries'))
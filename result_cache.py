@@ -0,0 +1,261 @@
+"""Cache of computed results keyed by filters, user scope and a data-version stamp.
+
+Used for the master data dashboard panels, which are identical for everyone
+looking at the same filters until the data changes. A lookup is:
+
+- fresh: same data version and younger than ttl -> served from the cache
+- stale: same data version, older than ttl but within ttl + stale_ttl ->
+  served from the cache while one background refresh recomputes it
+- missing, too old or from an older data version: computed now; concurrent
+  misses for the same key wait for the first caller's result instead of
+  computing it again (single flight)
+
+Backends are pluggable: MemoryBackend keeps entries in this process,
+SQLiteBackend shares them between the server processes on one host through a
+SQLite file. Single flight is per process either way.
+"""
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+SINGLE_FLIGHT_TIMEOUT = 120  # Seconds a concurrent miss waits for the first caller's result
+
+
+def cache_key(*parts):
+    """Stable key for JSON-able parts; empty filter values are dropped so defaults hash alike"""
+    def normalize(value):
+        if isinstance(value, dict):
+            return {str(k): normalize(v) for k, v in value.items() if v not in (None, '')}
+        if isinstance(value, (list, tuple)):
+            return [normalize(v) for v in value]
+        return value.strip() if isinstance(value, str) else value
+
+    payload = json.dumps([normalize(part) for part in parts], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class MemoryBackend:
+    """Entries in a process-local LRU dict"""
+
+    def __init__(self, max_entries=200):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend:
+    """Entries pickled into a SQLite file shared by every process on the host"""
+
+    def __init__(self, path, max_entries=200):
+        self.path = path
+        self.max_entries = max_entries
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS result_cache (
+                    key TEXT PRIMARY KEY,
+                    stored_at REAL NOT NULL,
+                    entry BLOB NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=10)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def get(self, key):
+        db = self._connect()
+        try:
+            row = db.execute("SELECT entry FROM result_cache WHERE key = ?", (key,)).fetchone()
+        finally:
+            db.close()
+        return pickle.loads(row[0]) if row else None
+
+    def set(self, key, entry):
+        db = self._connect()
+        try:
+            with db:
+                db.execute("INSERT OR REPLACE INTO result_cache (key, stored_at, entry) VALUES (?, ?, ?)",
+                           (key, time.time(), pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)))
+                db.execute("""
+                    DELETE FROM result_cache WHERE key NOT IN (
+                        SELECT key FROM result_cache ORDER BY stored_at DESC LIMIT ?
+                    )
+                """, (self.max_entries,))
+        finally:
+            db.close()
+
+    def clear(self):
+        db = self._connect()
+        try:
+            with db:
+                db.execute("DELETE FROM result_cache")
+        finally:
+            db.close()
+
+    def __len__(self):
+        db = self._connect()
+        try:
+            return db.execute("SELECT COUNT(*) FROM result_cache").fetchone()[0]
+        finally:
+            db.close()
+
+
+class ResultCache:
+    """Stale-while-revalidate cache with single-flight computation and hit statistics"""
+
+    def __init__(self, backend, ttl=300, stale_ttl=600):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._inflight = {}  # key -> Event set when the computation finishes
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'coalesced': 0,
+                       'refreshes': 0, 'errors': 0}
+
+    def _count(self, stat):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _store(self, key, version, value):
+        # Wall-clock time, so ages compare across processes sharing a backend
+        self.backend.set(key, (version, time.time(), value))
+
+    def _compute(self, key, version, compute):
+        """Compute and store as the single flight for key; others wait on the event"""
+        try:
+            value = compute()
+            self._store(key, version, value)
+            return value
+        finally:
+            with self._lock:
+                event = self._inflight.pop(key, None)
+            if event is not None:
+                event.set()
+
+    def _refresh(self, key, version, compute):
+        try:
+            self._compute(key, version, compute)
+            self._count('refreshes')
+        except Exception as e:
+            self._count('errors')
+            print(f"Error refreshing cached result: {str(e)}")
+
+    def get_or_compute(self, key, version, compute, background=None):
+        """Return the value for key, computing it with compute() when needed.
+
+        version is the data-version stamp the value must match to count as fresh.
+        background(func) wraps the refresh function before it runs on a thread
+        (e.g. flask.copy_current_request_context).
+        """
+        entry = self.backend.get(key)
+        now = time.time()
+        if entry is not None:
+            entry_version, stored_at, value = entry
+            age = now - stored_at
+            if entry_version == version and age < self.ttl:
+                self._count('hits')
+                return value
+            # Data written since the entry was stored makes it a miss, never a stale hit
+            if entry_version == version and age < self.ttl + self.stale_ttl:
+                self._count('stale_hits')
+                with self._lock:
+                    start = key not in self._inflight
+                    if start:
+                        self._inflight[key] = threading.Event()
+                if start:
+                    refresh = lambda: self._refresh(key, version, compute)
+                    thread = threading.Thread(target=background(refresh) if background else refresh,
+                                              name='result-cache-refresh', daemon=True)
+                    thread.start()
+                return value
+
+        with self._lock:
+            event = self._inflight.get(key)
+            leader = event is None
+            if leader:
+                self._inflight[key] = threading.Event()
+        if leader:
+            self._count('misses')
+            try:
+                return self._compute(key, version, compute)
+            except Exception:
+                self._count('errors')
+                raise
+
+        # Someone is already computing this key: wait for their result
+        self._count('coalesced')
+        if event.wait(SINGLE_FLIGHT_TIMEOUT):
+            entry = self.backend.get(key)
+            if entry is not None and entry[0] == version:
+                return entry[2]
+        return compute()
+
+    def invalidate(self):
+        self.backend.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['inflight'] = len(self._inflight)
+        served = stats['hits'] + stats['stale_hits'] + stats['coalesced']
+        lookups = served + stats['misses']
+        stats['hit_ratio'] = round(served / lookups, 3) if lookups else 0.0
+        stats['entries'] = len(self.backend)
+        stats['backend'] = type(self.backend).__name__
+        return stats
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_result_cache(name):
+    """Process-wide cache for name, with backend and lifetimes from utils.Config"""
+    cache = _caches.get(name)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(name)
+            if cache is None:
+                from utils import Config
+                if Config.RESULT_CACHE_BACKEND == 'sqlite':
+                    backend = SQLiteBackend(Config.RESULT_CACHE_PATH.format(name=name), Config.RESULT_CACHE_SIZE)
+                else:
+                    backend = MemoryBackend(Config.RESULT_CACHE_SIZE)
+                cache = ResultCache(backend, Config.RESULT_CACHE_TTL, Config.RESULT_CACHE_STALE)
+                _caches[name] = cache
+    return cache
+
+
+def all_stats():
+    with _caches_lock:
+        return {name: cache.stats() for name, cache in _caches.items()}
@@ -0,0 +1,229 @@
+"""Listing, filtering and download of the cd_data_store tables from one spec.
+
+Each table's columns come from cd_data_store.TABLE_CONFIGS and the filters from
+FILTERS below (a filter applies when the table has its column). A page request
+is a single statement: the filtered totals and stats are aggregated once and
+joined to the page rows. Downloads stream the same filtered query through
+export_engine, and the filter dropdowns come from filter_options.
+"""
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from cd_data_store import TABLE_CONFIGS
+from export_engine import export_response, stream_query
+from filter_compiler import escape_like
+from filter_options import get_options, register_option_columns
+from utils import get_db_connection
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# (request argument, candidate columns, match, filter-options key); the first
+# candidate column the table has is used
+FILTERS = [
+    ('plant', ('plant_location',), 'equals', 'plants'),
+    ('batch', ('batch_number',), 'equals', 'batches'),
+    ('hours', ('learning_hours',), 'number', 'learning_hours'),
+    ('gender', ('gender',), 'equals', 'genders'),
+    ('category', ('employee_category',), 'equals', 'categories'),
+    ('academic_year', ('joined_year',), 'academic_year', 'academic_years'),
+    ('faculty', ('faculty_name',), 'equals', 'faculties'),
+    ('shift', ('shift',), 'equals', 'shifts'),
+    ('fst_cell', ('fst_cell_name',), 'equals', 'fst_cells'),
+    ('ticket', ('ticket_no',), 'prefix', None),
+    ('startDate', ('date_from', 'doj'), 'from', None),
+    ('endDate', ('date_to', 'doj'), 'to', None),
+]
+
+DATE_COLUMNS = ('date_from', 'date_to', 'doj')
+
+# Download headings that are not simply the column name in title case
+COLUMN_LABELS = {
+    'sr_no': 'Sr No',
+    'ticket_no': 'Ticket No',
+    'joined_year': 'Academic Year',
+    'fst_cell_name': 'FST Cell Name',
+    'doj': 'DOJ',
+}
+
+
+def normalize_number(value):
+    """8.00 -> 8, 7.50 -> 7.5; non-numeric values are returned unchanged"""
+    try:
+        number = Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        return value
+    return int(number) if number == number.to_integral_value() else float(number)
+
+
+def academic_year(year):
+    """2023 -> "2023/24" """
+    year = int(normalize_number(year))
+    return f"{year}/{str(year + 1)[2:]}"
+
+
+class TableSpec:
+    """Columns, filters and ordering of one listing table"""
+
+    def __init__(self, name, config):
+        self.name = name
+        self.display_name = config['display_name']
+        self.columns = list(config['columns'])
+        # Newest first where there is a serial number; ticket_no is unique otherwise
+        self.order_column = 'sr_no' if 'sr_no' in self.columns else 'ticket_no'
+        self.filters = []
+        for arg, candidates, match, option_key in FILTERS:
+            column = next((c for c in candidates if c in self.columns), None)
+            if column:
+                self.filters.append((arg, column, match, option_key))
+
+    @property
+    def option_keys(self):
+        return [option_key for _, _, _, option_key in self.filters if option_key]
+
+    def option_columns(self):
+        """filter_options spec: raw distinct values per dropdown"""
+        return [(option_key, column, 'text' if match == 'equals' else 'number')
+                for _, column, match, option_key in self.filters if option_key]
+
+    def where(self, args):
+        """WHERE clause and bound parameters for the filters present in args"""
+        conditions, params = [], []
+        for arg, column, match, _ in self.filters:
+            value = (args.get(arg) or '').strip()
+            if not value or value == 'all':
+                continue
+            if match == 'equals':
+                conditions.append(f"{column} = %s")
+                params.append(value)
+            elif match == 'number':
+                # A Decimal parameter compares numerically, so 8 matches 8.00 in text columns too
+                try:
+                    params.append(Decimal(value))
+                except InvalidOperation:
+                    continue
+                conditions.append(f"{column} = %s")
+            elif match == 'academic_year':
+                # "2023/24" -> 2023
+                conditions.append(f"{column} = %s")
+                params.append(value.split('/')[0])
+            elif match == 'prefix':
+                # Prefix match so the index can be used
+                conditions.append(f"{column} LIKE %s")
+                params.append(f"{escape_like(value)}%")
+            elif match == 'from':
+                conditions.append(f"{column} >= %s")
+                params.append(value)
+            elif match == 'to':
+                conditions.append(f"{column} <= %s")
+                params.append(value)
+        return (" AND ".join(conditions) if conditions else "1=1"), params
+
+    def _stats_select(self):
+        batches = "COUNT(DISTINCT batch_number)" if 'batch_number' in self.columns else "0"
+        hours = ("COALESCE(SUM(CAST(learning_hours AS DECIMAL(10, 2))), 0)"
+                 if 'learning_hours' in self.columns else "0")
+        return f"COUNT(*) AS _total, {batches} AS _batch_count, {hours} AS _learning_hours"
+
+    def page_query(self, args, limit, offset):
+        """(SQL, params) for one page of rows joined to the filtered totals"""
+        where_clause, params = self.where(args)
+        column_list = ', '.join(self.columns)
+        sql = f"""
+            SELECT page.*, totals._total, totals._batch_count, totals._learning_hours
+            FROM (SELECT {self._stats_select()} FROM {self.name} WHERE {where_clause}) totals
+            LEFT JOIN (
+                SELECT {column_list} FROM {self.name} WHERE {where_clause}
+                ORDER BY {self.order_column} DESC LIMIT %s OFFSET %s
+            ) page ON TRUE
+            ORDER BY page.{self.order_column} DESC
+        """
+        return sql, params + params + [limit, offset]
+
+    def page(self, args, limit, offset):
+        """(records, total, stats) for one page in a single statement"""
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(*self.page_query(args, limit, offset))
+                rows = cursor.fetchall()
+        finally:
+            conn.close()
+        first = rows[0] if rows else {}
+        stats = {
+            'batch_count': first.get('_batch_count') or 0,
+            'coverage_count': first.get('_total') or 0,
+            'learning_hours': int(first.get('_learning_hours') or 0),
+        }
+        # A page past the end still returns the totals row, with no page columns
+        records = [self.format_record(row, for_json=True) for row in rows
+                   if row.get(self.order_column) is not None]
+        return records, stats['coverage_count'], stats
+
+    def rows_query(self, args):
+        """(SQL, params) selecting every filtered row, newest first"""
+        where_clause, params = self.where(args)
+        sql = (f"SELECT {', '.join(self.columns)} FROM {self.name} WHERE {where_clause} "
+               f"ORDER BY {self.order_column} DESC")
+        return sql, params
+
+    def rows(self, args):
+        """Every filtered row, formatted, streamed from a server-side cursor"""
+        for row in stream_query(*self.rows_query(args)):
+            yield self.format_record(row)
+
+    def format_record(self, row, for_json=False):
+        record = {}
+        for column in self.columns:
+            value = row.get(column)
+            if column in DATE_COLUMNS:
+                value = value.strftime('%Y-%m-%d') if isinstance(value, (date, datetime)) else (value or '')
+            elif column == 'learning_hours':
+                value = normalize_number(value) if value else 0
+            elif column == 'joined_year':
+                value = academic_year(value) if value else ''
+                if for_json:
+                    column = 'academic_year'
+            record[column] = value
+        return record
+
+    def headings(self):
+        return {column: COLUMN_LABELS.get(column, column.replace('_', ' ').title()) for column in self.columns}
+
+    def download(self, args):
+        return export_response(self.rows(args), self.headings(), f"{self.name}_data", title=self.display_name)
+
+    def filter_options(self):
+        """(dropdown values shaped for the listing pages, ETag)"""
+        options, etag = get_options(self.name)
+        payload = {}
+        for _, _, match, option_key in self.filters:
+            if not option_key:
+                continue
+            values = options[option_key]
+            if match == 'academic_year':
+                values = [academic_year(value) for value in values]
+            elif match == 'number':
+                values = list(dict.fromkeys(str(normalize_number(value)) for value in values))
+            payload[option_key] = values
+        return payload, etag
+
+
+# master_data has its own views; every other uploadable table gets a listing
+LISTING_TABLES = {name: TableSpec(name, config) for name, config in TABLE_CONFIGS.items() if name != 'master_data'}
+
+for _spec in LISTING_TABLES.values():
+    register_option_columns(_spec.name, _spec.option_columns())
+
+
+def page_bounds(args):
+    """(limit, offset) from ?limit=&offset=, clamped to sane values"""
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        limit = DEFAULT_PAGE_SIZE
+    try:
+        offset = int(args.get('offset', 0))
+    except ValueError:
+        offset = 0
+    return max(1, min(limit, MAX_PAGE_SIZE)), max(0, offset)
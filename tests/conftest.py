@@ -0,0 +1,122 @@
+"""Shared fixtures: the repo root on sys.path and a SQLite stand-in for the MySQL connection."""
+import math
+import os
+import re
+import sqlite3
+import sys
+from datetime import date
+
+import pymysql
+import pymysql.cursors
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_DATE = re.compile(r'\d{4}-\d\d-\d\d')
+
+
+class SQLiteCursor:
+    """DictCursor-like cursor translating the MySQL dialect the modules use into SQLite"""
+
+    def __init__(self, db):
+        self._cursor = db.cursor()
+        self.rowcount = 0
+
+    @staticmethod
+    def translate(sql):
+        sql = sql.replace('%s', '?').replace('INSERT IGNORE', 'INSERT OR IGNORE')
+        sql = sql.replace('CHARACTER SET utf8mb4', '')
+        return re.sub(r',\s*INDEX \w+ \([^)]*\)', '', sql)
+
+    def execute(self, sql, params=()):
+        self._cursor.execute(self.translate(sql), list(params))
+        self.rowcount = self._cursor.rowcount
+
+    def executemany(self, sql, rows):
+        self._cursor.executemany(self.translate(sql), rows)
+        self.rowcount = self._cursor.rowcount
+
+    def _row(self, row):
+        names = [column[0] for column in self._cursor.description]
+        return {name: date.fromisoformat(value) if isinstance(value, str) and _DATE.fullmatch(value) else value
+                for name, value in zip(names, row)}
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        return None if row is None else self._row(row)
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def close(self):
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SQLiteConnection:
+    """Connection with the PooledConnection surface the modules call"""
+
+    def __init__(self):
+        self.db = sqlite3.connect(':memory:', check_same_thread=False)
+        # MySQL scalar functions the modules' SQL uses
+        self.db.create_function('IF', 3, lambda condition, then, other: then if condition else other)
+        self.db.create_function('LEAST', -1, lambda *values: None if None in values else min(values))
+        self.db.create_function('TRUNCATE', 2, lambda value, places: None if value is None
+                                else math.trunc(value * 10 ** places) / 10 ** places)
+
+    def cursor(self, *args):
+        return SQLiteCursor(self.db)
+
+    def begin(self):
+        pass
+
+    def commit(self):
+        self.db.commit()
+
+    def rollback(self):
+        self.db.rollback()
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def sqlite_conn():
+    conn = SQLiteConnection()
+    yield conn
+    conn.db.close()
+
+
+@pytest.fixture(scope='session')
+def bench_conn():
+    """The benchmark database (python -m bench.datagen); never the live one, skipped when unreachable"""
+    from bench import BENCH_DB_NAME
+    from utils import Config
+    if BENCH_DB_NAME == Config.DB_NAME:
+        pytest.skip("BENCH_DB_NAME points at the live database")
+    try:
+        conn = pymysql.connect(host=Config.DB_HOST, user=Config.DB_USER, password=Config.DB_PASSWORD,
+                               database=BENCH_DB_NAME, charset='utf8mb4',
+                               cursorclass=pymysql.cursors.DictCursor, autocommit=True, connect_timeout=2)
+    except pymysql.MySQLError as e:
+        pytest.skip(f"benchmark database not available: {e}")
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def bench_pool(bench_conn, monkeypatch):
+    """Point get_db_connection() at the benchmark database for one test"""
+    import db_pool
+    from bench import BENCH_DB_NAME
+    from utils import Config
+    monkeypatch.setattr(Config, 'DB_NAME', BENCH_DB_NAME)
+    monkeypatch.setattr(db_pool, '_pool', None)
+    yield
+    if db_pool._pool is not None:
+        db_pool._pool.dispose()
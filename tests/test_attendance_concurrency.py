@@ -0,0 +1,85 @@
+"""Simultaneous QR submissions against the benchmark database: one row per employee, p99 reported."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
+
+import pytest
+from flask import Flask
+
+import attendance_app
+
+SUBMISSIONS = 500  # Every employee submits twice, all released at once
+
+
+class NoRefresh:
+    def add(self, keys):
+        pass
+
+
+@pytest.fixture
+def bench_program(bench_conn, bench_pool, monkeypatch):
+    """The all-day program bench.datagen schedules for today, and employees not yet checked in to it"""
+    # The summary refreshes are not what is measured; keep them from outliving the test
+    monkeypatch.setattr(attendance_app, '_hours_refresh', NoRefresh())
+    monkeypatch.setattr(attendance_app, '_completion_refresh', NoRefresh())
+    with bench_conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT MAX(id) AS id FROM training_programs
+            WHERE start_date = CURDATE() AND start_time = '00:00:00'
+        """)
+        program_id = cursor.fetchone()['id']
+        if not program_id:
+            pytest.skip("no check-in program for today; rebuild with python -m bench.datagen")
+        cursor.execute("""
+            SELECT e.per_no FROM eor_data e
+            WHERE e.per_no <> '' AND NOT EXISTS (
+                SELECT 1 FROM master_data m WHERE m.program_id = %s AND m.per_no = e.per_no)
+            LIMIT %s
+        """, (program_id, SUBMISSIONS // 2))
+        per_nos = [row['per_no'] for row in cursor.fetchall()]
+    yield program_id, per_nos
+    # Leave the benchmark data as it was, so the test can be rerun
+    if per_nos:
+        with bench_conn.cursor() as cursor:
+            cursor.execute(f"DELETE FROM master_data WHERE program_id = %s AND per_no IN "
+                           f"({', '.join(['%s'] * len(per_nos))})", [program_id] + per_nos)
+
+
+def test_simultaneous_submissions_leave_one_row_per_employee(bench_conn, bench_program, record_property):
+    program_id, per_nos = bench_program
+    app = Flask(__name__)
+    with app.app_context():
+        program = attendance_app.get_program_by_id(program_id)
+        employees = {per_no: attendance_app.get_employee_details(per_no) or {} for per_no in per_nos}
+    barrier = threading.Barrier(len(per_nos) * 2)
+
+    def submit(per_no):
+        data = {**{k: str(v) for k, v in program.items() if v is not None}, **employees[per_no],
+                'per_no': per_no, 'mobile_no': '9876543210', 'cordi_name': 'load check',
+                'current_day': program['current_day'] or 1}
+        barrier.wait()
+        started = monotonic()
+        with app.app_context():
+            result, success = attendance_app.save_attendance(data)
+        return monotonic() - started, success, result
+
+    with ThreadPoolExecutor(max_workers=len(per_nos) * 2) as pool:
+        outcomes = list(pool.map(submit, per_nos * 2))
+
+    with bench_conn.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT COUNT(*) AS total, COUNT(DISTINCT per_no) AS employees FROM master_data
+            WHERE program_id = %s AND per_no IN ({', '.join(['%s'] * len(per_nos))})
+        """, [program_id] + per_nos)
+        counts = cursor.fetchone()
+
+    latencies = sorted(elapsed for elapsed, _, _ in outcomes)
+    p99_ms = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    record_property('p99_ms', round(p99_ms, 1))
+    print(f"{len(outcomes)} submissions, {counts['total']} rows for {counts['employees']} employees, "
+          f"p99 {p99_ms:.1f} ms")
+    errors = [result for _, success, result in outcomes if not success and 'warning' not in result]
+    assert errors == []
+    assert counts['total'] == counts['employees'] == len(per_nos)
+    # Exactly one of each employee's two scans is recorded; the other sees it already done
+    assert sum(success for _, success, _ in outcomes) == len(per_nos)
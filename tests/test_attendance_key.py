@@ -0,0 +1,78 @@
+from contextlib import nullcontext
+
+from flask import Flask
+
+import attendance_app
+import migrations
+
+
+def load_attendance(conn, rows):
+    with conn.cursor() as cursor:
+        cursor.execute("CREATE TABLE training_programs (id INTEGER PRIMARY KEY, learning_hours REAL)")
+        cursor.executemany("INSERT INTO training_programs VALUES (%s, %s)", [(1, 8), (2, 24), (3, 16)])
+        cursor.execute("""
+            CREATE TABLE master_data (
+                id INTEGER PRIMARY KEY, program_id INTEGER, per_no TEXT,
+                day_1_attendance INTEGER, day_2_attendance INTEGER, day_3_attendance INTEGER,
+                learning_hours REAL
+            )
+        """)
+        cursor.executemany("INSERT INTO master_data VALUES (%s, %s, %s, %s, %s, %s, %s)", rows)
+
+
+def attendance(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT * FROM master_data ORDER BY id")
+        return [(r['id'], r['program_id'], r['per_no'], r['day_1_attendance'], r['day_2_attendance'],
+                 r['day_3_attendance'], r['learning_hours']) for r in cursor.fetchall()]
+
+
+def test_merge_recomputes_hours_from_the_merged_days(sqlite_conn):
+    load_attendance(sqlite_conn, [
+        # Three-day program: each racing check-in recorded a different day at 8 hours
+        (1, 2, 'E1', 1, None, None, 8),
+        (2, 2, 'E1', None, 1, None, 8),
+        (3, 2, 'E1', None, None, 1, 8),
+        # Single-day program checked in twice
+        (4, 1, 'E2', 1, None, None, 8),
+        (5, 1, 'E2', 1, None, None, 8),
+        # Program since deleted: the highest stored hours stand in for the program's
+        (6, 9, 'E3', 1, None, None, 16),
+        (7, 9, 'E3', None, 1, None, 8),
+        # Not duplicated: left alone
+        (8, 3, 'E1', 1, None, None, 8),
+    ])
+    assert migrations.merge_duplicate_attendance(sqlite_conn) == "merged 4 duplicate attendance rows"
+    assert attendance(sqlite_conn) == [
+        (1, 2, 'E1', 1, 1, 1, 24),
+        (4, 1, 'E2', 1, 0, 0, 8),
+        (6, 9, 'E3', 1, 1, 0, 16),
+        (8, 3, 'E1', 1, None, None, 8),
+    ]
+    assert migrations.merge_duplicate_attendance(sqlite_conn) == "merged 0 duplicate attendance rows"
+
+
+def test_check_in_fails_without_the_attendance_key(monkeypatch, sqlite_conn):
+    monkeypatch.setattr(attendance_app, '_attendance_key_checked', False)
+    monkeypatch.setattr(attendance_app, 'existing_indexes', lambda cursor, table: {'PRIMARY': ['id']})
+    monkeypatch.setattr(attendance_app, 'get_db_connection', lambda: sqlite_conn)
+    data = {'per_no': 'E1', 'mobile_no': '9876543210', 'cordi_name': 'desk', 'training_name': 'Safety',
+            'start_date': '2024-04-01', 'end_date': '2024-04-01', 'program_id': '1', 'current_day': '1'}
+    with Flask(__name__).app_context():
+        result, success = attendance_app.save_attendance(data)
+    assert not success and migrations.ATTENDANCE_KEY.name in result['error']
+
+
+def test_present_key_is_checked_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(attendance_app, '_attendance_key_checked', False)
+    monkeypatch.setattr(attendance_app, 'existing_indexes',
+                        lambda cursor, table: calls.append(table) or {migrations.ATTENDANCE_KEY.name: []})
+
+    class Conn:
+        def cursor(self):
+            return nullcontext()
+
+    attendance_app.require_attendance_key(Conn())
+    attendance_app.require_attendance_key(Conn())
+    assert calls == ['master_data']
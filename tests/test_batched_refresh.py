@@ -0,0 +1,83 @@
+import threading
+
+import job_runner
+from job_runner import BatchedRefresh, JobRunner
+from utils import Config
+
+
+def test_burst_of_adds_becomes_one_refresh(monkeypatch):
+    monkeypatch.setattr(Config, 'JOB_BATCH_DELAY', 0.05)
+    monkeypatch.setattr(job_runner, '_runner', JobRunner(workers=1))
+    calls = []
+    done = threading.Event()
+
+    def refresh(keys):
+        calls.append(set(keys))
+        done.set()
+
+    batch = BatchedRefresh('test_refresh', 'Test refresh', refresh)
+    for per_no in ('1001', '1002', '1001', None, '1003'):
+        batch.add([per_no])
+
+    assert done.wait(5)
+    assert calls == [{'1001', '1002', '1003'}]
+
+    # Keys arriving after the run go into the next batch
+    done.clear()
+    batch.add(['1004'])
+    assert done.wait(5)
+    assert calls[1] == {'1004'}
+
+
+def test_empty_keys_schedule_nothing(monkeypatch):
+    batch = BatchedRefresh('test_refresh', 'Test refresh', lambda keys: None)
+    batch.add([None, ''])
+    assert not batch._scheduled
+
+
+def test_failed_refresh_retries_its_keys(monkeypatch):
+    monkeypatch.setattr(Config, 'JOB_BATCH_DELAY', 0.05)
+    monkeypatch.setattr(job_runner, '_runner', JobRunner(workers=1))
+    calls = []
+    done = threading.Event()
+
+    def refresh(keys):
+        calls.append(set(keys))
+        if len(calls) == 1:
+            raise RuntimeError("database went away")
+        done.set()
+
+    batch = BatchedRefresh('test_refresh', 'Test refresh', refresh)
+    batch.add(['1001', '1002'])
+    assert done.wait(5)
+    assert calls == [{'1001', '1002'}, {'1001', '1002'}]
+
+
+def test_cancelled_batch_does_not_block_later_ones(monkeypatch):
+    monkeypatch.setattr(Config, 'JOB_BATCH_DELAY', 0.05)
+    runner = JobRunner(workers=0)
+    monkeypatch.setattr(job_runner, '_runner', runner)
+    calls = []
+    done = threading.Event()
+
+    def refresh(keys):
+        calls.append(set(keys))
+        if '1002' in keys:
+            done.set()
+
+    batch = BatchedRefresh('test_refresh', 'Test refresh', refresh)
+    batch.add(['1001'])
+    # No workers yet, so the batch stays queued until it is cancelled
+    for _ in range(100):
+        if runner.list():
+            break
+        threading.Event().wait(0.02)
+    queued = runner.list()[0]
+    assert runner.cancel(queued['id'])
+
+    # Start a worker and check the cancelled keys and new ones are refreshed
+    worker = threading.Thread(target=runner._work, daemon=True)
+    worker.start()
+    batch.add(['1002'])
+    assert done.wait(5)
+    assert set().union(*calls) == {'1001', '1002'}
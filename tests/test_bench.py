@@ -0,0 +1,71 @@
+from collections import Counter
+from datetime import date
+
+import pytest
+from werkzeug.wrappers import Response
+
+from bench import datagen, runner
+from utils import Config, Constants
+
+TODAY = date(2025, 1, 15)
+
+
+@pytest.fixture(scope='module')
+def tables():
+    generator = datagen.Generator(10000, seed=7, years=3, today=TODAY)
+    return {table: (columns, rows) for table, columns, rows in generator.tables()}
+
+
+def column(tables, table, name):
+    columns, rows = tables[table]
+    index = columns.index(name)
+    return [row[index] for row in rows]
+
+
+def test_same_seed_builds_the_same_tables(tables):
+    again = datagen.Generator(10000, seed=7, years=3, today=TODAY)
+    assert {table: (columns, rows) for table, columns, rows in again.tables()} == tables
+
+
+def test_tables_scale_from_the_attendance_rows(tables):
+    counts = {table: len(rows) for table, (_, rows) in tables.items()}
+    assert counts['master_data'] == 10000
+    assert counts['eor_data'] == 2000 and counts['tni_data'] == 5000
+
+
+def test_attendance_is_unique_per_program_and_employee(tables):
+    keys = list(zip(column(tables, 'master_data', 'program_id'), column(tables, 'master_data', 'per_no')))
+    assert len(keys) == len(set(keys))
+    assert max(column(tables, 'master_data', 'start_date')) <= TODAY
+
+
+def test_factories_and_fiscal_years_are_skewed(tables):
+    factories = Counter(column(tables, 'eor_data', 'factory'))
+    assert factories.most_common(1)[0][0] == Constants.FACTORY_LOCATIONS[0]
+    years = Counter(d.year if d.month >= 4 else d.year - 1 for d in column(tables, 'master_data', 'start_date'))
+    assert years[2024] > years[2023] > years[2022]
+
+
+def test_build_refuses_the_live_database(monkeypatch):
+    monkeypatch.setattr(datagen, 'BENCH_DB_NAME', Config.DB_NAME)
+    monkeypatch.setattr(datagen, 'connect', lambda *args: pytest.fail("connected"))
+    with pytest.raises(ValueError):
+        datagen.build(10000)
+
+
+def test_server_timing_headers_are_parsed():
+    response = Response()
+    response.headers.add('Server-Timing', 'db;dur=12.5;desc="7 queries"')
+    response.headers.add('Server-Timing', 'app;dur=40.0')
+    assert runner.server_timing_db_ms(response) == 12.5
+    assert runner.server_timing_queries(response) == 7
+    assert runner.server_timing_queries(Response()) is None
+
+
+def test_compare_flags_slowdowns_beyond_the_threshold(capsys):
+    meta = {'rows': {'master_data': 10000}}
+    before = {'meta': meta, 'results': {'a': {'median_ms': 100.0}, 'b': {'median_ms': 100.0, 'queries': 12}}}
+    after = {'meta': meta, 'results': {'a': {'median_ms': 105.0}, 'b': {'median_ms': 120.0, 'queries': 3}}}
+    assert runner.compare(before, after, threshold=10) == ['b']
+    assert '12 -> 3' in capsys.readouterr().out
+    assert runner.percentile([5, 1, 4, 2, 3], 95) == 5
@@ -0,0 +1,52 @@
+"""The bench.runner scenarios as pytest-benchmark tests against the benchmark database.
+
+Build the data with python -m bench.datagen, then for example:
+
+    pytest tests/test_bench_routes.py --benchmark-autosave
+    pytest tests/test_bench_routes.py --benchmark-compare --benchmark-compare-fail=median:10%
+
+Each test also records the number of queries one request issues in extra_info.
+"""
+import pytest
+
+from bench import BENCH_DB_NAME, runner
+
+pytest.importorskip('pytest_benchmark')
+
+ROUNDS = 20
+WARMUP_ROUNDS = 2
+
+
+@pytest.fixture(scope='module')
+def bench_context(bench_conn):
+    """runner.Context over an Admin test client of the app, pointed at the benchmark database"""
+    import db_pool
+    from utils import Config
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(Config, 'DB_NAME', BENCH_DB_NAME)
+        patch.setattr(db_pool, '_pool', None)
+        from admin_app import app
+        from view_master_data import view_bp
+        if view_bp.name not in app.blueprints:
+            app.register_blueprint(view_bp)
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess.update({'logged_in': True, 'user_id': 0, 'username': 'bench', 'role': 'Admin',
+                         'factory_location': None})
+        try:
+            yield runner.Context(client)
+        finally:
+            if db_pool._pool is not None:
+                db_pool._pool.dispose()
+
+
+@pytest.mark.parametrize('name', list(runner.SCENARIOS))
+def test_route(benchmark, bench_context, name):
+    func, expected_status, rounds = runner.SCENARIOS[name]
+    benchmark.group = name
+    # Scenarios with a rounds override (exports, uploads) are too slow to warm up
+    response = benchmark.pedantic(func, args=(bench_context,), rounds=rounds or ROUNDS,
+                                  warmup_rounds=0 if rounds else WARMUP_ROUNDS)
+    assert response.status_code == expected_status
+    benchmark.extra_info['queries'] = runner.count_queries(bench_context, func, expected_status)
@@ -0,0 +1,65 @@
+import utils
+
+
+class RecordingCursor:
+    def __init__(self, statements):
+        self.statements = statements
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+
+    def executemany(self, sql, rows):
+        self.statements.append(sql)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class RecordingConnection:
+    def __init__(self, statements):
+        self.statements = statements
+
+    def cursor(self, *args):
+        return RecordingCursor(self.statements)
+
+    def close(self):
+        pass
+
+
+def staging_tables(statements):
+    return {sql.split()[2] for sql in statements if sql.startswith('CREATE TABLE')}
+
+
+def test_each_replacement_uses_its_own_staging_table(monkeypatch):
+    statements = []
+    monkeypatch.setattr(utils, 'get_db_connection', lambda: RecordingConnection(statements))
+    monkeypatch.setattr(utils, 'bump_version', lambda table: None)
+
+    utils.bulk_replace_table('eor_data', ['per_no'], [('1',), ('2',)])
+    first = staging_tables(statements)
+    utils.bulk_replace_table('eor_data', ['per_no'], [('3',)])
+    both = staging_tables(statements)
+
+    assert len(first) == 1 and len(both) == 2
+    assert all(name.startswith('eor_data_staging_') for name in both)
+    renames = [sql for sql in statements if sql.startswith('RENAME TABLE')]
+    assert len(renames) == 2 and renames[0] != renames[1]
+
+
+def test_failed_load_drops_only_its_staging_table(monkeypatch):
+    statements = []
+    monkeypatch.setattr(utils, 'get_db_connection', lambda: RecordingConnection(statements))
+
+    def cancel(rows):
+        raise RuntimeError('cancelled')
+
+    try:
+        utils.bulk_replace_table('eor_data', ['per_no'], [('1',), ('2',)], chunk_size=1, progress=cancel)
+    except RuntimeError:
+        pass
+    staging, = staging_tables(statements)
+    assert statements[-1] == f"DROP TABLE IF EXISTS {staging}"
+    assert not any(sql.startswith('RENAME TABLE') for sql in statements)
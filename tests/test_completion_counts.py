@@ -0,0 +1,60 @@
+import pytest
+
+import completion_counts
+from completion_counts import FISCAL_MONTHS, refresh_completion_counts
+
+
+@pytest.fixture
+def completion_db(sqlite_conn, monkeypatch):
+    """master_data and training_targets for two trainings, with the completion tables empty"""
+    monkeypatch.setattr(completion_counts, '_tables_ready', True)
+    monkeypatch.setattr(completion_counts, '_summary_built', False)
+    sqlite_conn.db.create_function('NOW', 0, lambda: '2025-01-15 10:00:00')
+    with sqlite_conn.cursor() as cursor:
+        cursor.execute("CREATE TABLE master_data (per_no TEXT, training_name TEXT, pmo_training_category TEXT,"
+                       " pl_category TEXT, calendar_month TEXT)")
+        cursor.executemany("INSERT INTO master_data VALUES (%s, %s, %s, %s, %s)", [
+            ('P1', 'Fire Safety', 'SHE', 'PL1', 'June'), ('P2', 'Fire Safety', 'SHE', 'PL1', 'June'),
+            ('P1', 'Lean Basics', 'Technical', 'PL2', 'July'),
+        ])
+        cursor.execute(f"""
+            CREATE TABLE training_targets (id INTEGER PRIMARY KEY, training_name TEXT, pmo_category TEXT,
+                pl_category TEXT, target INT, batch_size INT, target_year INT, ytd_actual INT, balance INT,
+                programs_to_run REAL, ytd_target INT, {', '.join(f'{m} INT' for m in FISCAL_MONTHS)})
+        """)
+        cursor.executemany("INSERT INTO training_targets (id, training_name, pmo_category, pl_category, target,"
+                           " batch_size, target_year) VALUES (%s, %s, %s, %s, %s, %s, %s)", [
+                               (1, 'Fire Safety', 'SHE', 'PL1', 10, 5, 2025),
+                               (2, 'Lean Basics', 'Technical', 'PL2', 10, 5, 2025),
+                           ])
+        cursor.execute("""
+            CREATE TABLE training_completion_summary (training_name TEXT, pmo_category TEXT, pl_category TEXT,
+                calendar_month TEXT, attendance_count INT,
+                UNIQUE (training_name, pmo_category, pl_category, calendar_month))
+        """)
+        cursor.execute("CREATE TABLE training_completion_refresh_log (id INTEGER PRIMARY KEY, refreshed_at TEXT,"
+                       " duration_ms INT, mode TEXT, trainings_updated INT)")
+    return sqlite_conn
+
+
+def actuals(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT id, ytd_actual FROM training_targets ORDER BY id")
+        return {row['id']: row['ytd_actual'] for row in cursor.fetchall()}
+
+
+def modes(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT mode FROM training_completion_refresh_log ORDER BY id")
+        return [row['mode'] for row in cursor.fetchall()]
+
+
+def test_first_incremental_refresh_builds_the_whole_summary(completion_db):
+    refresh_completion_counts(['Fire Safety'], 2025, conn=completion_db)
+    # Lean Basics was not touched by the check-in, but its count must not stay missing
+    assert actuals(completion_db) == {1: 2, 2: 1}
+    with completion_db.cursor() as cursor:
+        cursor.execute("INSERT INTO master_data VALUES ('P3', 'Fire Safety', 'SHE', 'PL1', 'June')")
+    refresh_completion_counts(['Fire Safety'], 2025, conn=completion_db)
+    assert actuals(completion_db) == {1: 3, 2: 1}
+    assert modes(completion_db) == ['full', 'incremental']
@@ -0,0 +1,120 @@
+import gc
+
+from flask import Flask
+from pymysql.constants import SERVER_STATUS
+
+import db_pool
+from db_pool import ConnectionPool
+
+
+class FakeRaw:
+    """Raw connection that records statements and tracks the transaction flag"""
+
+    def __init__(self):
+        self.open = True
+        self.server_status = SERVER_STATUS.SERVER_STATUS_AUTOCOMMIT
+        self.statements = []
+        self.rollbacks = 0
+
+    def get_autocommit(self):
+        return bool(self.server_status & SERVER_STATUS.SERVER_STATUS_AUTOCOMMIT)
+
+    def begin(self):
+        self.server_status |= SERVER_STATUS.SERVER_STATUS_IN_TRANS
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.server_status &= ~SERVER_STATUS.SERVER_STATUS_IN_TRANS
+
+    def cursor(self, *args):
+        raw = self
+
+        class Cursor:
+            def execute(self, sql, params=None):
+                raw.statements.append(sql)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                pass
+
+        return Cursor()
+
+    def close(self):
+        self.open = False
+
+
+def make_pool():
+    pool = ConnectionPool({}, max_size=1, recycle=0)
+    raws = []
+
+    def connect():
+        raws.append(FakeRaw())
+        return raws[-1], 0.0
+
+    pool._connect = connect
+    return pool, raws
+
+
+def test_open_transaction_is_rolled_back_before_reuse():
+    pool, raws = make_pool()
+    conn = pool.acquire()
+    conn.begin()
+    conn.close()
+    assert raws[0].rollbacks == 1
+    assert not raws[0].server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS
+    assert pool.stats()['idle'] == 1
+
+
+def test_committed_connection_is_not_rolled_back():
+    pool, raws = make_pool()
+    pool.acquire().close()
+    assert raws[0].rollbacks == 0
+
+
+def test_session_variables_are_restored_on_release():
+    pool, raws = make_pool()
+    conn = pool.acquire()
+    conn.set_session('sql_mode', "''")
+    conn.set_session('sql_mode', "'ANSI'")
+    conn.close()
+    statements = raws[0].statements
+    assert statements[0].startswith("SET @pool_saved_sql_mode = @@SESSION.sql_mode")
+    assert statements[1] == "SET SESSION sql_mode = 'ANSI'"
+    assert statements[-1] == "SET SESSION sql_mode = @pool_saved_sql_mode"
+
+    # The next borrower starts with nothing to restore
+    pool.acquire().close()
+    assert len(raws) == 1 and raws[0].statements == statements
+
+
+def test_connection_that_cannot_be_reset_is_discarded():
+    pool, raws = make_pool()
+    conn = pool.acquire()
+    conn.begin()
+    raws[0].rollback = None  # rollback() raises
+    conn.close()
+    assert pool.stats()['idle'] == 0
+    assert not raws[0].open
+
+
+def test_unclosed_connection_stays_checked_out_while_its_cursor_lives():
+    pool, raws = make_pool()
+    cursor = pool.acquire().cursor()
+    assert pool.stats()['in_use'] == 1 and pool.stats()['idle'] == 0
+    del cursor
+    gc.collect()
+    assert pool.stats()['in_use'] == 0 and pool.stats()['idle'] == 1
+
+
+def test_request_connection_is_shared_and_returned_on_teardown(monkeypatch):
+    pool, raws = make_pool()
+    monkeypatch.setattr(db_pool, '_pool', pool)
+    app = Flask(__name__)
+    db_pool.init_app(app)
+    with app.app_context():
+        with db_pool.request_connection() as conn:
+            assert db_pool.get_request_connection() is conn
+        assert pool.stats()['in_use'] == 1
+    assert pool.stats()['in_use'] == 0 and pool.stats()['idle'] == 1
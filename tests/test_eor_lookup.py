@@ -0,0 +1,39 @@
+from eor_lookup import EorLookup
+
+EMPLOYEE = {'per_no': '100001', 'participants_name': 'Old Name', 'bc_no': 'B1', 'gender': 'Male',
+            'employee_group': 'PERMANENT', 'department': 'dept', 'factory': 'F1'}
+
+
+class ReloadedDuringRead(EorLookup):
+    """Lookup whose first database read races an EOR upload that invalidates the cache"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.reads = 0
+
+    def _read(self):
+        self.reads += 1
+        if self.reads == 1:
+            self.invalidate()
+        return dict(EMPLOYEE, participants_name='Old Name' if self.reads == 1 else 'New Name')
+
+    def _query(self, per_no):
+        return {k: v for k, v in self._read().items() if k != 'per_no'}
+
+    def _read_snapshot(self):
+        row = self._read()
+        return {row['per_no']: {k: v for k, v in row.items() if k != 'per_no'}}
+
+
+def test_lookup_read_before_invalidate_is_not_cached():
+    lookup = ReloadedDuringRead()
+    assert lookup.get('100001')['participants_name'] == 'Old Name'
+    assert lookup.stats()['cached'] == 0
+    assert lookup.get('100001')['participants_name'] == 'New Name'
+    assert lookup.get('100001')['participants_name'] == 'New Name' and lookup.reads == 2
+
+
+def test_snapshot_read_before_invalidate_is_reloaded():
+    lookup = ReloadedDuringRead(snapshot=True)
+    assert lookup.get('100001')['participants_name'] == 'New Name'
+    assert lookup.reads == 2 and lookup.stats()['snapshot_loads'] == 2
@@ -0,0 +1,173 @@
+"""The SQL the filter builders produce must let the database seek on an index.
+
+Plans come from a SQLite stand-in carrying the migrations' indexes and, when the
+benchmark database (python -m bench.datagen) is reachable, from MySQL EXPLAIN.
+"""
+import sqlite3
+
+import pytest
+from flask import Flask
+
+import feedback_facts
+from cd_data_store import TABLE_CONFIGS
+from filter_compiler import FilterCompiler, escape_like
+from index_advisor import explain_mysql, explain_sqlite
+from migrations import declared_indexes
+from table_query import LISTING_TABLES
+from view_master_data import apply_standard_filters
+
+MASTER_DATA_FILTERS = [
+    {'fiscal_year': '2024'},
+    {'fiscal_year': 'FY 2024-25', 'factory': 'F1'},
+    {'fiscal_year': '2024', 'training_name': 'Training 0001', 'employee_group': 'PERMANENT'},
+    {'per_no': '100001'},
+    {'calendar_month': 'June', 'factory': 'F1'},
+    {'month_range_start': 'April', 'month_range_end': 'June', 'factory': 'F1'},
+]
+LISTING_FILTERS = [{'ticket': '10'}, {'ticket': '10', 'plant': 'F1', 'startDate': '2024-04-01'}]
+
+
+def master_data_query(filters):
+    with Flask(__name__).test_request_context():
+        return apply_standard_filters("SELECT * FROM master_data WHERE 1=1", [], dict(filters))
+
+
+def full_scans(issues, table):
+    """Plan issues that read every row of table (derived tables of one statement are fine)"""
+    return [issue for issue in issues
+            if issue.startswith('full') and (f"SCAN {table}" in issue or f"of {table} " in issue)]
+
+
+def test_compiled_predicates_leave_columns_bare():
+    compiler = (FilterCompiler('m').fiscal_year('start_date', 'FY 2024-25').month('end_date', 2024, 12)
+                .prefix(['ticket_no', 'name'], '10%'))
+    where = compiler.where()
+    for wrapped in ('YEAR(', 'MONTH(', 'DATE(', 'UPPER(', "LIKE '%"):
+        assert wrapped not in where
+    assert compiler.params[-2:] == [escape_like('10%') + '%'] * 2
+
+
+def test_search_falls_back_to_prefix_without_fulltext():
+    compiler = FilterCompiler().search('feedback_facts', ['program_title'], 'ab')
+    assert compiler.where() == "program_title LIKE %s" and compiler.params == ['ab%']
+
+
+class SchemaLookupConnection:
+    """Connection answering SHOW COLUMNS/SHOW INDEX from a fixed set of names, recording statements"""
+
+    def __init__(self, present):
+        self.present = present
+        self.statements = []
+
+    def cursor(self, *args):
+        owner = self
+
+        class Cursor:
+            def execute(self, sql, params=()):
+                owner.statements.append(sql)
+                self.found = bool(params) and params[0] in owner.present
+
+            def fetchone(self):
+                return {'name': 1} if self.found else None
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                pass
+        return Cursor()
+
+
+def test_request_filters_only_look_for_migrated_columns_and_indexes():
+    missing = SchemaLookupConnection(present=set())
+    search = FilterCompiler(conn=missing).search('feedback_responses', ['participants_name'], 'Employee')
+    equals = FilterCompiler(conn=missing).normalized_equals('eor_data', 'factory', ' F1 ')
+    assert search.where() == "participants_name LIKE %s" and equals.params == ['F1']
+    assert not any('ALTER' in sql for sql in missing.statements)
+
+    migrated = SchemaLookupConnection(present={'ft_feedback_responses_participants_name', 'factory_norm'})
+    search = FilterCompiler(conn=migrated).search('feedback_responses', ['participants_name'], 'Employee')
+    equals = FilterCompiler(conn=migrated).normalized_equals('eor_data', 'factory', ' F1 ')
+    assert search.where().startswith('MATCH(participants_name)') and equals.where() == "factory_norm = %s"
+
+
+@pytest.fixture(scope='module')
+def standin():
+    """Typed tables (LIKE needs TEXT affinity to use an index) with the declared indexes"""
+    db = sqlite3.connect(':memory:')
+    db.execute("PRAGMA case_sensitive_like = ON")
+    tables = {'master_data': ['id'] + TABLE_CONFIGS['master_data']['columns']}
+    tables.update({name: spec.columns for name, spec in LISTING_TABLES.items()})
+    for table, columns in tables.items():
+        db.execute(f"CREATE TABLE {table} ({', '.join(f'{c} TEXT' for c in columns)})")
+    for index in declared_indexes():
+        if index.table in tables:
+            db.execute(f"CREATE INDEX {index.name} ON {index.table} ({', '.join(index.column_names)})")
+    for name in LISTING_TABLES:
+        # cd_data_store uploads upsert on ticket_no, so every listing table carries a unique key on it
+        db.execute(f"CREATE UNIQUE INDEX uq_{name}_ticket_no ON {name} (ticket_no)")
+    yield db
+    db.close()
+
+
+@pytest.mark.parametrize('filters', MASTER_DATA_FILTERS)
+def test_master_data_filters_seek_in_sqlite(standin, filters):
+    assert full_scans(explain_sqlite(standin, *master_data_query(filters)), 'master_data') == []
+
+
+@pytest.mark.parametrize('filters', LISTING_FILTERS)
+@pytest.mark.parametrize('table', sorted(LISTING_TABLES))
+def test_listing_filters_seek_in_sqlite(standin, table, filters):
+    assert full_scans(explain_sqlite(standin, *LISTING_TABLES[table].page_query(filters, 50, 0)), table) == []
+
+
+class CapturingConnection:
+    """Connection proxy recording every statement its cursors execute"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.statements = []
+
+    def cursor(self, *args):
+        owner, cursor = self, self.conn.cursor(*args)
+
+        class Cursor:
+            def __getattr__(self, name):
+                return getattr(cursor, name)
+
+            def execute(self, sql, params=None):
+                owner.statements.append((sql, params))
+                return cursor.execute(sql, params)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                cursor.close()
+        return Cursor()
+
+
+@pytest.mark.parametrize('filters', MASTER_DATA_FILTERS)
+def test_master_data_filters_seek_in_mysql(bench_conn, filters):
+    assert full_scans(explain_mysql(bench_conn, *master_data_query(filters)), 'master_data') == []
+
+
+@pytest.mark.parametrize('table', sorted(LISTING_TABLES))
+def test_listing_filters_seek_in_mysql(bench_conn, table):
+    for filters in LISTING_FILTERS:
+        assert full_scans(explain_mysql(bench_conn, *LISTING_TABLES[table].page_query(filters, 50, 0)), table) == []
+
+
+@pytest.mark.parametrize('filters', [
+    {'search': 'Training'},
+    {'search': 'Employee 12', 'year': '2024', 'month': '6'},
+    {'trainer': 'Trainer 1', 'year': '2024'},
+])
+def test_ciro_search_seeks_in_mysql(bench_conn, filters):
+    capturing = CapturingConnection(bench_conn)
+    feedback_facts.get_session_scores(capturing, **filters)
+    sql, params = capturing.statements[-1]
+    assert 'FROM feedback_facts' in sql
+    issues = explain_mysql(bench_conn, sql, params)
+    assert full_scans(issues, 'feedback_facts') == [] and full_scans(issues, 'feedback_responses') == []
+
@@ -0,0 +1,59 @@
+from keyset_pager import SortKey, PageRequest, paginate_query, build_page, decode_cursor
+
+SORT = [
+    SortKey('start_date', 'start_date', nullable=True),
+    SortKey('start_time', 'start_time', nullable=True),
+    SortKey('id', 'id'),
+]
+BASE_SQL = "SELECT id, start_date, start_time FROM training_programs WHERE 1=1"
+
+
+def load_programs(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("CREATE TABLE training_programs (id INTEGER PRIMARY KEY, start_date DATE, start_time TIME)")
+        rows = []
+        for i in range(1, 41):
+            start_date = None if i % 7 == 0 else f"2024-0{1 + i % 3}-1{i % 4}"
+            start_time = None if i % 5 == 0 else f"0{i % 3 + 8}:00:00"
+            rows.append((i, start_date, start_time))
+        cursor.executemany("INSERT INTO training_programs VALUES (%s, %s, %s)", rows)
+        cursor.execute(BASE_SQL + " ORDER BY start_date DESC, start_time DESC, id DESC")
+        return [row['id'] for row in cursor.fetchall()]
+
+
+def fetch(conn, page_request, per_page):
+    sql, params = paginate_query(BASE_SQL, [], SORT, page_request, per_page)
+    with conn.cursor() as cursor:
+        cursor.execute(sql, params)
+        return build_page(cursor.fetchall(), SORT, page_request, per_page)
+
+
+def test_seek_pages_through_null_dates_and_times(sqlite_conn):
+    expected = load_programs(sqlite_conn)
+    seen, page_request = [], PageRequest()
+    while True:
+        rows, pagination = fetch(sqlite_conn, page_request, 6)
+        seen.extend(row['id'] for row in rows)
+        if not pagination['next_cursor']:
+            break
+        # Always seek, even for the numbered pages, so every boundary goes through the cursor
+        values, page = decode_cursor(pagination['next_cursor'], len(SORT))
+        page_request = PageRequest(page, values, 'next')
+    assert seen == expected
+
+
+def test_seek_back_returns_the_previous_page(sqlite_conn):
+    expected = load_programs(sqlite_conn)
+    for start in range(1, len(expected)):
+        with sqlite_conn.cursor() as cursor:
+            cursor.execute("SELECT id, start_date, start_time FROM training_programs WHERE id = %s", [expected[start]])
+            row = cursor.fetchone()
+        boundary = [key.value(row) for key in SORT]
+        rows, _ = fetch(sqlite_conn, PageRequest(2, boundary, 'prev'), 4)
+        assert [r['id'] for r in rows] == expected[max(0, start - 4):start]
+
+
+def test_plain_keys_keep_the_row_comparison():
+    sql, params = paginate_query("SELECT id FROM t WHERE 1=1", [], [SortKey('id', 'id')],
+                                 PageRequest(7, [10], 'next'), 5)
+    assert "AND id < %s" in sql and params == [10, 6]
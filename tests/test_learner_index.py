@@ -0,0 +1,118 @@
+import os
+import random
+
+import pytest
+
+import learner_index
+from learner_index import Bitmap, LearnerIndex, read_index, save_index
+
+SHE = 'SHE (Safety+Health)'
+
+# (filters, the equivalent WHERE for COUNT(DISTINCT per_no))
+FILTER_CASES = [
+    ({}, "1=1"),
+    ({'fiscal_year': '2024'}, "start_date >= '2024-04-01' AND start_date < '2025-04-01'"),
+    ({'fiscal_year': 'FY 2023-24', 'factory': 'F1'},
+     "start_date >= '2023-04-01' AND start_date < '2024-04-01' AND factory = 'F1'"),
+    ({'gender': 'Female', 'training_name': 'Training 3'}, "gender = 'Female' AND training_name = 'Training 3'"),
+    ({'pmo_training_category': 'PMO'}, f"pmo_training_category <> '{SHE}'"),
+    ({'pmo_training_category': SHE, 'pl_category': 'PL1'}, f"pmo_training_category = '{SHE}' AND pl_category = 'PL1'"),
+    ({'calendar_month': 'June', 'factory': 'F2'}, "calendar_month = 'June' AND factory = 'F2'"),
+    ({'employee_group': 'Contract'}, "1=0"),
+]
+
+
+def id_sets(rng):
+    """Sets spanning several containers, with both sparse (array) and dense (bitset) ones"""
+    sparse = {rng.randrange(1 << 20) for _ in range(3000)}
+    dense = set(rng.sample(range(1 << 16, 3 << 16), 30000))
+    return [set(), {7}, sparse, dense, sparse | set(range(5000)), set(rng.sample(range(1 << 17), 9000))]
+
+
+@pytest.mark.parametrize('seed', [1, 2])
+def test_bitmap_matches_python_sets(seed):
+    sets = id_sets(random.Random(seed))
+    for a in sets:
+        bitmap_a = Bitmap.from_ids(a)
+        assert len(bitmap_a) == len(a)
+        assert len(Bitmap.from_bytes(bitmap_a.to_bytes())) == len(a)
+        for b in sets:
+            bitmap_b = Bitmap.from_ids(b)
+            assert len(bitmap_a | bitmap_b) == len(a | b)
+            assert len(bitmap_a & bitmap_b) == len(a & b)
+            # Intersections and round-tripped bitmaps hold exactly the expected ids
+            both = Bitmap.from_bytes((bitmap_a & bitmap_b).to_bytes())
+            assert len(both & Bitmap.from_ids(a & b)) == len(a & b) == len(both)
+    assert len(Bitmap.union_all(Bitmap.from_ids(s) for s in sets)) == len(set().union(*sets))
+
+
+MASTER_DATA = """
+    CREATE TABLE master_data (id INTEGER PRIMARY KEY, per_no TEXT, employee_group TEXT, start_date DATE,
+        factory TEXT, training_name TEXT, calendar_month TEXT, pmo_training_category TEXT,
+        pl_category TEXT, gender TEXT)
+"""
+
+
+def insert_rows(conn, rows):
+    with conn.cursor() as cursor:
+        cursor.executemany("INSERT INTO master_data VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)", rows)
+    conn.commit()
+
+
+def generated_rows(rng, ids):
+    months = ['2023-06-15', '2023-11-02', '2024-04-01', '2024-06-30', '2025-03-31', None]
+    return [(i, rng.choice([f"P{rng.randrange(800)}", '', None]) if rng.random() < 0.05 else f"P{rng.randrange(800)}",
+             rng.choice(['PERMANENT', 'PERMANENT', 'Contract']), rng.choice(months),
+             rng.choice(['F1', 'F2', 'F3']), f"Training {rng.randrange(6)}", rng.choice(['June', 'November', 'April']),
+             rng.choice([SHE, 'Technical', 'Behavioural', None]), rng.choice(['PL1', 'PL2']),
+             rng.choice(['Male', 'Female'])) for i in ids]
+
+
+def distinct_learners(conn, where):
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT COUNT(DISTINCT per_no) AS n FROM master_data
+            WHERE employee_group = 'PERMANENT' AND per_no IS NOT NULL AND per_no != '' AND {where}
+        """)
+        return cursor.fetchone()['n']
+
+
+def test_counts_match_count_distinct(sqlite_conn):
+    with sqlite_conn.cursor() as cursor:
+        cursor.execute(MASTER_DATA)
+    insert_rows(sqlite_conn, generated_rows(random.Random(5), range(1, 6001)))
+    index = LearnerIndex()
+    learner_index._sync(sqlite_conn, index)
+    for filters, where in FILTER_CASES:
+        assert index.count(filters) == distinct_learners(sqlite_conn, where), filters
+
+
+def test_rows_committed_below_the_indexed_id_are_picked_up(sqlite_conn):
+    """A check-in whose transaction commits after a later id was indexed"""
+    rng = random.Random(9)
+    with sqlite_conn.cursor() as cursor:
+        cursor.execute(MASTER_DATA)
+    rows = generated_rows(rng, range(1, 501))
+    late = [(i, f"P{9000 + i}", 'PERMANENT') + row[3:] for i, row in zip((480, 495), rows)]
+    insert_rows(sqlite_conn, [row for row in rows if row[0] not in (480, 495)])
+    index = LearnerIndex()
+    learner_index._sync(sqlite_conn, index)
+    assert index.last_id == 500
+    insert_rows(sqlite_conn, late)
+    learner_index._sync(sqlite_conn, index)
+    for filters, where in FILTER_CASES:
+        assert index.count(filters) == distinct_learners(sqlite_conn, where), filters
+    assert learner_index._sync(sqlite_conn, index) == 0
+
+
+def test_save_index_round_trips_and_leaves_no_temp_file(tmp_path):
+    index = LearnerIndex()
+    index.add_rows([{'id': 3, 'per_no': 'P1', 'start_date': None, 'factory': 'F1', 'training_name': 'T',
+                     'calendar_month': 'June', 'pmo_training_category': SHE, 'pl_category': 'PL1',
+                     'gender': 'Male'}])
+    path = str(tmp_path / 'learner_index.bin')
+    save_index(index, path)
+    save_index(index, path)
+    loaded = read_index(path)
+    assert loaded.count({}) == 1 and loaded.last_id == 3 and loaded.built_at == index.built_at
+    assert os.listdir(tmp_path) == ['learner_index.bin']
@@ -0,0 +1,55 @@
+import random
+
+import learning_hours
+
+
+def random_fixtures(count, seed=0):
+    """Attendance fixtures covering every branch of calculate_learning_hours"""
+    rng = random.Random(seed)
+    hours = [None, 0, 2, 4, 6, 7.5, 8, 8.5, 12, 16, 20, 24]
+    days = [None, 0, 1]
+    return [{
+        'learning_hours': rng.choice(hours) if rng.random() < 0.3 else rng.choice([None, 0]),
+        'program_hours': rng.choice(hours),
+        'day_1_attendance': rng.choice(days),
+        'day_2_attendance': rng.choice(days),
+        'day_3_attendance': rng.choice(days),
+    } for _ in range(count)]
+
+
+def test_sql_expression_matches_the_python_rule(sqlite_conn):
+    fixtures = random_fixtures(500)
+    with sqlite_conn.cursor() as cursor:
+        cursor.execute("CREATE TABLE fixtures (idx INTEGER, manual REAL, program REAL, day1 INTEGER,"
+                       " day2 INTEGER, day3 INTEGER)")
+        cursor.executemany("INSERT INTO fixtures VALUES (%s, %s, %s, %s, %s, %s)", [
+            (idx, f['learning_hours'], f['program_hours'], f['day_1_attendance'], f['day_2_attendance'],
+             f['day_3_attendance']) for idx, f in enumerate(fixtures)])
+        expression = learning_hours.learning_hours_sql('manual', 'program', 'day1', 'day2', 'day3')
+        cursor.execute(f"SELECT idx, {expression} AS hours FROM fixtures ORDER BY idx")
+        sql_values = [int(row['hours']) for row in cursor.fetchall()]
+    assert sql_values == [learning_hours.calculate_learning_hours(f) for f in fixtures]
+
+
+def test_inline_expression_until_the_column_exists(monkeypatch):
+    present = []
+    monkeypatch.setattr(learning_hours, '_column_present', False)
+    monkeypatch.setattr(learning_hours, '_column_exists', lambda cursor: bool(present))
+
+    class Conn:
+        def cursor(self):
+            return NullCursor()
+
+    class NullCursor:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            pass
+
+    assert learning_hours.learning_hours_column(Conn(), 'm.') == learning_hours.master_data_expression('m.')
+    present.append(True)
+    assert learning_hours.learning_hours_column(Conn(), 'm.') == f"m.{learning_hours.LEARNING_HOURS_COLUMN}"
+    present.clear()
+    # Once found, the column is not looked up again
+    assert learning_hours.learning_hours_column(Conn()) == learning_hours.LEARNING_HOURS_COLUMN
@@ -0,0 +1,70 @@
+import random
+from datetime import date
+
+import pytest
+
+import pending_eor
+
+FILTER_SETS = [
+    {},
+    {'factory': 'F1'},
+    {'factory': 'All'},
+    {'gender': 'Female', 'factory': 'F2'},
+    {'employee_group': 'PERMANENT'},
+    {'bc_no': 'B1', 'gender': 'All'},
+]
+SCOPED = ('factory', 'gender', 'employee_group', 'bc_no')
+
+
+@pytest.fixture
+def generated(sqlite_conn):
+    """Random employees and training records, with blank/NULL per_nos and repeated employees"""
+    rng = random.Random(3)
+    employees = [(rng.choice([f"P{i}", f"P{i}", None, '']), 'name', rng.choice(['B1', 'B2']),
+                  rng.choice(['Male', 'Female']), rng.choice(['PERMANENT', 'Contract']), 'dept',
+                  rng.choice(['F1', 'F2', 'F3'])) for i in range(2000)]
+    trainings = [(f"P{rng.randrange(2500)}", rng.choice(['PERMANENT', 'PERMANENT', 'Contract']),
+                  rng.choice(['F1', 'F2', 'F3']), rng.choice(['Male', 'Female']), rng.choice(['B1', 'B2']),
+                  rng.choice(['2023-05-01', '2024-05-01', '2025-02-01'])) for _ in range(4000)]
+    with sqlite_conn.cursor() as cursor:
+        cursor.execute("CREATE TABLE eor_data (per_no TEXT, participants_name TEXT, bc_no TEXT, gender TEXT,"
+                       " employee_group TEXT, department TEXT, factory TEXT)")
+        cursor.executemany("INSERT INTO eor_data VALUES (%s, %s, %s, %s, %s, %s, %s)", employees)
+        cursor.execute("CREATE TABLE master_data (id INTEGER PRIMARY KEY, per_no TEXT, employee_group TEXT,"
+                       " factory TEXT, gender TEXT, bc_no TEXT, start_date DATE)")
+        cursor.executemany("INSERT INTO master_data (per_no, employee_group, factory, gender, bc_no, start_date)"
+                           " VALUES (%s, %s, %s, %s, %s, %s)", trainings)
+        cursor.execute("CREATE INDEX idx_master_data_per_no ON master_data (per_no)")
+    eor = [dict(zip(pending_eor.ROW_COLUMNS, e)) for e in employees]
+    trained = [dict(zip(('per_no', 'employee_group', 'factory', 'gender', 'bc_no', 'start_date'), t))
+               for t in trainings]
+    return sqlite_conn, eor, trained
+
+
+def python_pending(eor, trained, filters, fiscal_year=None):
+    """The previous implementation: both per_no lists diffed in Python"""
+    def in_scope(row):
+        return all(row[column] == filters[column] for column in SCOPED
+                   if filters.get(column) and filters[column] != 'All')
+
+    def in_year(row):
+        start = date.fromisoformat(row['start_date'])
+        return fiscal_year is None or date(fiscal_year, 4, 1) <= start < date(fiscal_year + 1, 4, 1)
+
+    eor_rows = [row for row in eor if in_scope(row)]
+    trained_per_nos = {row['per_no'] for row in trained
+                       if row['employee_group'] == 'PERMANENT' and in_scope(row) and in_year(row)}
+    eor_per_nos = {row['per_no'] for row in eor_rows if row['per_no']}
+    pending_rows = sorted(str(row['per_no']) for row in eor_rows if row['per_no'] not in trained_per_nos)
+    return len(eor_per_nos), len(eor_per_nos - trained_per_nos), pending_rows
+
+
+@pytest.mark.parametrize('fiscal_year', [None, 2023, 2024])
+@pytest.mark.parametrize('filters', FILTER_SETS)
+def test_anti_join_matches_the_python_diff(generated, filters, fiscal_year):
+    conn, eor, trained = generated
+    with conn.cursor() as cursor:
+        eor_count, pending_count = pending_eor.pending_eor_counts(cursor, filters, fiscal_year)
+        cursor.execute(*pending_eor.pending_eor_query(filters, fiscal_year))
+        rows = sorted(str(row['per_no']) for row in cursor.fetchall())
+    assert (eor_count, pending_count, rows) == python_pending(eor, trained, filters, fiscal_year)
@@ -0,0 +1,28 @@
+import os
+import threading
+
+from qr_handler import _write_atomic
+
+
+def test_threads_writing_one_file_never_share_a_temp_file(tmp_path):
+    path = str(tmp_path / 'key.png')
+    payloads = [bytes([n]) * 200000 for n in range(16)]
+    barrier = threading.Barrier(len(payloads))
+    errors = []
+
+    def write(payload):
+        barrier.wait()
+        try:
+            _write_atomic(path, lambda f: f.write(payload))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(payload,)) for payload in payloads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    with open(path, 'rb') as f:
+        assert f.read() in payloads
+    assert os.listdir(tmp_path) == ['key.png']
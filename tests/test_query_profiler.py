@@ -0,0 +1,37 @@
+import json
+import logging
+from datetime import date
+
+from flask import Flask, g
+
+import query_profiler
+from index_advisor import load_query_log
+
+LOGIN = "SELECT * FROM user_auth WHERE username = %s AND password = %s"
+
+
+def test_profiles_and_slow_log_keep_only_parameter_types(tmp_path, monkeypatch):
+    log_path = tmp_path / 'slow.jsonl'
+    logger = logging.getLogger('test_slow_queries')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = logging.FileHandler(log_path, encoding='utf-8')
+    logger.addHandler(handler)
+    monkeypatch.setattr(query_profiler, '_slow_log', logger)
+    monkeypatch.setattr(query_profiler.Config, 'SLOW_QUERY_MS', 0)
+    try:
+        with Flask(__name__).test_request_context('/login'):
+            g.profiled_queries = []
+            query_profiler.record(LOGIN, ('admin', 's3cret!'), 1, 0.5)
+            query_profiler.record("SELECT * FROM master_data WHERE start_date >= %s", [date(2024, 4, 1)], 0, 0.5)
+            profiled = g.profiled_queries
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+    logged = log_path.read_text(encoding='utf-8')
+    assert 's3cret!' not in logged and 's3cret!' not in json.dumps(profiled)
+    assert profiled[0]['params'] == ['str', 'str'] and profiled[1]['params'] == ['date']
+    # The advisor replays the redacted log with stand-in values of the same types
+    (sql, params), (_, dated) = load_query_log(log_path)
+    assert sql == LOGIN and params == ['x', 'x'] and isinstance(dated[0], date)
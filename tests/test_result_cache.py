@@ -0,0 +1,63 @@
+import threading
+import time
+
+import result_cache as rc
+
+
+def counting(delay=0.0):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(delay)
+        return len(calls)
+    return compute, calls
+
+
+def test_empty_filters_hash_like_missing_ones():
+    assert rc.cache_key('panel', {'a': 1, 'b': ''}) == rc.cache_key('panel', {'a': 1})
+
+
+def test_concurrent_misses_compute_once():
+    cache = rc.ResultCache(rc.MemoryBackend(), ttl=10, stale_ttl=10)
+    compute, calls = counting(0.2)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('k', 1, compute)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [1] * 5 and len(calls) == 1
+
+
+def test_version_change_is_a_miss_not_a_stale_hit():
+    cache = rc.ResultCache(rc.MemoryBackend(), ttl=10, stale_ttl=900)
+    compute, calls = counting()
+    assert cache.get_or_compute('k', 1, compute) == 1
+    assert cache.get_or_compute('k', 2, compute) == 2
+    stats = cache.stats()
+    assert stats['stale_hits'] == 0 and stats['misses'] == 2
+
+
+def test_expired_entry_of_the_same_version_is_served_stale():
+    cache = rc.ResultCache(rc.MemoryBackend(), ttl=0.05, stale_ttl=10)
+    compute, calls = counting()
+    cache.get_or_compute('k', 1, compute)
+    time.sleep(0.1)
+    assert cache.get_or_compute('k', 1, compute) == 1
+    deadline = time.monotonic() + 2
+    while cache.stats()['refreshes'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.get_or_compute('k', 1, compute) == 2
+    assert cache.stats()['stale_hits'] == 1
+
+
+def test_sqlite_backend_keeps_the_newest_entries(tmp_path):
+    backend = rc.SQLiteBackend(str(tmp_path / 'sub' / 'cache.sqlite3'), max_entries=2)
+    cache = rc.ResultCache(backend, ttl=10, stale_ttl=10)
+    for i in range(3):
+        cache.get_or_compute(str(i), 1, lambda i=i: {'v': i})
+        time.sleep(0.01)
+    assert len(backend) == 2
+    assert cache.get_or_compute('2', 1, lambda: None) == {'v': 2}
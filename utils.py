@@ -1,343 +1,410 @@
-import os
-import pymysql
-from datetime import datetime, timedelta
-import pandas as pd
-from flask import flash
-
-class Config:
-    DB_HOST = 'localhost'
-    DB_USER = 'root'
-    DB_PASSWORD = 'pratik'
-    DB_NAME = 'masterdata'
-    PROGRAM_DATA_FILE = 'training_data.xlsx'  # Add this
-    EOR_FILENAME = 'eor_data.xlsx'  # Add this
-    QR_FOLDER = 'static/qrcodes'
-    QR_BUFFER_MINUTES = 15
-    ALLOWED_EXTENSIONS = {'xlsx'}
-    QR_BASE_URL = 'http://10.250.109.201:5003'
-    QR_PROGRAM_PATH = '/attendance'
-    QR_HALL_PATH = '/attendance/hall'
-
-class Constants:
-    LOCATION_HALLS = [
-        '5-S Class Room', 'AR / VR Class Room', 'BIW FST Class Room',
-        'C-6 Conference Hall', 'Chinchwad Foundry Conference Hall',
-        'E-11 Conference Hall', 'Fire Security Basement Hall',
-        'H-2 Conference Hall', 'H-7 Conference Hall',
-        'Hostel Main Conference Hall', 'Hostel Ultra Conference Hall',
-        'Hostel Hexa Conference Hall', 'Industry 4.0 Innovation Lab',
-        'J-12 Paint Conference Hall', 'Jagruti Hall',
-        'D-7 Kushal (Mech.) Class Room', 'Lake House VIP Conference Hall',
-        'Learning Hall', 'LQOS Room', 'Maval Foundry MDC Chinchwad',
-        'MMV Class Room', 'Power Train Class Room', 'Pragati PE Conference Hall',
-        'Prayas (CNC) Hall', 'PRIMA Hall', 'SDP Hall',
-        'TCF FST Class Room', 'Uddan Class Room', 'Unnati Class Room',
-        'Utkarsh Class Room', 'Maral Training Hall'
-    ]
-
-    FACTORY_LOCATIONS = [
-        'AXLE FACTORY', 'CCE-TS', 'CHINCHWAD FOUNDRY', 'CKD-SKD', 'CMS',
-        'ENGINE FACTORY', 'ERC', 'GEAR FACTORY', 'HR FUNCTION',
-        'J-11/12 PAINTSHOP', 'LAUNCH MANAGEMENT', 'LCV FACTORY',
-        'M&HCV FACTORY', 'MATERIAL AUDIT', 'MAVAL FOUNDRY', 'PE', 'PPC',
-        'PRESS & FRAME FACTORY', 'PTPA', 'QUALITY ASSURANCE', 'SCM',
-        'Service Technical Support', 'WINGER FACTORY', 'XENON FACTORY'
-    ]
-
-    PROGRAM_TYPES = ['Calendar', 'Need-based (SDC Need base)', 'Need-based (Shop Need base)', 'Reschedule']
-    TNI_OPTIONS = ['TNI', 'NON-TNI']
-    TIME_SLOTS = [f"{h:02d}:{m:02d}" for h in range(5, 23) for m in [0, 30]]
-
-def get_db_connection():
-    return pymysql.connect(
-        host=Config.DB_HOST,
-        user=Config.DB_USER,
-        password=Config.DB_PASSWORD,
-        db=Config.DB_NAME,
-        charset='utf8mb4',
-        cursorclass=pymysql.cursors.DictCursor,
-        autocommit=True  # Enable autocommit to ensure immediate commits
-    
-    )
-
-def load_training_data(tni_status='TNI'):
-    """Load training data from database filtered by TNI status"""
-    try:
-        conn = get_db_connection()
-        with conn.cursor() as cursor:
-            # Normalize the input: replace spaces with hyphens and convert to uppercase
-            normalized_tni_status = tni_status.upper().replace(' ', '-')
-            
-            cursor.execute("""
-                SELECT training_name, pmo_training_category, pl_category, 
-                       brsr_sq_123_category, tni_status, learning_hours
-                FROM training_names
-                WHERE UPPER(tni_status) = %s
-            """, (normalized_tni_status,))
-            training_data = cursor.fetchall()
-        
-        return training_data
-    except Exception as e:
-        print(f"Error loading training data from database: {str(e)}")
-        flash(f'Error loading training data: {str(e)}', 'error')
-        return []
-    finally:
-        conn.close()
-def calculate_learning_hours(start_date, end_date, start_time, end_time):
-    """Calculate total learning hours between two datetimes"""
-    try:
-        start_dt = datetime.strptime(f"{start_date} {start_time}", "%Y-%m-%d %H:%M")
-        end_dt = datetime.strptime(f"{end_date} {end_time}", "%Y-%m-%d %H:%M")
-        return round((end_dt - start_dt).total_seconds() / 3600)
-    except Exception as e:
-        print(f"Error calculating learning hours: {e}")
-        return None
-
-def format_program_dates(program):
-    """Helper function to format dates and times for display"""
-    if 'start_date' in program:
-        program['formatted_start_date'] = program['start_date'].strftime('%d/%m/%Y') if isinstance(program['start_date'], datetime) else program['start_date']
-    if 'end_date' in program:
-        program['formatted_end_date'] = program['end_date'].strftime('%d/%m/%Y') if isinstance(program['end_date'], datetime) else program['end_date']
-    if 'start_time' in program:
-        program['formatted_start_time'] = program['start_time'].strftime('%H:%M') if isinstance(program['start_time'], datetime.time) else program['start_time']
-    if 'end_time' in program:
-        program['formatted_end_time'] = program['end_time'].strftime('%H:%M') if isinstance(program['end_time'], datetime.time) else program['end_time']
-    return program
-
-def validate_attendance_time(program):
-    """Validate if current time is within attendance window"""
-    now = datetime.now()
-    if now < program['qr_valid_from']:
-        return 'not_started', program['qr_valid_from'].strftime('%d/%m/%Y %H:%M')
-    elif now > program['qr_valid_to']:
-        return 'ended', program['qr_valid_to'].strftime('%d/%m/%Y %H:%M')
-    return None, None
-
-def process_eor_excel(file_stream):
-    """Process EOR Excel file and store directly in database"""
-    try:
-        # Read Excel file
-        df = pd.read_excel(file_stream, dtype={'per_no': str})
-        
-        # Strip whitespace from column headers
-        df.columns = [col.strip() for col in df.columns]
-
-        # Extended and comprehensive column mapping
-        column_mapping = {
-            # PER NO variations
-            'PER NO': 'per_no',
-            'PER_NO': 'per_no',
-            'Per No': 'per_no',
-            'Pers.no.': 'per_no',
-            'Pers No': 'per_no',
-            'pers no': 'per_no',
-
-            # Name variations
-            'Employee Name': 'participants_name',
-            'EMPLOYEE NAME': 'participants_name',
-            'employee name': 'participants_name',
-            'Name': 'participants_name',
-            'name': 'participants_name',
-            'Emp Name': 'participants_name',
-
-            # Factory variations
-            'FACTORY': 'factory',
-            'Factory': 'factory',
-            'factory': 'factory',
-
-            # Department / Cost Center
-            'DEPARTMENT': 'department',
-            'Department': 'department',
-            'department': 'department',
-            'Cost Center': 'department',  # Map descriptive cost center to department
-            'COST CENTER': 'department',
-            'Cost center': 'department',
-
-            # Gender
-            'GENDER': 'gender',
-            'Gender': 'gender',
-            'gender': 'gender',
-            'Gender Key': 'gender',
-
-            # Employee Group
-            'EMPLOYEE GROUP': 'employee_group',
-            'Employee Group': 'employee_group',
-            'employee group': 'employee_group',
-
-            # Employee Subgroup
-            'Employee Subgroup': 'employee_subgroup',
-            'EMPLOYEE SUBGROUP': 'employee_subgroup',
-            'employee subgroup': 'employee_subgroup',
-
-            # Cost ctr (numeric values) - map to bc_no
-            'Cost ctr': 'bc_no',
-            'COST CTR': 'bc_no',
-            'cost ctr': 'bc_no',
-            'BCC NO': 'bc_no',
-            'bcc no': 'bc_no',
-        }
-
-        # Apply column mapping if key exists in dataframe
-        df.rename(columns={k: v for k, v in column_mapping.items() if k in df.columns}, inplace=True)
-        
-        # Ensure required columns exist
-        required_columns = ['per_no', 'participants_name', 'factory']
-        for col in required_columns:
-            if col not in df.columns:
-                raise ValueError(f"Required column '{col}' not found in Excel file")
-        
-        # Clean data
-        df = df.fillna('')
-        
-        # Connect to database
-        conn = get_db_connection()
-        
-        try:
-            with conn.cursor() as cursor:
-                # Delete all existing records from eor_data table
-                cursor.execute("DELETE FROM eor_data")
-                
-                # Insert new records
-                for _, row in df.iterrows():
-                    cursor.execute("""
-                        INSERT INTO eor_data 
-                        (per_no, participants_name, factory, department, gender, 
-                         employee_group, employee_subgroup, bc_no)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    """, (
-                        row.get('per_no', ''),
-                        row.get('participants_name', ''),
-                        row.get('factory', ''),
-                        row.get('department', ''),
-                        row.get('gender', ''),
-                        row.get('employee_group', ''),
-                        row.get('employee_subgroup', ''),
-                        row.get('bc_no', '')
-                    ))
-                
-                conn.commit()
-                return True, f"Successfully processed {len(df)} EOR records"
-                
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            conn.close()
-            
-    except Exception as e:
-        return False, f"Error processing EOR Excel: {str(e)}"
-            
-    except Exception as e:
-        return False, f"Error processing EOR Excel: {str(e)}"
-
-def process_training_excel(file_stream):
-    """Process Training Excel file, normalize columns, and store directly in database"""
-    try:
-        import pandas as pd
-        from utils import get_db_connection
-
-        # Read Excel file
-        df = pd.read_excel(file_stream)
-        
-        # Normalize column headers: strip, lower case, replace spaces with underscores
-        df.columns = [col.strip().lower().replace(' ', '_') for col in df.columns]
-        
-        # Column mapping from Excel normalized names to DB column names (lowercase)
-        column_mapping = {
-            'training_name': 'training_name',
-            'pmo_training_category': 'pmo_training_category',
-            'pl_category': 'pl_category',
-            'brsr_sq_1,2,3_category': 'brsr_sq_123_category',
-            'tni_status': 'tni_status',
-            'duration': 'learning_hours'
-        }
-        
-        # Apply column mapping if key exists in dataframe
-        df.rename(columns={k: v for k, v in column_mapping.items() if k in df.columns}, inplace=True)
-        
-        # Ensure required columns exist
-        required_columns = ['training_name', 'tni_status']
-        for col in required_columns:
-            if col not in df.columns:
-                raise ValueError(f"Required column '{col}' not found in Excel file")
-        
-        # Clean data: fill NaN and strip strings
-        df = df.fillna('')
-        for col in ['training_name', 'pmo_training_category', 'pl_category', 'brsr_sq_123_category', 'tni_status']:
-            if col in df.columns:
-                df[col] = df[col].astype(str).str.strip()
-        
-        # Connect to database
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cursor:
-                # Delete all existing records from training_names table
-                cursor.execute("DELETE FROM training_names")
-                
-                # Insert new records
-                for _, row in df.iterrows():
-                    cursor.execute("""
-                        INSERT INTO training_names 
-                        (training_name, pmo_training_category, pl_category, 
-                         brsr_sq_123_category, tni_status, learning_hours)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                    """, (
-                        row.get('training_name', ''),
-                        row.get('pmo_training_category', ''),
-                        row.get('pl_category', ''),
-                        row.get('brsr_sq_123_category', ''),
-                        row.get('tni_status', ''),
-                        row.get('learning_hours', 0)
-                    ))
-                
-                conn.commit()
-                return True, f"Successfully processed {len(df)} training records"
-                
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            conn.close()
-            
-    except Exception as e:
-        return False, f"Error processing Training Excel: {str(e)}"
-
-def get_eor_count(factory=None):
-    """Get EOR count for a specific factory or all factories from database"""
-    try:
-        conn = get_db_connection()
-        with conn.cursor() as cursor:
-            if factory and factory != "All":
-                cursor.execute("""
-                    SELECT COUNT(DISTINCT per_no) as count 
-                    FROM eor_data 
-                    WHERE UPPER(factory) = UPPER(%s)
-                """, (factory.strip().upper(),))
-            else:
-                cursor.execute("SELECT COUNT(DISTINCT per_no) as count FROM eor_data")
-            
-            result = cursor.fetchone()
-            return result['count'] if result else 0
-            
-    except Exception as e:
-        print(f"Error in get_eor_count: {str(e)}")
-        return 0
-    finally:
-        conn.close()
-
-def load_eor_data():
-    """Load EOR data from database"""
-    try:
-        conn = get_db_connection()
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT * FROM eor_data")
-            eor_data = cursor.fetchall()
-        return eor_data
-    except Exception as e:
-        print(f"Error loading EOR data: {str(e)}")
-        return []
-    finally:
-        if conn:
-            conn.close()
+import os
+import uuid
+from datetime import datetime, timedelta
+import pandas as pd
+from flask import flash
+from db_pool import get_pool
+from eor_lookup import invalidate_eor_cache
+from filter_options import bump_version
+from filter_compiler import FilterCompiler
+
+class Config:
+    DB_HOST = 'localhost'
+    DB_USER = 'root'
+    DB_PASSWORD = 'pratik'
+    DB_NAME = 'masterdata'
+    PROGRAM_DATA_FILE = 'training_data.xlsx'  # Add this
+    EOR_FILENAME = 'eor_data.xlsx'  # Add this
+    QR_FOLDER = 'static/qrcodes'
+    QR_BUFFER_MINUTES = 15
+    ALLOWED_EXTENSIONS = {'xlsx'}
+    QR_BASE_URL = 'http://10.250.109.201:5003'
+    QR_PROGRAM_PATH = '/attendance'
+    QR_HALL_PATH = '/attendance/hall'
+    DB_POOL_SIZE = 10  # Max connections shared by all blueprints
+    DB_POOL_TIMEOUT = 30  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE = 3600  # Close connections older than this (seconds)
+    DB_POOL_PING_INTERVAL = 30  # Ping idle connections older than this before reuse
+    EOR_CACHE_SIZE = 5000  # Employees kept in the check-in lookup cache
+    EOR_CACHE_TTL = 300  # Seconds before a cached employee is re-read
+    EOR_SNAPSHOT_MODE = False  # Preload all of eor_data into memory (for QR kiosks)
+    PROGRAM_CACHE_TTL = 60  # Seconds a program row is reused across attendance check-ins
+    QUERY_PROFILING = False  # Record every query per request (Server-Timing, /debug/queries)
+    QUERY_PROFILE_HISTORY = 50  # Requests kept for the /debug/queries panel
+    SLOW_QUERY_MS = 200  # Queries at least this slow go to the slow-query log while profiling
+    SLOW_QUERY_LOG = 'logs/slow_queries.jsonl'
+    SLOW_QUERY_LOG_BYTES = 5 * 1024 * 1024  # Rotate the slow-query log at this size
+    SLOW_QUERY_LOG_BACKUPS = 3
+    JOB_WORKERS = 2  # Background worker threads for uploads and other heavy admin jobs
+    JOB_HISTORY = 200  # Finished jobs kept in memory for status polling
+    JOB_PERSIST = False  # Also record jobs in the background_jobs table
+    JOB_BATCH_DELAY = 5  # Seconds check-ins are collected before their summary refresh job runs
+    FILTER_OPTIONS_TTL = 3600  # Seconds before cached dropdown values are re-read without an upload
+    FILTER_OPTIONS_VERSION_CHECK = 5  # Seconds between reads of the data_versions stamps
+    RESULT_CACHE_ENABLED = True  # Serve dashboard panels from the result cache
+    RESULT_CACHE_BACKEND = 'memory'  # 'memory' (per process) or 'sqlite' (shared by processes on a host)
+    RESULT_CACHE_PATH = 'cache/{name}.sqlite3'  # SQLite backend file per cache name
+    RESULT_CACHE_SIZE = 200  # Filter combinations kept per cache
+    RESULT_CACHE_TTL = 300  # Seconds a cached result is fresh
+    RESULT_CACHE_STALE = 600  # Further seconds a result is served while it refreshes in the background
+    LEARNER_INDEX_ENABLED = True  # Count unique learners from the in-memory bitmap index
+    LEARNER_INDEX_PATH = 'cache/learner_index.bin'  # Where the index is saved for fast restarts
+    LEARNER_INDEX_TTL = 3600  # Seconds before the index is rebuilt from scratch (0 = only on uploads)
+
+class Constants:
+    LOCATION_HALLS = [
+        '5-S Class Room', 'AR / VR Class Room', 'BIW FST Class Room',
+        'C-6 Conference Hall', 'Chinchwad Foundry Conference Hall',
+        'E-11 Conference Hall', 'Fire Security Basement Hall',
+        'H-2 Conference Hall', 'H-7 Conference Hall',
+        'Hostel Main Conference Hall', 'Hostel Ultra Conference Hall',
+        'Hostel Hexa Conference Hall', 'Industry 4.0 Innovation Lab',
+        'J-12 Paint Conference Hall', 'Jagruti Hall',
+        'D-7 Kushal (Mech.) Class Room', 'Lake House VIP Conference Hall',
+        'Learning Hall', 'LQOS Room', 'Maval Foundry MDC Chinchwad',
+        'MMV Class Room', 'Power Train Class Room', 'Pragati PE Conference Hall',
+        'Prayas (CNC) Hall', 'PRIMA Hall', 'SDP Hall',
+        'TCF FST Class Room', 'Uddan Class Room', 'Unnati Class Room',
+        'Utkarsh Class Room', 'Maral Training Hall'
+    ]
+
+    FACTORY_LOCATIONS = [
+        'AXLE FACTORY', 'CCE-TS', 'CHINCHWAD FOUNDRY', 'CKD-SKD', 'CMS',
+        'ENGINE FACTORY', 'ERC', 'GEAR FACTORY', 'HR FUNCTION',
+        'J-11/12 PAINTSHOP', 'LAUNCH MANAGEMENT', 'LCV FACTORY',
+        'M&HCV FACTORY', 'MATERIAL AUDIT', 'MAVAL FOUNDRY', 'PE', 'PPC',
+        'PRESS & FRAME FACTORY', 'PTPA', 'QUALITY ASSURANCE', 'SCM',
+        'Service Technical Support', 'WINGER FACTORY', 'XENON FACTORY'
+    ]
+
+    PROGRAM_TYPES = ['Calendar', 'Need-based (SDC Need base)', 'Need-based (Shop Need base)', 'Reschedule']
+    TNI_OPTIONS = ['TNI', 'NON-TNI']
+    TIME_SLOTS = [f"{h:02d}:{m:02d}" for h in range(5, 23) for m in [0, 30]]
+
+def get_db_connection():
+    """Check out a pooled connection (DictCursor, autocommit); close() returns it to the pool"""
+    return get_pool().acquire()
+
+def load_training_data(tni_status='TNI'):
+    """Load training data from database filtered by TNI status"""
+    try:
+        conn = get_db_connection()
+        with conn.cursor() as cursor:
+            # Normalize the input: replace spaces with hyphens (case is handled by the normalized column)
+            tni_filter = FilterCompiler(conn=conn).normalized_equals(
+                'training_names', 'tni_status', tni_status.replace(' ', '-'))
+            
+            cursor.execute(f"""
+                SELECT training_name, pmo_training_category, pl_category, 
+                       brsr_sq_123_category, tni_status, learning_hours
+                FROM training_names
+                WHERE {tni_filter.where()}
+            """, tni_filter.params)
+            training_data = cursor.fetchall()
+        
+        return training_data
+    except Exception as e:
+        print(f"Error loading training data from database: {str(e)}")
+        flash(f'Error loading training data: {str(e)}', 'error')
+        return []
+    finally:
+        conn.close()
+def calculate_learning_hours(start_date, end_date, start_time, end_time):
+    """Calculate total learning hours between two datetimes"""
+    try:
+        start_dt = datetime.strptime(f"{start_date} {start_time}", "%Y-%m-%d %H:%M")
+        end_dt = datetime.strptime(f"{end_date} {end_time}", "%Y-%m-%d %H:%M")
+        return round((end_dt - start_dt).total_seconds() / 3600)
+    except Exception as e:
+        print(f"Error calculating learning hours: {e}")
+        return None
+
+def format_program_dates(program):
+    """Helper function to format dates and times for display"""
+    if 'start_date' in program:
+        program['formatted_start_date'] = program['start_date'].strftime('%d/%m/%Y') if isinstance(program['start_date'], datetime) else program['start_date']
+    if 'end_date' in program:
+        program['formatted_end_date'] = program['end_date'].strftime('%d/%m/%Y') if isinstance(program['end_date'], datetime) else program['end_date']
+    if 'start_time' in program:
+        program['formatted_start_time'] = program['start_time'].strftime('%H:%M') if isinstance(program['start_time'], datetime.time) else program['start_time']
+    if 'end_time' in program:
+        program['formatted_end_time'] = program['end_time'].strftime('%H:%M') if isinstance(program['end_time'], datetime.time) else program['end_time']
+    return program
+
+def validate_attendance_time(program):
+    """Validate if current time is within attendance window"""
+    now = datetime.now()
+    if now < program['qr_valid_from']:
+        return 'not_started', program['qr_valid_from'].strftime('%d/%m/%Y %H:%M')
+    elif now > program['qr_valid_to']:
+        return 'ended', program['qr_valid_to'].strftime('%d/%m/%Y %H:%M')
+    return None, None
+
+EOR_COLUMNS = ('per_no', 'participants_name', 'factory', 'department', 'gender',
+               'employee_group', 'employee_subgroup', 'bc_no')
+TRAINING_NAME_COLUMNS = ('training_name', 'pmo_training_category', 'pl_category',
+                         'brsr_sq_123_category', 'tni_status', 'learning_hours')
+INGEST_CHUNK_SIZE = 1000
+
+def clean_text_columns(df, columns):
+    """Fill NaN with '' and strip the given columns, adding any that are missing"""
+    df = df.copy()
+    for col in columns:
+        if col in df.columns:
+            df[col] = df[col].fillna('').astype(str).str.strip()
+        else:
+            df[col] = ''
+    return df
+
+def bulk_replace_table(table, columns, rows, chunk_size=INGEST_CHUNK_SIZE, progress=None):
+    """Replace the contents of table with rows without leaving it empty mid-load.
+
+    Rows are written in multi-row INSERT chunks into a staging copy of the table
+    (uniquely named per call), which is then swapped in with a single atomic
+    RENAME TABLE; with concurrent uploads the last swap wins. progress(rows_so_far)
+    is called after each chunk; if it raises (e.g. a cancelled job) the staging
+    table is dropped and the live table is left untouched.
+    """
+    # Unique per call, so concurrent uploads of one table never share a staging table
+    suffix = uuid.uuid4().hex[:12]
+    staging = f"{table}_staging_{suffix}"
+    old = f"{table}_old_{suffix}"
+    column_list = ', '.join(columns)
+    placeholders = ', '.join(['%s'] * len(columns))
+    started = datetime.now()
+    inserted = 0
+
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"CREATE TABLE {staging} LIKE {table}")
+            try:
+                sql = f"INSERT INTO {staging} ({column_list}) VALUES ({placeholders})"
+                chunk = []
+                for row in rows:
+                    chunk.append(row)
+                    if len(chunk) >= chunk_size:
+                        cursor.executemany(sql, chunk)
+                        inserted += len(chunk)
+                        chunk = []
+                        if progress:
+                            progress(inserted)
+                if chunk:
+                    cursor.executemany(sql, chunk)
+                    inserted += len(chunk)
+
+                cursor.execute(f"RENAME TABLE {table} TO {old}, {staging} TO {table}")
+                cursor.execute(f"DROP TABLE {old}")
+            except BaseException:
+                cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+                raise
+    finally:
+        conn.close()
+    bump_version(table)
+
+    seconds = (datetime.now() - started).total_seconds()
+    return {
+        'rows': inserted,
+        'seconds': round(seconds, 2),
+        'rows_per_sec': int(inserted / seconds) if seconds else inserted,
+    }
+
+def ingest_message(stats, label, rejected):
+    """Summary shown after an upload: rows loaded, throughput and rejected Excel rows"""
+    message = (f"Successfully processed {stats['rows']} {label} records "
+               f"in {stats['seconds']}s ({stats['rows_per_sec']} rows/sec)")
+    if len(rejected):
+        # +2: one for the header row, one because Excel rows start at 1
+        excel_rows = [str(i + 2) for i in rejected[:10]]
+        more = '...' if len(rejected) > 10 else ''
+        message += f"; {len(rejected)} rows rejected (Excel rows {', '.join(excel_rows)}{more})"
+    return message
+
+def _load_progress(progress, total, start=20, end=95):
+    """Map bulk_replace_table's rows-so-far callback onto a start..end percentage"""
+    if not progress:
+        return None
+    return lambda rows: progress(start + (end - start) * rows / max(total, 1), f"Loaded {rows} of {total} rows")
+
+def process_eor_excel(file_stream, progress=None):
+    """Process EOR Excel file and store directly in database"""
+    try:
+        # Read Excel file
+        if progress:
+            progress(5, 'Reading EOR workbook')
+        df = pd.read_excel(file_stream, dtype={'per_no': str})
+        
+        # Strip whitespace from column headers
+        df.columns = [col.strip() for col in df.columns]
+
+        # Extended and comprehensive column mapping
+        column_mapping = {
+            # PER NO variations
+            'PER NO': 'per_no',
+            'PER_NO': 'per_no',
+            'Per No': 'per_no',
+            'Pers.no.': 'per_no',
+            'Pers No': 'per_no',
+            'pers no': 'per_no',
+
+            # Name variations
+            'Employee Name': 'participants_name',
+            'EMPLOYEE NAME': 'participants_name',
+            'employee name': 'participants_name',
+            'Name': 'participants_name',
+            'name': 'participants_name',
+            'Emp Name': 'participants_name',
+
+            # Factory variations
+            'FACTORY': 'factory',
+            'Factory': 'factory',
+            'factory': 'factory',
+
+            # Department / Cost Center
+            'DEPARTMENT': 'department',
+            'Department': 'department',
+            'department': 'department',
+            'Cost Center': 'department',  # Map descriptive cost center to department
+            'COST CENTER': 'department',
+            'Cost center': 'department',
+
+            # Gender
+            'GENDER': 'gender',
+            'Gender': 'gender',
+            'gender': 'gender',
+            'Gender Key': 'gender',
+
+            # Employee Group
+            'EMPLOYEE GROUP': 'employee_group',
+            'Employee Group': 'employee_group',
+            'employee group': 'employee_group',
+
+            # Employee Subgroup
+            'Employee Subgroup': 'employee_subgroup',
+            'EMPLOYEE SUBGROUP': 'employee_subgroup',
+            'employee subgroup': 'employee_subgroup',
+
+            # Cost ctr (numeric values) - map to bc_no
+            'Cost ctr': 'bc_no',
+            'COST CTR': 'bc_no',
+            'cost ctr': 'bc_no',
+            'BCC NO': 'bc_no',
+            'bcc no': 'bc_no',
+        }
+
+        # Apply column mapping if key exists in dataframe
+        df.rename(columns={k: v for k, v in column_mapping.items() if k in df.columns}, inplace=True)
+        
+        # Ensure required columns exist
+        required_columns = ['per_no', 'participants_name', 'factory']
+        for col in required_columns:
+            if col not in df.columns:
+                raise ValueError(f"Required column '{col}' not found in Excel file")
+        
+        # Clean data (vectorized)
+        df = clean_text_columns(df, EOR_COLUMNS)
+        for col in ('per_no', 'bc_no'):
+            df[col] = df[col].str.replace(r'\.0$', '', regex=True)
+
+        # Rows without a personal number can never be matched at check-in
+        rejected = df.index[df['per_no'] == '']
+        df = df.drop(rejected)
+
+        stats = bulk_replace_table('eor_data', EOR_COLUMNS, df[list(EOR_COLUMNS)].itertuples(index=False, name=None),
+                                   progress=_load_progress(progress, len(df)))
+        invalidate_eor_cache()
+        return True, ingest_message(stats, 'EOR', rejected)
+
+    except Exception as e:
+        return False, f"Error processing EOR Excel: {str(e)}"
+
+def process_training_excel(file_stream, progress=None):
+    """Process Training Excel file, normalize columns, and store directly in database"""
+    try:
+        import pandas as pd
+
+        # Read Excel file
+        if progress:
+            progress(5, 'Reading training workbook')
+        df = pd.read_excel(file_stream)
+        
+        # Normalize column headers: strip, lower case, replace spaces with underscores
+        df.columns = [col.strip().lower().replace(' ', '_') for col in df.columns]
+        
+        # Column mapping from Excel normalized names to DB column names (lowercase)
+        column_mapping = {
+            'training_name': 'training_name',
+            'pmo_training_category': 'pmo_training_category',
+            'pl_category': 'pl_category',
+            'brsr_sq_1,2,3_category': 'brsr_sq_123_category',
+            'tni_status': 'tni_status',
+            'duration': 'learning_hours'
+        }
+        
+        # Apply column mapping if key exists in dataframe
+        df.rename(columns={k: v for k, v in column_mapping.items() if k in df.columns}, inplace=True)
+        
+        # Ensure required columns exist
+        required_columns = ['training_name', 'tni_status']
+        for col in required_columns:
+            if col not in df.columns:
+                raise ValueError(f"Required column '{col}' not found in Excel file")
+        
+        # Clean data: fill NaN and strip strings (vectorized)
+        text_columns = ('training_name', 'pmo_training_category', 'pl_category', 'brsr_sq_123_category', 'tni_status')
+        df = clean_text_columns(df, text_columns)
+        if 'learning_hours' in df.columns:
+            df['learning_hours'] = pd.to_numeric(df['learning_hours'], errors='coerce').fillna(0)
+        else:
+            df['learning_hours'] = 0
+
+        rejected = df.index[df['training_name'] == '']
+        df = df.drop(rejected)
+
+        stats = bulk_replace_table('training_names', TRAINING_NAME_COLUMNS,
+                                   df[list(TRAINING_NAME_COLUMNS)].itertuples(index=False, name=None),
+                                   progress=_load_progress(progress, len(df)))
+        return True, ingest_message(stats, 'training', rejected)
+
+    except Exception as e:
+        return False, f"Error processing Training Excel: {str(e)}"
+
+def get_eor_count(factory=None):
+    """Get EOR count for a specific factory or all factories from database"""
+    try:
+        conn = get_db_connection()
+        with conn.cursor() as cursor:
+            if factory and factory != "All":
+                factory_filter = FilterCompiler(conn=conn).normalized_equals('eor_data', 'factory', factory)
+                cursor.execute(f"""
+                    SELECT COUNT(DISTINCT per_no) as count 
+                    FROM eor_data 
+                    WHERE {factory_filter.where()}
+                """, factory_filter.params)
+            else:
+                cursor.execute("SELECT COUNT(DISTINCT per_no) as count FROM eor_data")
+            
+            result = cursor.fetchone()
+            return result['count'] if result else 0
+            
+    except Exception as e:
+        print(f"Error in get_eor_count: {str(e)}")
+        return 0
+    finally:
+        conn.close()
+
+def load_eor_data():
+    """Load EOR data from database"""
+    try:
+        conn = get_db_connection()
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT * FROM eor_data")
+            eor_data = cursor.fetchall()
+        return eor_data
+    except Exception as e:
+        print(f"Error loading EOR data: {str(e)}")
+        return []
+    finally:
+        if conn:
+            conn.close()
             
\ No newline at end of file